@@ -0,0 +1,121 @@
+"""
+Ejecuta la suite de benchmarks sobre el emulador y guarda los resultados.
+
+Uso:
+  python -m benchmarks [--iterations 20] [--output bench_results.json] [--compare anterior.json]
+
+Con --compare se muestra la diferencia de cada métrica respecto a una
+ejecución anterior para detectar regresiones entre versiones del firmware.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+METRICS = ("us_per_call", "bytes_per_call", "gc_collections")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks del firmware sobre el emulador")
+    parser.add_argument("--iterations", type=int, default=20, help="Llamadas medidas por caso")
+    parser.add_argument("--output", default="bench_results.json", help="Fichero JSON de resultados")
+    parser.add_argument("--compare", help="Resultados anteriores con los que comparar")
+    return parser.parse_args()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT_DIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: dict, current: dict) -> None:
+    before = {r["name"]: r for r in previous.get("results", [])}
+    print("")
+    print(f"{'caso':40} {'métrica':16} {'antes':>12} {'ahora':>12} {'delta':>8}")
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if not old or "error" in result or "error" in old:
+            continue
+        for metric in METRICS:
+            a, b = old.get(metric, 0), result.get(metric, 0)
+            delta = f"{(b - a) / a * 100:+.1f}%" if a else "-"
+            print(f"{result['name']:40} {metric:16} {a:>12} {b:>12} {delta:>8}")
+
+
+def main() -> int:
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    sys.path.insert(0, ROOT_DIR)
+    import emulator
+
+    server = emulator.ApiStandIn().start()
+    board = emulator.install(env={
+        "AP_NAME": "SmartPlant-Lab",
+        "AP_PASS": "smartplant",
+        "API_URL": server.url,
+        "BATTERY": True,
+        "DEBUG": False,
+    })
+    sys.path.insert(0, BENCH_DIR)
+
+    from cases import build_suite, check_bme280_int
+    from Models.Sensors.BME280 import BME280
+    from Models.Api import Api
+    from Models.RpiPico import RpiPico
+
+    rpi = RpiPico(ssid="SmartPlant-Lab", password="smartplant")
+    rpi.set_i2c(4, 5, 0, 400000)
+    rpi.set_external_battery(26)
+    api = Api(controller=rpi, url=server.url, path="", token="apitoken",
+              device_id=rpi.get_id())
+
+    # La compensación entera debe coincidir bit a bit con la de C
+    errors = check_bme280_int(BME280(rpi=rpi, compensation="int"))
+    for error in errors:
+        print("BME280 int:", error)
+    if errors:
+        server.stop()
+        return 1
+    print("BME280 int: vectores de referencia correctos")
+
+    suite = build_suite(rpi, api, args.iterations, {
+        "platform": "emulator",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "note": "us_per_call es tiempo simulado (E/S y esperas); host_cpu_us_per_call es CPU del PC",
+    })
+    suite.run()
+
+    data = suite.to_dict()
+    data["board"] = board.get_stats()
+    data["api"] = server.get_stats()
+    server.stop()
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print("Resultados guardados en", output)
+
+    if previous is not None:
+        compare(previous, data)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
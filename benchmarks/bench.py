@@ -0,0 +1,182 @@
+"""
+Utilidades de benchmark compatibles con MicroPython y CPython.
+
+Mide, para cada punto de entrada:
+- µs por llamada con time.ticks_us (en el emulador es tiempo simulado: E/S,
+  esperas y transacciones de bus).
+- µs de CPU del anfitrión por llamada (solo en CPython).
+- Bytes reservados por llamada (delta de gc.mem_alloc con el recolector
+  desactivado; en CPython, pico de tracemalloc).
+- Recolecciones de basura provocadas con el recolector activado.
+"""
+import gc
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    from time import perf_counter
+except ImportError:
+    perf_counter = None
+
+
+class _GcCounter:
+    """
+    Cuenta recolecciones de basura. En CPython usa gc.callbacks; en
+    MicroPython detecta las bajadas de gc.mem_alloc entre llamadas.
+    """
+
+    def __init__ (self):
+        self.count = 0
+        self._callbacks = getattr(gc, 'callbacks', None)
+        self._last_alloc = 0
+
+    def _on_gc (self, phase, info):
+        if phase == 'start':
+            self.count += 1
+
+    def start (self):
+        self.count = 0
+        if self._callbacks is not None:
+            self._callbacks.append(self._on_gc)
+        else:
+            self._last_alloc = gc.mem_alloc()
+
+    def sample (self):
+        if self._callbacks is None:
+            alloc = gc.mem_alloc()
+            if alloc < self._last_alloc:
+                self.count += 1
+            self._last_alloc = alloc
+
+    def stop (self):
+        if self._callbacks is not None:
+            self._callbacks.remove(self._on_gc)
+        return self.count
+
+
+def _alloc_bytes (func):
+    """Bytes reservados por una llamada con el recolector desactivado."""
+    gc.collect()
+    gc.disable()
+    try:
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func()
+            return max(0, tracemalloc.get_traced_memory()[1] - start)
+
+        start = gc.mem_alloc()
+        func()
+        return max(0, gc.mem_alloc() - start)
+    finally:
+        gc.enable()
+
+
+def measure (name, func, iterations=20, warmup=2):
+    """
+    Mide un punto de entrada.
+
+    Args:
+        name (str): Nombre del benchmark.
+        func: Función sin argumentos a medir.
+        iterations (int): Número de llamadas medidas.
+        warmup (int): Llamadas previas no medidas.
+
+    Returns:
+        dict: Resultados del benchmark.
+    """
+    for _ in range(warmup):
+        func()
+
+    allocs = []
+    for _ in range(min(iterations, 5)):
+        allocs.append(_alloc_bytes(func))
+
+    gc.collect()
+    counter = _GcCounter()
+    counter.start()
+
+    ticks = []
+    cpu = []
+    for _ in range(iterations):
+        t0 = time.ticks_us()
+        c0 = perf_counter() if perf_counter else 0
+        func()
+        c1 = perf_counter() if perf_counter else 0
+        t1 = time.ticks_us()
+        ticks.append(time.ticks_diff(t1, t0))
+        cpu.append((c1 - c0) * 1000000)
+        counter.sample()
+
+    collections = counter.stop()
+    ticks.sort()
+
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "us_per_call": round(sum(ticks) / iterations, 1),
+        "us_min": ticks[0],
+        "us_max": ticks[-1],
+        "us_median": ticks[iterations // 2],
+        "bytes_per_call": int(sum(allocs) / len(allocs)),
+        "gc_collections": collections,
+    }
+
+    if perf_counter:
+        result["host_cpu_us_per_call"] = round(sum(cpu) / iterations, 1)
+
+    return result
+
+
+class Suite:
+    """
+    Conjunto de benchmarks con salida en JSON.
+
+    :param metadata: Datos que identifican la ejecución (firmware, plataforma...).
+    """
+
+    def __init__ (self, metadata=None):
+        self.metadata = metadata or {}
+        self.cases = []
+        self.results = []
+
+    def add (self, name, func, iterations=20, warmup=2):
+        self.cases.append((name, func, iterations, warmup))
+
+    def run (self, verbose=True):
+        self.results = []
+        for name, func, iterations, warmup in self.cases:
+            try:
+                result = measure(name, func, iterations, warmup)
+            except Exception as e:
+                result = {"name": name, "error": str(e)}
+            self.results.append(result)
+
+            if verbose:
+                if "error" in result:
+                    print(name, 'ERROR:', result["error"])
+                else:
+                    print(name, result["us_per_call"], 'us/llamada',
+                          result["bytes_per_call"], 'bytes/llamada',
+                          result["gc_collections"], 'gc')
+
+        return self.results
+
+    def to_dict (self):
+        return {
+            "metadata": self.metadata,
+            "results": self.results,
+        }
+
+    def save (self, path):
+        try:
+            import ujson as json
+        except ImportError:
+            import json
+
+        with open(path, 'w') as f:
+            f.write(json.dumps(self.to_dict()))
@@ -0,0 +1,189 @@
+"""
+Casos de benchmark de los puntos de entrada del firmware.
+
+Compatible con MicroPython: copia ``bench.py`` y este fichero a la Pico junto
+con src/ y ejecuta ``import cases; cases.run_device()``. El resultado queda
+en ``bench.json`` en la flash.
+"""
+import sys
+
+from bench import Suite
+
+# Carga que se envía en los benchmarks de red
+SAMPLE_PAYLOAD = {
+    "weather": {"temperature": 21.5, "humidity": 45.0, "pressure": 1013.25},
+    "plants": [{"adc": 27, "soil_humidity": 52.9}],
+}
+
+
+# Vectores de referencia de la compensación entera del BME280: salidas de
+# las funciones de 32 bits del datasheet compiladas en C (int32, con la
+# división uint32 de la presión). Cada entrada es la calibración (dig_T1-T3,
+# dig_P1-P9, dig_H1-H6) y sus lecturas (adc_T, adc_P, adc_H, T en centésimas
+# de °C, t_fine, P en Pa, H en 1/1024 %). La primera lectura es el ejemplo
+# del datasheet (T 2508, t_fine 128422).
+BME280_VECTORS = (
+    ((27504, 26435, -1000,
+      36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000,
+      75, 362, 0, 313, 50, 30),
+     (
+         (519888, 415148, 32000, 2508, 128422, 100656, 67689),
+         (415000, 520000, 25000, -791, -40477, 78552, 28432),
+         (470000, 470000, 28000, 942, 48247, 89044, 44701),
+         (560000, 380000, 36000, 3763, 192674, 108793, 91685),
+         (600000, 300000, 40000, 5011, 256562, 125303, 102400),
+         (450000, 250000, 21000, 313, 16025, 124915, 6344),
+         (500000, 440000, 30500, 1885, 96494, 95455, 58894),
+         (540000, 350000, 38000, 3138, 160661, 113011, 102400),
+         (519888, 415148, 12000, 2508, 128422, 100656, 0),
+     )),
+    ((28009, 25654, 50,
+      39145, -10750, 3024, 5667, -120, -7, 15500, -14600, 6000,
+      75, 352, 0, 342, 0, 30),
+     (
+         (430000, 500000, 26000, -555, -28410, 69281, 21487),
+         (480000, 460000, 29000, 974, 49881, 77337, 38436),
+         (530000, 400000, 34000, 2504, 128188, 88956, 67497),
+         (580000, 330000, 42000, 4033, 206509, 102773, 102400),
+         (620000, 270000, 45000, 5257, 269176, 114968, 102400),
+         (505000, 425000, 31000, 1739, 89033, 83868, 50034),
+         (455000, 480000, 23000, 210, 10735, 73261, 5930),
+     )),
+)
+
+CALIBRATION_NAMES = ('dig_t1', 'dig_t2', 'dig_t3',
+                     'dig_p1', 'dig_p2', 'dig_p3', 'dig_p4', 'dig_p5',
+                     'dig_p6', 'dig_p7', 'dig_p8', 'dig_p9',
+                     'dig_h1', 'dig_h2', 'dig_h3', 'dig_h4', 'dig_h5', 'dig_h6')
+
+
+def check_bme280_int (sensor):
+    """
+    Compara la compensación entera con los vectores de referencia. Sustituye
+    la calibración del sensor, por lo que debe ser una instancia solo para
+    la comprobación.
+
+    Returns:
+        list: Diferencias encontradas, vacía si todo coincide.
+    """
+    errors = []
+
+    for calibration, vectors in BME280_VECTORS:
+        for name, value in zip(CALIBRATION_NAMES, calibration):
+            setattr(sensor, name, value)
+
+        for adc_t, adc_p, adc_h, t, t_fine, p, h in vectors:
+            got = (sensor._compensate_temperature_int(adc_t), sensor.t_fine,
+                   sensor._compensate_pressure_int(adc_p),
+                   sensor._compensate_humidity_int(adc_h))
+
+            if got != (t, t_fine, p, h):
+                errors.append("raw {}: {} en lugar de {}".format(
+                    (adc_t, adc_p, adc_h), got, (t, t_fine, p, h)))
+
+    return errors
+
+
+def _urequests_post (api, data):
+    """
+    Petición equivalente a Api.send_to_api abriendo una conexión nueva, como
+    referencia para medir la mejora de la conexión persistente.
+    """
+    import urequests
+
+    response = urequests.post(api.URL + api.URL_PATH, headers=api.headers,
+                              json={"data": data, "hardware_device_id": api.DEVICE_ID})
+    response.close()
+
+
+def _compensate (sensor, raw):
+    """
+    Compensa una lectura raw fija para medir solo el cálculo, sin I2C.
+    """
+    temp_raw, pres_raw, hum_raw = raw
+
+    sensor._compensate_temperature(temp_raw)
+    sensor._compensate_pressure(pres_raw)
+    sensor._compensate_humidity(hum_raw)
+
+
+def build_suite (rpi, api=None, iterations=20, metadata=None):
+    """
+    Crea la suite con todos los puntos de entrada de sensores y red.
+
+    Args:
+        rpi: Instancia RpiPico con I2C en el bus 0 y batería configurada.
+        api: Instancia Api (opcional) para los benchmarks de red.
+        iterations (int): Llamadas medidas por caso.
+        metadata (dict): Datos que identifican la ejecución.
+
+    Returns:
+        Suite: Suite preparada para ejecutarse.
+    """
+    from Models.Sensors.BME280 import BME280
+    from Models.Sensors.SoilMoisture import SoilMoisture
+    from Models.System import System
+
+    bme = BME280(rpi=rpi, compensation='float')
+    bme_int = BME280(rpi=rpi, compensation='int')
+    raw = bme._read_raw_data()
+    soil = SoilMoisture(rpi, pin=27)
+    system = System(rpi, weather_sensor=bme, light_sensor=None)
+
+    suite = Suite(metadata)
+
+    suite.add('BME280.__init__', lambda: BME280(rpi=rpi), iterations=5, warmup=0)
+    suite.add('BME280.get_all_data', bme.get_all_data, iterations)
+    suite.add('BME280.get_all_data (int)', bme_int.get_all_data, iterations)
+    suite.add('BME280 compensación float', lambda: _compensate(bme, raw), iterations)
+    suite.add('BME280 compensación int', lambda: _compensate(bme_int, raw), iterations)
+    suite.add('SoilMoisture.read_analog', soil.read_analog, iterations)
+    suite.add('RpiPico.read_external_battery', rpi.read_external_battery, iterations)
+    suite.add('RpiPico.get_cpu_temperature', rpi.get_cpu_temperature, iterations)
+    suite.add('RpiPico.get_device_info', rpi.get_device_info, iterations)
+    suite.add('System.get_info', system.get_info, iterations)
+
+    if api is not None:
+        suite.add('Api.get_data_from_api', api.get_data_from_api, min(iterations, 10))
+        suite.add('Api.send_to_api', lambda: api.send_to_api(SAMPLE_PAYLOAD),
+                  min(iterations, 10))
+        suite.add('urequests.post (sin keep-alive)',
+                  lambda: _urequests_post(api, SAMPLE_PAYLOAD), min(iterations, 10))
+
+    return suite
+
+
+def run_device (path='bench.json', iterations=20):
+    """
+    Ejecuta la suite en la Pico con la configuración de env.py, después de
+    comprobar la compensación entera del BME280.
+    """
+    import env
+    from Models.Api import Api
+    from Models.RpiPico import RpiPico
+
+    rpi = RpiPico(ssid=env.AP_NAME, password=env.AP_PASS, debug=False,
+                  alternatives_ap=env.ALTERNATIVES_AP, hostname=env.HOSTNAME)
+    rpi.set_i2c(4, 5, 0, 400000)
+    rpi.set_external_battery(getattr(env, 'BATTERY_PIN', 26))
+
+    from Models.Sensors.BME280 import BME280
+
+    errors = check_bme280_int(BME280(rpi=rpi, compensation='int'))
+
+    if errors:
+        raise ValueError("Compensación entera del BME280: " + "; ".join(errors))
+
+    api = Api(controller=rpi, url=env.API_URL, path=getattr(env, 'API_PATH', ''),
+              token=env.API_TOKEN, device_id=rpi.get_id())
+
+    firmware, micropython = rpi.get_versions()
+    suite = build_suite(rpi, api, iterations, {
+        "platform": sys.platform,
+        "firmware": firmware,
+        "micropython": micropython,
+    })
+    suite.run()
+    suite.save(path)
+
+    return suite
@@ -0,0 +1,225 @@
+"""
+Emulador de hardware para ejecutar el firmware de SmartPlant en CPython.
+
+Proporciona versiones falsas de los módulos de MicroPython (machine, network,
+ntptime, urequests, usocket, ubinascii, ujson, uasyncio, micropython) sobre
+una placa emulada con tiempo simulado. El código de src/ se ejecuta sin
+modificaciones.
+
+Uso básico::
+
+    import emulator
+
+    board = emulator.install(env={"DEBUG": False})
+    board.add_access_point("casa", "secreto")
+    emulator.run_firmware(duration_ms=3600 * 1000)
+    print(board.get_stats())
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from typing import Any, Dict, Optional
+
+from emulator.board import Board, get_board, set_board
+from emulator.clock import SimClock, SimulationEnd
+from emulator.devices.bme280 import BME280Model
+from emulator.server import ApiStandIn
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micropython_modules")
+
+# Módulos del firmware que se descargan para simular un arranque limpio
+FIRMWARE_MODULES = ("main", "env", "functions", "Models")
+
+__all__ = [
+    "ApiStandIn",
+    "BME280Model",
+    "Board",
+    "SimClock",
+    "SimulationEnd",
+    "get_board",
+    "install",
+    "make_env",
+    "run_firmware",
+]
+
+
+_host_localtime = time.localtime
+_host_gmtime = time.gmtime
+
+
+def _patch_time(board: Board) -> None:
+    """
+    Añade a ``time`` las funciones de MicroPython sobre el reloj simulado.
+    ``time()``, ``localtime()`` y ``gmtime()`` sin argumentos devuelven la
+    hora del RTC emulado (segundos enteros, como en MicroPython).
+    """
+    clock = board.clock
+
+    def rtc_time() -> int:
+        return get_board().rtc_epoch + get_board().clock.now_us // 1000000
+
+    def localtime(secs=None):
+        return _host_localtime(rtc_time() if secs is None else secs)
+
+    def gmtime(secs=None):
+        return _host_gmtime(rtc_time() if secs is None else secs)
+
+    time.time = rtc_time
+    time.localtime = localtime
+    time.gmtime = gmtime
+    time.ticks_ms = clock.ticks_ms
+    time.ticks_us = clock.ticks_us
+    time.ticks_cpu = clock.ticks_cpu
+    time.ticks_add = clock.ticks_add
+    time.ticks_diff = clock.ticks_diff
+    time.sleep_ms = clock.sleep_ms
+    time.sleep_us = clock.sleep_us
+
+
+def _patch_gc(board: Board) -> None:
+    """
+    Añade ``gc.mem_alloc``/``gc.mem_free`` usando tracemalloc. Las cifras son
+    de objetos de CPython: sirven para comparar versiones, no para predecir
+    el heap real de la Pico.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    def mem_alloc() -> int:
+        return tracemalloc.get_traced_memory()[0]
+
+    def mem_free() -> int:
+        return max(0, board.heap_size - mem_alloc())
+
+    gc.mem_alloc = mem_alloc
+    gc.mem_free = mem_free
+
+
+def make_env(overrides: Optional[Dict[str, Any]] = None) -> types.ModuleType:
+    """
+    Crea el módulo ``env`` a partir de src/.env.example.py con los valores
+    indicados sobrescritos.
+    """
+    env = types.ModuleType("env")
+    path = os.path.join(SRC_DIR, ".env.example.py")
+    with open(path, encoding="utf-8") as f:
+        exec(compile(f.read(), path, "exec"), env.__dict__)
+    for key, value in (overrides or {}).items():
+        setattr(env, key, value)
+    return env
+
+
+def unload_firmware() -> None:
+    """Descarga los módulos del firmware para forzar un arranque limpio."""
+    for name in list(sys.modules):
+        if name.split(".")[0] in FIRMWARE_MODULES:
+            del sys.modules[name]
+
+
+def install(env: Optional[Dict[str, Any]] = None, board: Optional[Board] = None,
+            flash_dir: Optional[str] = None, bme280: bool = True) -> Board:
+    """
+    Instala el emulador: placa activa, módulos de MicroPython, ``env`` y
+    sistema de ficheros.
+
+    Args:
+        env: Valores que sobrescriben los de src/.env.example.py.
+        board: Placa a usar. Por defecto una nueva.
+        flash_dir: Directorio que hace de flash (LittleFS). Por defecto uno temporal.
+        bme280: Conecta un BME280 emulado en la dirección configurada del bus 0.
+
+    Returns:
+        Board: Placa activa.
+    """
+    board = set_board(board or Board())
+
+    for path in (ROOT_DIR, MODULES_DIR, SRC_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    # Módulos emulados con estado ligado a la placa anterior
+    for name in ("machine", "network", "ntptime", "usocket", "urequests", "uasyncio"):
+        sys.modules.pop(name, None)
+
+    _patch_time(board)
+    _patch_gc(board)
+
+    unload_firmware()
+    env_module = make_env(env)
+    sys.modules["env"] = env_module
+
+    if bme280 and getattr(env_module, "BME280", False):
+        address = getattr(env_module, "BME280_ADDRESS", 0x76)
+        if address not in board.i2c.get(0, {}):
+            board.add_i2c_device(0, address, BME280Model())
+
+    if getattr(env_module, "AP_NAME", "") and not board.access_points:
+        board.add_access_point(env_module.AP_NAME, getattr(env_module, "AP_PASS", ""))
+
+    board.flash_dir = flash_dir or tempfile.mkdtemp(prefix="smartplant-flash-")
+    os.chdir(board.flash_dir)
+
+    return board
+
+
+def run_firmware(duration_ms: Optional[int] = None, max_boots: int = 100,
+                 script: str = "main.py") -> Dict[str, Any]:
+    """
+    Ejecuta src/main.py sobre la placa activa hasta agotar el tiempo simulado.
+
+    Los deepsleep y machine.reset() reinician el firmware conservando la
+    flash y el reloj, como en el dispositivo.
+
+    Args:
+        duration_ms: Tiempo simulado total (desde ahora).
+        max_boots: Número máximo de arranques.
+        script: Script de arranque dentro de src/.
+
+    Returns:
+        dict: Variables globales del último arranque (scheduler, system...).
+    """
+    import machine
+
+    board = get_board()
+    if duration_ms is not None:
+        board.clock.set_deadline_ms(board.clock.now_us // 1000 + duration_ms)
+
+    path = os.path.join(SRC_DIR, script)
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+
+    env_module = sys.modules["env"]
+    namespace: Dict[str, Any] = {}
+
+    try:
+        for _ in range(max_boots):
+            unload_firmware()
+            sys.modules["env"] = env_module
+            namespace = {"__name__": "__main__", "__file__": path}
+            board.stats.add("boots")
+
+            try:
+                exec(code, namespace)
+                break
+            except machine.DeepSleep as e:
+                board.stats.add("deepsleeps")
+                for radio in board.radios:
+                    radio.active(False)
+                board.clock.sleep_ms(e.ms)
+                machine._set_reset_cause(machine.DEEPSLEEP_RESET)
+            except machine.Reset:
+                machine._set_reset_cause(machine.SOFT_RESET)
+    except SimulationEnd:
+        pass
+    finally:
+        board.clock.set_deadline_ms(None)
+
+    return namespace
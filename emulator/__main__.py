@@ -0,0 +1,83 @@
+"""
+Ejecuta el firmware completo sobre el emulador y muestra las métricas.
+
+Uso:
+  python -m emulator [--duration-s 3600] [--env CLAVE=VALOR ...] [--report salida.json]
+
+Los valores de --env se evalúan como literales de Python (True, 30, "texto").
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+
+import emulator
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ejecuta el firmware de SmartPlant en el emulador")
+    parser.add_argument("--duration-s", type=float, default=3600, help="Tiempo simulado en segundos")
+    parser.add_argument("--env", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Sobrescribe una variable de env.py")
+    parser.add_argument("--report", help="Fichero JSON donde guardar las métricas")
+    parser.add_argument("--no-api", action="store_true", help="No arrancar el servidor local de la API")
+    return parser.parse_args()
+
+
+def parse_env(items) -> dict:
+    overrides = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        try:
+            overrides[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            overrides[key] = value
+    return overrides
+
+
+def main() -> int:
+    args = parse_args()
+    overrides = {"AP_NAME": "SmartPlant-Lab", "AP_PASS": "smartplant", "DEBUG": False}
+
+    server = None
+    if not args.no_api:
+        server = emulator.ApiStandIn().start()
+        overrides["API_URL"] = server.url
+
+    overrides.update(parse_env(args.env))
+
+    report_path = os.path.abspath(args.report) if args.report else None
+    board = emulator.install(env=overrides)
+
+    started = time.perf_counter()
+    namespace = emulator.run_firmware(duration_ms=int(args.duration_s * 1000))
+    wall_s = time.perf_counter() - started
+
+    report = {
+        "wall_time_s": round(wall_s, 3),
+        "board": board.get_stats(),
+    }
+
+    scheduler = namespace.get("scheduler")
+    if scheduler is not None:
+        report["scheduler"] = scheduler.get_stats()
+
+    if server is not None:
+        report["api"] = server.get_stats()
+        server.stop()
+
+    output = json.dumps(report, indent=2, default=str)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
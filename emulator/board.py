@@ -0,0 +1,253 @@
+"""
+Modelo de la placa emulada: reloj, señales analógicas, buses I2C, puntos de
+acceso Wi-Fi, parámetros de red y contadores de E/S.
+
+Los módulos falsos (machine, network, usocket...) consultan siempre la placa
+activa, de modo que una prueba o benchmark solo tiene que configurarla antes
+de importar el firmware.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from emulator.clock import SimClock
+
+Signal = Union[int, float, Callable[[float], float]]
+
+# Canal ADC de cada GPIO analógico del RP2040
+ADC_PIN_CHANNELS = {26: 0, 27: 1, 28: 2, 29: 3}
+ADC_TEMP_CHANNEL = 4
+
+VREF = 3.3
+
+
+def volts_to_u16(volts: float) -> int:
+    """Convierte un voltaje en el pin a la lectura de 16 bits de read_u16()."""
+    raw = int(round(volts / VREF * 65535))
+    return max(0, min(65535, raw))
+
+
+class Counters(dict):
+    """Diccionario de contadores que se incrementa con ``add``."""
+
+    def add(self, key: str, value: int = 1) -> None:
+        self[key] = self.get(key, 0) + value
+
+
+_bssid_seq = 0
+
+
+def _next_bssid() -> bytes:
+    global _bssid_seq
+    _bssid_seq += 1
+    return bytes([0x02, 0x00, 0x00, 0x00, 0x00, _bssid_seq & 0xFF])
+
+
+class AccessPoint:
+    """
+    Punto de acceso visible para el Wi-Fi emulado.
+
+    :param rssi: Potencia en dBm o función del tiempo simulado en ms.
+    """
+
+    def __init__(self, ssid: str, password: str, bssid: bytes = None,
+                 channel: int = 6, rssi: Signal = -55, security: int = 3,
+                 available: bool = True):
+        self.ssid = ssid
+        self.password = password
+        self.bssid = bssid or _next_bssid()
+        self.channel = channel
+        self.rssi = rssi
+        self.security = security
+        self.available = available
+
+    def get_rssi(self, t_ms: float) -> int:
+        value = self.rssi(t_ms) if callable(self.rssi) else self.rssi
+        return int(value)
+
+
+class NetworkProfile:
+    """
+    Costes simulados de red, en milisegundos de tiempo simulado.
+    """
+
+    def __init__(self):
+        self.scan_ms = 2200  # Escaneo activo de todos los canales
+        self.connect_ms = 2500  # Asociación + autenticación + DHCP
+        self.connect_known_bssid_ms = 900  # Conexión directa a BSSID/canal conocido
+        self.dhcp_ms = 400  # Negociación DHCP incluida en los tiempos de conexión
+        self.connect_fail_ms = 5000  # Tiempo hasta dar por fallida la asociación
+        self.dns_ms = 40  # Resolución DNS
+        self.tcp_connect_ms = 30  # Handshake TCP (1 RTT)
+        self.request_rtt_ms = 30  # Ida y vuelta de una petición
+        self.throughput_kbps = 2000  # Ancho de banda efectivo
+        self.ntp_ms = 60
+
+
+class Board:
+    """
+    Estado de la placa emulada.
+
+    :param seed: Semilla para el ruido de las señales (resultados repetibles).
+    """
+
+    def __init__(self, seed: int = 1):
+        self.clock = SimClock()
+        self.random = random.Random(seed)
+        self.unique_id = bytes([0xE6, 0x61, 0x64, 0x08, 0x43, 0x11, 0x40, 0x21])
+        self.mac = bytes([0x28, 0xCD, 0xC1, 0x00, 0x00, 0x01])
+        self.heap_size = 200 * 1024
+
+        # Señales analógicas por canal ADC (0-4) y ruido en cuentas de 16 bits
+        self.adc: Dict[int, Signal] = {
+            0: volts_to_u16(1.95),  # GPIO26: batería 3.9V con divisor 1:2
+            1: volts_to_u16(2.6),  # GPIO27: humedad en tierra
+            2: volts_to_u16(2.4),  # GPIO28
+            3: volts_to_u16(1.6),  # GPIO29: VSYS/3
+            ADC_TEMP_CHANNEL: volts_to_u16(0.706 - (25.0 - 27) * 0.001721),
+        }
+        self.adc_noise = 0
+        self.adc_conversion_us = 2
+
+        # Entradas digitales: valor fijo o función del tiempo en ms
+        self.pins: Dict[Any, Signal] = {}
+        self.irq_pins: Dict[Any, Any] = {}
+        self._square_waves: Dict[Any, float] = {}
+
+        # Fecha inicial del RTC (segundos desde epoch)
+        self.rtc_epoch = 1754740800  # 2025-08-09 12:00:00 UTC
+
+        # Dispositivos I2C por bus y dirección
+        self.i2c: Dict[int, Dict[int, Any]] = {0: {}, 1: {}}
+
+        # Wi-Fi y red
+        self.access_points: List[AccessPoint] = []
+        self.radios: List[Any] = []
+        self.network = NetworkProfile()
+        self.ip = "192.168.1.100"
+
+        # Contadores de E/S
+        self.stats = Counters()
+
+    # ------------------------ Configuración ------------------------
+
+    def set_adc(self, pin_or_channel: int, value: Signal) -> None:
+        """
+        Fija la señal de un canal ADC. Acepta el GPIO (26-29) o el canal (0-4).
+        El valor es una lectura de 16 bits o una función del tiempo en ms.
+        """
+        channel = ADC_PIN_CHANNELS.get(pin_or_channel, pin_or_channel)
+        self.adc[channel] = value
+
+    def set_adc_volts(self, pin_or_channel: int, volts: float) -> None:
+        self.set_adc(pin_or_channel, volts_to_u16(volts))
+
+    def set_pin(self, pin: Any, value: Signal) -> None:
+        self.pins[pin] = value
+
+    def set_pin_frequency(self, pin: Any, hz: float) -> None:
+        """
+        Genera una onda cuadrada en una entrada digital (sensores por
+        frecuencia como los Grow de Pimoroni). Los flancos disparan las IRQ
+        registradas con Pin.irq().
+        """
+        self._square_waves[pin] = hz
+        half_us = 500000 / hz if hz > 0 else 0
+
+        def level(t_ms: float, half_us=half_us) -> int:
+            if not half_us:
+                return 0
+            return int((t_ms * 1000) // half_us) % 2
+
+        self.pins[pin] = level
+
+        if half_us:
+            self._schedule_edge(pin, hz)
+
+    def _schedule_edge(self, pin: Any, hz: float) -> None:
+        half_us = 500000 / hz
+        now = self.clock.now_us
+        # El instante de cada flanco se trunca a µs: el +1 evita repetir el
+        # mismo flanco cuando half_us no es entero
+        n = int((now + 1) // half_us) + 1
+        when = int(n * half_us)
+
+        def edge() -> None:
+            if self._square_waves.get(pin) != hz:
+                return
+            handler = self.irq_pins.get(pin)
+            if handler is not None:
+                handler._fire_irq(n % 2 == 1)
+            self._schedule_edge(pin, hz)
+
+        self.clock.call_at(max(when, now + 1), edge)
+
+    def add_i2c_device(self, bus: int, address: int, device: Any) -> Any:
+        device.board = self
+        self.i2c.setdefault(bus, {})[address] = device
+        return device
+
+    def add_access_point(self, ssid: str, password: str, **kwargs) -> AccessPoint:
+        ap = AccessPoint(ssid, password, **kwargs)
+        self.access_points.append(ap)
+        return ap
+
+    # ------------------------ Lecturas ------------------------
+
+    def now_ms(self) -> float:
+        return self.clock.now_us / 1000
+
+    def read_adc(self, channel: int) -> int:
+        signal = self.adc.get(channel, 0)
+        value = signal(self.now_ms()) if callable(signal) else signal
+
+        if self.adc_noise:
+            value += self.random.randint(-self.adc_noise, self.adc_noise)
+
+        self.stats.add("adc_reads")
+        self.clock.advance_us(self.adc_conversion_us)
+
+        return max(0, min(65535, int(value)))
+
+    def read_pin(self, pin: Any) -> int:
+        signal = self.pins.get(pin, 0)
+        value = signal(self.now_ms()) if callable(signal) else signal
+        return 1 if value else 0
+
+    def find_ap(self, ssid: str = None, bssid: bytes = None) -> Optional[AccessPoint]:
+        for ap in self.access_points:
+            if not ap.available:
+                continue
+            if bssid is not None and ap.bssid != bssid:
+                continue
+            if ssid is not None and ap.ssid != ssid:
+                continue
+            return ap
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Devuelve el tiempo simulado y los contadores de E/S."""
+        for radio in self.radios:
+            radio._account_radio()
+
+        stats = dict(self.stats)
+        stats["sim_time_ms"] = self.clock.now_us // 1000
+        return stats
+
+
+_board: Optional[Board] = None
+
+
+def get_board() -> Board:
+    """Devuelve la placa activa, creándola si no existe."""
+    global _board
+    if _board is None:
+        _board = Board()
+    return _board
+
+
+def set_board(board: Board) -> Board:
+    global _board
+    _board = board
+    return board
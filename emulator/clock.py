@@ -0,0 +1,113 @@
+"""
+Reloj simulado del emulador.
+
+Todo el tiempo que ve el firmware (ticks_ms, sleep_ms, RTC, temporizadores,
+esperas de uasyncio, latencias de I2C y red) sale de este reloj, que solo
+avanza cuando el firmware espera o hace E/S. Así miles de ciclos del bucle
+principal se ejecutan en segundos y los resultados son repetibles.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Callable, List, Optional, Tuple
+
+# Los ticks de MicroPython se desbordan cada 2^30 unidades
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+
+class SimulationEnd(BaseException):
+    """
+    Se lanza cuando el reloj alcanza el límite de la simulación.
+
+    Hereda de BaseException para que los ``except Exception`` del firmware
+    no la capturen.
+    """
+
+
+class SimClock:
+    """
+    Reloj monotónico simulado con resolución de microsegundos.
+
+    :param deadline_ms: Tiempo simulado máximo. Al alcanzarlo se lanza
+                        SimulationEnd.
+    """
+
+    def __init__(self, deadline_ms: Optional[int] = None):
+        self.now_us = 0
+        self.deadline_us = deadline_ms * 1000 if deadline_ms is not None else None
+        self._timers: List[Tuple[int, int, Callable[[], None]]] = []
+        self._seq = 0
+
+    # ------------------------ Ticks ------------------------
+
+    def ticks_ms(self) -> int:
+        return (self.now_us // 1000) & TICKS_MAX
+
+    def ticks_us(self) -> int:
+        return self.now_us & TICKS_MAX
+
+    def ticks_cpu(self) -> int:
+        return self.now_us & TICKS_MAX
+
+    @staticmethod
+    def ticks_add(ticks: int, delta: int) -> int:
+        return (ticks + delta) & TICKS_MAX
+
+    @staticmethod
+    def ticks_diff(ticks1: int, ticks2: int) -> int:
+        return ((ticks1 - ticks2 + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+    # ------------------------ Avance ------------------------
+
+    def set_deadline_ms(self, deadline_ms: Optional[int]) -> None:
+        """Fija el límite absoluto de la simulación (None para quitarlo)."""
+        self.deadline_us = deadline_ms * 1000 if deadline_ms is not None else None
+
+    def call_at(self, when_us: int, callback: Callable[[], None]) -> int:
+        """
+        Programa un callback (IRQ simulada) para un instante absoluto.
+
+        Returns:
+            int: Identificador para cancelar el callback.
+        """
+        self._seq += 1
+        heapq.heappush(self._timers, (when_us, self._seq, callback))
+        return self._seq
+
+    def cancel(self, timer_id: int) -> None:
+        self._timers = [t for t in self._timers if t[1] != timer_id]
+        heapq.heapify(self._timers)
+
+    def advance_to(self, when_us: int) -> None:
+        """
+        Avanza el reloj hasta un instante absoluto disparando por el camino
+        los callbacks programados.
+        """
+        if when_us < self.now_us:
+            return
+
+        while self._timers and self._timers[0][0] <= when_us:
+            due, _, callback = heapq.heappop(self._timers)
+            self._move(max(due, self.now_us))
+            callback()
+
+        self._move(when_us)
+
+    def advance_us(self, us: int) -> None:
+        if us > 0:
+            self.advance_to(self.now_us + int(us))
+
+    def sleep_ms(self, ms) -> None:
+        self.advance_us(int(ms * 1000))
+
+    def sleep_us(self, us) -> None:
+        self.advance_us(int(us))
+
+    def _move(self, when_us: int) -> None:
+        if self.deadline_us is not None and when_us >= self.deadline_us:
+            self.now_us = self.deadline_us
+            raise SimulationEnd()
+
+        self.now_us = when_us
@@ -0,0 +1 @@
+"""Modelos de dispositivos I2C emulados."""
@@ -0,0 +1,281 @@
+"""
+Modelo a nivel de registros de un BME280/BMP280.
+
+Implementa el mapa de registros del datasheet de Bosch: identificador,
+calibración (0x88-0xA1 y 0xE1-0xE7), reset, ctrl_hum, status, ctrl_meas,
+config y los registros de datos (0xF7-0xFE). Los valores raw se obtienen
+invirtiendo las fórmulas de compensación del datasheet para que el driver,
+al compensarlos, recupere las condiciones ambientales configuradas.
+
+Los modos sleep, forced y normal se modelan con el tiempo simulado: en modo
+forced el bit ``measuring`` del registro de estado permanece activo durante
+el tiempo máximo de medida del datasheet.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Callable, Union
+
+Value = Union[float, Callable[[float], float]]
+
+CHIP_ID_BME280 = 0x60
+CHIP_ID_BMP280 = 0x58
+
+REG_CALIB00 = 0x88
+REG_CHIPID = 0xD0
+REG_RESET = 0xE0
+REG_CALIB26 = 0xE1
+REG_CTRL_HUM = 0xF2
+REG_STATUS = 0xF3
+REG_CTRL_MEAS = 0xF4
+REG_CONFIG = 0xF5
+REG_DATA = 0xF7
+
+MODE_SLEEP = 0
+MODE_FORCED = 1
+MODE_NORMAL = 3
+
+# Factor de oversampling para cada valor de osrs_x
+OVERSAMPLING = (0, 1, 2, 4, 8, 16, 16, 16)
+
+# Standby en modo normal (ms) para cada valor de t_sb
+STANDBY_MS = (0.5, 62.5, 125, 250, 500, 1000, 10, 20)
+
+# Calibración típica (ejemplo del datasheet y valores habituales de humedad)
+DEFAULT_CALIBRATION = {
+    "t1": 27504, "t2": 26435, "t3": -1000,
+    "p1": 36477, "p2": -10685, "p3": 3024, "p4": 2855, "p5": 140,
+    "p6": -7, "p7": 15500, "p8": -14600, "p9": 6000,
+    "h1": 75, "h2": 362, "h3": 0, "h4": 313, "h5": 50, "h6": 30,
+}
+
+
+def measurement_time_max_ms(osrs_t: int, osrs_p: int, osrs_h: int) -> float:
+    """Tiempo máximo de medida según el apéndice B del datasheet."""
+    t = 1.25
+    if osrs_t:
+        t += 2.3 * OVERSAMPLING[osrs_t]
+    if osrs_p:
+        t += 2.3 * OVERSAMPLING[osrs_p] + 0.575
+    if osrs_h:
+        t += 2.3 * OVERSAMPLING[osrs_h] + 0.575
+    return t
+
+
+class BME280Model:
+    """
+    Sensor BME280 (o BMP280 con ``bmp280=True``) emulado.
+
+    :param temperature: Temperatura en °C o función del tiempo en ms.
+    :param pressure: Presión en hPa o función del tiempo en ms.
+    :param humidity: Humedad relativa en % o función del tiempo en ms.
+    """
+
+    def __init__(self, temperature: Value = 21.5, pressure: Value = 1013.25,
+                 humidity: Value = 45.0, bmp280: bool = False,
+                 calibration: dict = None):
+        self.board = None
+        self.temperature = temperature
+        self.pressure = pressure
+        self.humidity = humidity
+        self.bmp280 = bmp280
+        self.cal = dict(DEFAULT_CALIBRATION)
+        if calibration:
+            self.cal.update(calibration)
+        if bmp280:
+            for key in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                self.cal[key] = 0
+
+        self.regs = bytearray(256)
+        self._conversion_end_us = 0
+        self._mode_since_us = 0
+
+        # Métricas
+        self.conversions = 0
+        self.active_us = 0  # Tiempo acumulado midiendo (consumo)
+        self.register_reads = 0
+        self.register_writes = 0
+
+        self._reset()
+
+    # ------------------------ Registros ------------------------
+
+    def _reset(self) -> None:
+        regs = self.regs
+        for i in range(256):
+            regs[i] = 0
+
+        c = self.cal
+        regs[REG_CHIPID] = CHIP_ID_BMP280 if self.bmp280 else CHIP_ID_BME280
+        struct.pack_into("<HhhHhhhhhhhh", regs, REG_CALIB00,
+                         c["t1"], c["t2"], c["t3"], c["p1"], c["p2"], c["p3"],
+                         c["p4"], c["p5"], c["p6"], c["p7"], c["p8"], c["p9"])
+        regs[0xA1] = c["h1"] & 0xFF
+        struct.pack_into("<hB", regs, REG_CALIB26, c["h2"], c["h3"] & 0xFF)
+        h4 = c["h4"]
+        h5 = c["h5"]
+        regs[0xE4] = (h4 >> 4) & 0xFF
+        regs[0xE5] = (h4 & 0x0F) | ((h5 & 0x0F) << 4)
+        regs[0xE6] = (h5 >> 4) & 0xFF
+        struct.pack_into("<b", regs, 0xE7, c["h6"])
+
+        # Registros de datos tras reset
+        regs[0xF7:0xFD] = bytes([0x80, 0x00, 0x00, 0x80, 0x00, 0x00])
+        regs[0xFD:0xFF] = bytes([0x80, 0x00])
+
+    def _now_us(self) -> int:
+        return self.board.clock.now_us if self.board else 0
+
+    def _mode(self) -> int:
+        return self.regs[REG_CTRL_MEAS] & 0x03
+
+    def _osrs(self):
+        meas = self.regs[REG_CTRL_MEAS]
+        osrs_h = 0 if self.bmp280 else self.regs[REG_CTRL_HUM] & 0x07
+        return (meas >> 5) & 0x07, (meas >> 2) & 0x07, osrs_h
+
+    def _update(self) -> None:
+        """Actualiza estado y datos según el modo y el tiempo simulado."""
+        now = self._now_us()
+        mode = self._mode()
+
+        if mode in (1, 2):
+            if now >= self._conversion_end_us:
+                self._latch()
+                # Al terminar la medida forzada el sensor vuelve a sleep
+                self.regs[REG_CTRL_MEAS] &= 0xFC
+                self.regs[REG_STATUS] &= ~0x08
+            else:
+                self.regs[REG_STATUS] |= 0x08
+        elif mode == MODE_NORMAL:
+            # En modo normal el sensor mide sin parar: se contabiliza el
+            # tiempo activo proporcional al ciclo medida + standby
+            osrs_t, osrs_p, osrs_h = self._osrs()
+            t_meas = measurement_time_max_ms(osrs_t, osrs_p, osrs_h)
+            t_sb = STANDBY_MS[(self.regs[REG_CONFIG] >> 5) & 0x07]
+            elapsed = now - self._mode_since_us
+            if elapsed > 0:
+                cycles = elapsed / ((t_meas + t_sb) * 1000)
+                self.active_us += int(cycles * t_meas * 1000)
+                self.conversions += int(cycles)
+                self._mode_since_us = now
+            self._latch()
+            self.regs[REG_STATUS] &= ~0x08
+
+    def _start_forced(self) -> None:
+        osrs_t, osrs_p, osrs_h = self._osrs()
+        t_meas = measurement_time_max_ms(osrs_t, osrs_p, osrs_h)
+        self._conversion_end_us = self._now_us() + int(t_meas * 1000)
+        self.active_us += int(t_meas * 1000)
+        self.conversions += 1
+        self.regs[REG_STATUS] |= 0x08
+
+    def read(self, register: int, length: int) -> bytes:
+        self._update()
+        self.register_reads += 1
+        out = bytearray(length)
+        for i in range(length):
+            out[i] = self.regs[(register + i) & 0xFF]
+        return bytes(out)
+
+    def write(self, register: int, data: bytes) -> None:
+        self.register_writes += 1
+        for i, value in enumerate(data):
+            reg = (register + i) & 0xFF
+
+            if reg == REG_RESET:
+                if value == 0xB6:
+                    self._reset()
+                continue
+
+            if reg in (REG_CTRL_HUM, REG_CONFIG):
+                self.regs[reg] = value
+                continue
+
+            if reg == REG_CTRL_MEAS:
+                self._update()
+                self.regs[reg] = value
+                mode = value & 0x03
+                self._mode_since_us = self._now_us()
+                if mode in (1, 2):
+                    self._start_forced()
+                continue
+
+    # ------------------------ Conversión ------------------------
+
+    def _value(self, value: Value) -> float:
+        return value(self._now_us() / 1000) if callable(value) else value
+
+    def _latch(self) -> None:
+        """Calcula los valores raw y los copia en los registros de datos."""
+        osrs_t, osrs_p, osrs_h = self._osrs()
+
+        t_raw = self._raw_temperature(self._value(self.temperature)) if osrs_t else 0x80000
+        t_fine = self._t_fine(t_raw)
+        p_raw = self._raw_pressure(self._value(self.pressure), t_fine) if osrs_p else 0x80000
+        h_raw = self._raw_humidity(self._value(self.humidity), t_fine) if osrs_h else 0x8000
+
+        regs = self.regs
+        regs[0xF7] = (p_raw >> 12) & 0xFF
+        regs[0xF8] = (p_raw >> 4) & 0xFF
+        regs[0xF9] = (p_raw << 4) & 0xF0
+        regs[0xFA] = (t_raw >> 12) & 0xFF
+        regs[0xFB] = (t_raw >> 4) & 0xFF
+        regs[0xFC] = (t_raw << 4) & 0xF0
+        regs[0xFD] = (h_raw >> 8) & 0xFF
+        regs[0xFE] = h_raw & 0xFF
+
+    def _t_fine(self, t_raw: int) -> int:
+        c = self.cal
+        var1 = (t_raw / 16384.0 - c["t1"] / 1024.0) * c["t2"]
+        var2 = (t_raw / 131072.0 - c["t1"] / 8192.0) ** 2 * c["t3"]
+        return int(var1 + var2)
+
+    def _compensate_pressure(self, p_raw: int, t_fine: int) -> float:
+        c = self.cal
+        var1 = t_fine / 2.0 - 64000.0
+        var2 = var1 * var1 * c["p6"] / 32768.0
+        var2 = var2 + var1 * c["p5"] * 2.0
+        var2 = var2 / 4.0 + c["p4"] * 65536.0
+        var1 = (c["p3"] * var1 * var1 / 524288.0 + c["p2"] * var1) / 524288.0
+        var1 = (1.0 + var1 / 32768.0) * c["p1"]
+        if var1 == 0:
+            return 0.0
+        p = 1048576.0 - p_raw
+        p = (p - var2 / 4096.0) * 6250.0 / var1
+        var1 = c["p9"] * p * p / 2147483648.0
+        var2 = p * c["p8"] / 32768.0
+        return (p + (var1 + var2 + c["p7"]) / 16.0) / 100.0
+
+    def _compensate_humidity(self, h_raw: int, t_fine: int) -> float:
+        c = self.cal
+        h = t_fine - 76800.0
+        h = ((h_raw - (c["h4"] * 64.0 + c["h5"] / 16384.0 * h)) *
+             (c["h2"] / 65536.0 * (1.0 + c["h6"] / 67108864.0 * h *
+                                   (1.0 + c["h3"] / 67108864.0 * h))))
+        return h * (1.0 - c["h1"] * h / 524288.0)
+
+    @staticmethod
+    def _search(func, target: float, lo: int, hi: int, increasing: bool) -> int:
+        """Búsqueda binaria del valor raw cuyo resultado compensado es target."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = func(mid)
+            if (value < target) == increasing:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _raw_temperature(self, celsius: float) -> int:
+        return self._search(lambda raw: self._t_fine(raw) / 5120.0, celsius,
+                            0, (1 << 20) - 1, True)
+
+    def _raw_pressure(self, hpa: float, t_fine: int) -> int:
+        return self._search(lambda raw: self._compensate_pressure(raw, t_fine),
+                            hpa, 0, (1 << 20) - 1, False)
+
+    def _raw_humidity(self, percent: float, t_fine: int) -> int:
+        percent = max(0.0, min(100.0, percent))
+        return self._search(lambda raw: self._compensate_humidity(raw, t_fine),
+                            percent, 0, (1 << 16) - 1, True)
@@ -0,0 +1,299 @@
+"""
+Módulo ``machine`` emulado: ADC, Pin, I2C, SPI, RTC, Timer y funciones de
+energía respaldados por la placa emulada y el reloj simulado.
+"""
+import time as _time
+
+from emulator.board import ADC_PIN_CHANNELS, ADC_TEMP_CHANNEL, get_board
+
+PWRON_RESET = 1
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+_reset_cause = PWRON_RESET
+
+
+class DeepSleep(BaseException):
+    """
+    Se lanza al entrar en deepsleep. El ejecutor del emulador la captura,
+    avanza el reloj y vuelve a arrancar el firmware como tras un reinicio.
+    """
+
+    def __init__(self, ms):
+        super().__init__(ms)
+        self.ms = ms
+
+
+class Reset(BaseException):
+    """Se lanza con machine.reset(); el ejecutor reinicia el firmware."""
+
+
+def unique_id():
+    return get_board().unique_id
+
+
+def freq(hz=None):
+    return 125000000
+
+
+def idle():
+    get_board().clock.advance_us(1)
+
+
+def lightsleep(ms=None):
+    if ms:
+        get_board().clock.sleep_ms(ms)
+
+
+def deepsleep(ms=None):
+    raise DeepSleep(ms or 0)
+
+
+def reset():
+    raise Reset()
+
+
+def soft_reset():
+    raise Reset()
+
+
+def reset_cause():
+    return _reset_cause
+
+
+def _set_reset_cause(cause):
+    global _reset_cause
+    _reset_cause = cause
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
+
+
+class ADC:
+    CORE_TEMP = ADC_TEMP_CHANNEL
+
+    def __init__(self, pin):
+        if isinstance(pin, Pin):
+            pin = pin.id
+        self.channel = ADC_PIN_CHANNELS.get(pin, pin)
+        get_board().stats.add("adc_objects")
+
+    def read_u16(self):
+        return get_board().read_adc(self.channel)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+    IRQ_DISABLE = 0
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 0
+        self._irq_handler = None
+        self._irq_trigger = 0
+        if value is not None:
+            self._value = 1 if value else 0
+
+    def init(self, mode=None, pull=None, value=None):
+        if mode is not None:
+            self.mode = mode
+        if pull is not None:
+            self.pull = pull
+        if value is not None:
+            self._value = 1 if value else 0
+
+    def value(self, v=None):
+        if v is None:
+            if self.mode == Pin.OUT:
+                return self._value
+            return get_board().read_pin(self.id)
+        self._value = 1 if v else 0
+        get_board().stats.add("gpio_writes")
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(0 if self._value else 1)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._irq_handler = handler if trigger else None
+        self._irq_trigger = trigger
+        get_board().irq_pins[self.id] = self if self._irq_handler else None
+        return self
+
+    def _fire_irq(self, rising):
+        """Llamado por la placa al detectar un flanco en la señal del pin."""
+        if not self._irq_handler:
+            return
+        if rising and self._irq_trigger & Pin.IRQ_RISING:
+            self._irq_handler(self)
+        elif not rising and self._irq_trigger & Pin.IRQ_FALLING:
+            self._irq_handler(self)
+
+
+class I2C:
+    """
+    Bus I2C emulado. Cada transacción avanza el reloj según los bits
+    transmitidos a la frecuencia configurada.
+    """
+
+    def __init__(self, id=0, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.freq = freq
+        self._board = get_board()
+
+    def _device(self, addr):
+        device = self._board.i2c.get(self.id, {}).get(addr)
+        if device is None:
+            raise OSError(5)  # EIO, sin ACK del dispositivo
+        return device
+
+    def _transfer(self, nbytes):
+        # START + dirección + datos (9 bits por byte) + STOP
+        bits = 2 + 9 * (1 + nbytes)
+        self._board.clock.advance_us(bits * 1000000 // self.freq + 1)
+        self._board.stats.add("i2c_transactions")
+        self._board.stats.add("i2c_bytes", nbytes)
+        self._board.stats.add(f"i2c{self.id}_bytes", nbytes)
+
+    def scan(self):
+        devices = sorted(self._board.i2c.get(self.id, {}).keys())
+        # Un sondeo por cada dirección válida
+        self._board.clock.advance_us(112 * 20 * 1000000 // self.freq)
+        self._board.stats.add("i2c_scans")
+        return devices
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        device = self._device(addr)
+        self._transfer(1)
+        self._transfer(nbytes)
+        return device.read(memaddr, nbytes)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        data = self.readfrom_mem(addr, memaddr, len(buf), addrsize)
+        buf[:len(data)] = data
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        device = self._device(addr)
+        self._transfer(1 + len(buf))
+        device.write(memaddr, bytes(buf))
+
+    def readfrom(self, addr, nbytes, stop=True):
+        device = self._device(addr)
+        self._transfer(nbytes)
+        return device.read(getattr(device, "pointer", 0), nbytes)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto(self, addr, buf, stop=True):
+        device = self._device(addr)
+        self._transfer(len(buf))
+        if len(buf):
+            device.pointer = buf[0]
+            if len(buf) > 1:
+                device.write(buf[0], bytes(buf[1:]))
+        return len(buf)
+
+
+class SPI:
+    def __init__(self, id=0, baudrate=1000000, sck=None, mosi=None, miso=None, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+
+    def write(self, buf):
+        get_board().clock.advance_us(len(buf) * 8 * 1000000 // self.baudrate)
+
+    def read(self, nbytes, write=0x00):
+        self.write(bytes(nbytes))
+        return bytes(nbytes)
+
+    def write_readinto(self, write_buf, read_buf):
+        self.write(write_buf)
+
+
+class RTC:
+    """RTC emulado: fecha inicial configurable más el tiempo simulado."""
+
+    def __init__(self):
+        self._board = get_board()
+
+    def datetime(self, value=None):
+        board = self._board
+        if value is not None:
+            year, month, day, weekday, hour, minute, second, _ = value
+            epoch = _time.mktime((year, month, day, hour, minute, second, 0, 0, 0))
+            board.rtc_epoch = epoch - board.clock.now_us // 1000000
+            return None
+
+        seconds = board.rtc_epoch + board.clock.now_us // 1000000
+        t = _time.localtime(seconds)
+        return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_wday, t.tm_hour,
+                t.tm_min, t.tm_sec, 0)
+
+
+class Timer:
+    """Temporizador hardware emulado sobre el reloj simulado."""
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, mode=PERIODIC, period=-1, freq=None, callback=None):
+        self._board = get_board()
+        self._timer_id = None
+        if callback is not None:
+            self.init(mode=mode, period=period, freq=freq, callback=callback)
+
+    def init(self, mode=PERIODIC, period=-1, freq=None, callback=None, tick_hz=1000):
+        self.deinit()
+        if freq is not None:
+            self._period_us = int(1000000 / freq)
+        else:
+            self._period_us = int(period * 1000000 / tick_hz)
+        self._mode = mode
+        self._callback = callback
+        self._schedule(self._board.clock.now_us + self._period_us)
+
+    def _schedule(self, when_us):
+        self._timer_id = self._board.clock.call_at(when_us, lambda: self._fire(when_us))
+
+    def _fire(self, when_us):
+        self._timer_id = None
+        if self._mode == Timer.PERIODIC:
+            self._schedule(when_us + max(1, self._period_us))
+        self._board.stats.add("timer_irqs")
+        if self._callback:
+            self._callback(self)
+
+    def deinit(self):
+        if self._timer_id is not None:
+            self._board.clock.cancel(self._timer_id)
+            self._timer_id = None
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+
+    def feed(self):
+        pass
@@ -0,0 +1,32 @@
+"""
+Módulo ``micropython`` emulado. Los decoradores de emisores de código
+(native, viper) no tienen efecto en CPython.
+"""
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def schedule(func, arg):
+    func(arg)
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def mem_info(verbose=None):
+    pass
+
+
+def opt_level(level=None):
+    return 0
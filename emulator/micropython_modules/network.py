@@ -0,0 +1,216 @@
+"""
+Módulo ``network`` emulado para el CYW43 de la Pico W.
+
+La conexión avanza con el reloj simulado: ``connect()`` deja la interfaz en
+STAT_CONNECTING y el estado pasa a STAT_GOT_IP (o a un error) cuando ha
+transcurrido el tiempo de conexión configurado en la placa. El tiempo con la
+radio activa se contabiliza en los contadores de la placa.
+"""
+from emulator.board import get_board
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+STAT_CONNECT_FAIL = -1
+STAT_NO_AP_FOUND = -2
+STAT_WRONG_PASSWORD = -3
+
+_hostname = "PicoW"
+_country = "XX"
+_interfaces = {}
+
+
+def hostname(name=None):
+    global _hostname
+    if name is None:
+        return _hostname
+    _hostname = name
+
+
+def country(code=None):
+    global _country
+    if code is None:
+        return _country
+    _country = code
+
+
+class WLAN:
+    PM_NONE = 0x000010
+    PM_PERFORMANCE = 0xA11142
+    PM_POWERSAVE = 0x111022
+
+    def __new__(cls, interface=STA_IF):
+        # Igual que en MicroPython, cada interfaz es un único objeto
+        board = get_board()
+        key = (id(board), interface)
+        instance = _interfaces.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._init(board, interface)
+            _interfaces[key] = instance
+        return instance
+
+    def __init__(self, interface=STA_IF):
+        pass
+
+    def _init(self, board, interface):
+        self._board = board
+        self._interface = interface
+        board.radios.append(self)
+        self._active = False
+        self._active_since = 0
+        self._status = STAT_IDLE
+        self._ap = None
+        self._pending_status = None
+        self._ready_at = 0
+        self._ifconfig = None
+        self._config = {
+            "mac": board.mac,
+            "essid": "",
+            "channel": 0,
+            "hostname": None,
+            "txpower": 31,
+            "pm": WLAN.PM_PERFORMANCE,
+            "security": 0,
+            "key": "",
+        }
+
+    # ------------------------ Radio ------------------------
+
+    def _account_radio(self):
+        """Acumula el tiempo con la radio activa y su modo de ahorro."""
+        now = self._board.clock.now_us
+        if self._active:
+            elapsed = now - self._active_since
+            self._board.stats.add("wifi_radio_on_us", elapsed)
+            # El nibble bajo de pm es el modo de ahorro (0 = sin ahorro)
+            if not self._config["pm"] & 0x0F:
+                self._board.stats.add("wifi_radio_full_power_us", elapsed)
+        self._active_since = now
+
+    def active(self, state=None):
+        if state is None:
+            return self._active
+        self._account_radio()
+        self._active = bool(state)
+        if not self._active:
+            self._drop()
+
+    def _drop(self):
+        self._status = STAT_IDLE
+        self._ap = None
+        self._pending_status = None
+
+    def _resolve(self):
+        """Completa la conexión en curso si ya ha pasado su tiempo."""
+        if self._status != STAT_CONNECTING:
+            if self._status == STAT_GOT_IP and self._ap is not None and not self._ap.available:
+                self._status = STAT_IDLE
+                self._ap = None
+                self._board.stats.add("wifi_link_lost")
+            return
+        if self._board.clock.now_us < self._ready_at:
+            return
+        self._status = self._pending_status
+        self._pending_status = None
+        if self._status == STAT_GOT_IP:
+            self._board.stats.add("wifi_connects_ok")
+        else:
+            self._ap = None
+            self._board.stats.add("wifi_connects_failed")
+
+    # ------------------------ API WLAN ------------------------
+
+    def scan(self):
+        if not self._active:
+            raise OSError("WLAN inactiva")
+        board = self._board
+        board.stats.add("wifi_scans")
+        board.clock.sleep_ms(board.network.scan_ms)
+        now_ms = board.now_ms()
+        return [
+            (ap.ssid.encode(), ap.bssid, ap.channel, ap.get_rssi(now_ms),
+             ap.security, False)
+            for ap in board.access_points if ap.available
+        ]
+
+    def connect(self, ssid=None, key=None, *, bssid=None):
+        if not self._active:
+            raise OSError("WLAN inactiva")
+        board = self._board
+        board.stats.add("wifi_connect_calls")
+
+        # Repetir connect() hacia la misma red no reinicia una asociación en
+        # curso ni una conexión ya establecida
+        self._resolve()
+        if self._status in (STAT_CONNECTING, STAT_GOT_IP) and self._config["essid"] == ssid:
+            return
+
+        ap = board.find_ap(ssid=ssid, bssid=bssid)
+        now = board.clock.now_us
+        self._status = STAT_CONNECTING
+        self._config["essid"] = ssid or ""
+
+        if ap is None:
+            self._pending_status = STAT_NO_AP_FOUND
+            self._ready_at = now + board.network.connect_fail_ms * 1000
+        elif ap.security and ap.password != key:
+            self._pending_status = STAT_WRONG_PASSWORD
+            self._ready_at = now + board.network.connect_fail_ms * 1000
+        else:
+            self._pending_status = STAT_GOT_IP
+            connect_ms = board.network.connect_known_bssid_ms if bssid else board.network.connect_ms
+            if self._ifconfig:
+                # Con IP estática no hay negociación DHCP
+                connect_ms = max(0, connect_ms - board.network.dhcp_ms)
+            self._ready_at = now + connect_ms * 1000
+            self._ap = ap
+            self._config["channel"] = ap.channel
+
+    def disconnect(self):
+        self._board.stats.add("wifi_disconnects")
+        self._drop()
+
+    def isconnected(self):
+        self._resolve()
+        return self._status == STAT_GOT_IP
+
+    def status(self, param=None):
+        self._resolve()
+        if param is None:
+            return self._status
+        if param == "rssi":
+            if self._status != STAT_GOT_IP:
+                raise OSError("Sin conexión")
+            return self._ap.get_rssi(self._board.now_ms())
+        raise ValueError("Parámetro desconocido")
+
+    def ifconfig(self, value=None):
+        if value is not None:
+            self._ifconfig = None if value == "dhcp" else tuple(value)
+            return None
+        if self._ifconfig:
+            return self._ifconfig
+        if self.isconnected():
+            return (self._board.ip, "255.255.255.0", "192.168.1.1", "192.168.1.1")
+        return ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0")
+
+    def config(self, *args, **kwargs):
+        if kwargs:
+            if "pm" in kwargs:
+                self._account_radio()
+            self._config.update(kwargs)
+            return None
+        if len(args) != 1:
+            raise ValueError("Se espera un parámetro")
+        param = args[0]
+        if param == "ssid":
+            param = "essid"
+        if param == "hostname" and self._config["hostname"] is None:
+            return _hostname
+        if param not in self._config:
+            raise ValueError("Parámetro desconocido")
+        return self._config[param]
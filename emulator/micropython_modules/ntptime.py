@@ -0,0 +1,24 @@
+"""
+Módulo ``ntptime`` emulado: ajusta el RTC a la hora del equipo anfitrión.
+"""
+import time as _time
+
+from emulator.board import get_board
+
+host = "pool.ntp.org"
+timeout = 1
+
+
+def time():
+    board = get_board()
+    wlan = board.radios[0] if board.radios else None
+    if wlan is None or not wlan.isconnected():
+        raise OSError(113)  # EHOSTUNREACH
+    board.stats.add("ntp_requests")
+    board.clock.sleep_ms(board.network.ntp_ms)
+    return int(_time.time())
+
+
+def settime():
+    board = get_board()
+    board.rtc_epoch = time() - board.clock.now_us // 1000000
@@ -0,0 +1,322 @@
+"""
+Módulo ``uasyncio`` emulado sobre el reloj simulado.
+
+Sigue el diseño de uasyncio de MicroPython: una única cola ordenada por
+instante de activación. Cuando ninguna tarea está lista el bucle avanza el
+reloj simulado hasta la siguiente activación en lugar de esperar, de forma
+que horas de funcionamiento se ejecutan en segundos.
+"""
+import heapq
+
+from emulator.board import get_board
+
+
+class CancelledError(BaseException):
+    pass
+
+
+class TimeoutError(Exception):
+    pass
+
+
+# ------------------------ Objetos esperables ------------------------
+
+class _Yield:
+    """Petición al bucle: reprogramar la tarea tras ``ms`` milisegundos."""
+    __slots__ = ("us",)
+
+    def __init__(self, us):
+        self.us = us
+
+    def __await__(self):
+        value = yield self
+        return value
+
+
+class _Park:
+    """Petición al bucle: dejar la tarea en espera hasta que la despierten."""
+    __slots__ = ()
+
+    def __await__(self):
+        value = yield self
+        return value
+
+
+def sleep_ms(ms):
+    return _Yield(max(0, int(ms * 1000)))
+
+
+def sleep(seconds):
+    return _Yield(max(0, int(seconds * 1000000)))
+
+
+# ------------------------ Tareas ------------------------
+
+class Task:
+
+    def __init__(self, coro, loop):
+        self.coro = coro
+        self.loop = loop
+        self.state = None  # None: en curso, True: terminada
+        self.result = None
+        self.exception = None
+        self.waiters = []
+        self._token = 0
+
+    def done(self):
+        return self.state is True
+
+    def cancel(self):
+        if self.done():
+            return False
+        self.loop._schedule(self, 0, throw=CancelledError())
+        return True
+
+    def __await__(self):
+        if not self.done():
+            self.waiters.append(current_task())
+            yield _Park()
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    def _finish(self, result=None, exception=None):
+        self.state = True
+        self.result = result
+        self.exception = exception
+        for waiter in self.waiters:
+            self.loop._schedule(waiter, 0)
+        if exception is not None and not self.waiters and not isinstance(exception, CancelledError):
+            print("Task exception wasn't retrieved:", repr(exception))
+        self.waiters = []
+
+
+class Loop:
+
+    def __init__(self):
+        self.clock = get_board().clock
+        self._queue = []
+        self._seq = 0
+        self._current = None
+        self._stopped = False
+
+    def _schedule(self, task, delay_us, value=None, throw=None):
+        task._token += 1
+        self._seq += 1
+        heapq.heappush(self._queue, (self.clock.now_us + delay_us, self._seq,
+                                     task._token, task, value, throw))
+
+    def create_task(self, coro):
+        task = Task(coro, self)
+        self._schedule(task, 0)
+        return task
+
+    def _step(self, task, value, throw):
+        self._current = task
+        try:
+            if throw is not None:
+                request = task.coro.throw(throw)
+            else:
+                request = task.coro.send(value)
+        except StopIteration as e:
+            task._finish(result=e.value)
+            return
+        except CancelledError as e:
+            task._finish(exception=e)
+            return
+        except Exception as e:
+            task._finish(exception=e)
+            return
+        finally:
+            self._current = None
+
+        if request is None:
+            self._schedule(task, 0)
+        elif isinstance(request, _Yield):
+            self._schedule(task, request.us)
+        elif isinstance(request, _Park):
+            pass
+        else:
+            raise RuntimeError("Objeto no esperable: %r" % (request,))
+
+    def run_until_complete(self, main=None):
+        if main is not None and not isinstance(main, Task):
+            main = self.create_task(main)
+
+        self._stopped = False
+
+        while not self._stopped and (main is None or not main.done()):
+            if not self._queue:
+                if main is None:
+                    break
+                raise RuntimeError("Bloqueo: no quedan tareas que ejecutar")
+
+            when, _, token, task, value, throw = heapq.heappop(self._queue)
+
+            if token != task._token or task.done():
+                continue
+
+            if when > self.clock.now_us:
+                self.clock.advance_to(when)
+
+            self._step(task, value, throw)
+
+        if main is not None and main.done():
+            if main.exception is not None:
+                raise main.exception
+            return main.result
+
+    def run_forever(self):
+        self.run_until_complete(None)
+
+    def stop(self):
+        self._stopped = True
+
+    def close(self):
+        pass
+
+
+_loop = None
+
+
+def get_event_loop():
+    global _loop
+    if _loop is None:
+        _loop = Loop()
+    return _loop
+
+
+def new_event_loop():
+    global _loop
+    _loop = Loop()
+    return _loop
+
+
+def current_task():
+    return get_event_loop()._current
+
+
+def create_task(coro):
+    return get_event_loop().create_task(coro)
+
+
+def run(coro):
+    return get_event_loop().run_until_complete(coro)
+
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [aw if isinstance(aw, Task) else create_task(aw) for aw in aws]
+    results = []
+    for task in tasks:
+        try:
+            results.append(await task)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+
+async def wait_for_ms(aw, timeout_ms):
+    task = aw if isinstance(aw, Task) else create_task(aw)
+    expired = []
+
+    async def _watchdog():
+        await sleep_ms(timeout_ms)
+        if not task.done():
+            expired.append(True)
+            task.cancel()
+
+    watchdog = create_task(_watchdog())
+    try:
+        return await task
+    except CancelledError:
+        if expired:
+            raise TimeoutError()
+        raise
+    finally:
+        if not watchdog.done():
+            watchdog.cancel()
+
+
+async def wait_for(aw, timeout):
+    return await wait_for_ms(aw, int(timeout * 1000))
+
+
+# ------------------------ Sincronización ------------------------
+
+class Event:
+
+    def __init__(self):
+        self.state = False
+        self.waiting = []
+
+    def is_set(self):
+        return self.state
+
+    def set(self):
+        self.state = True
+        loop = get_event_loop()
+        for task in self.waiting:
+            loop._schedule(task, 0)
+        self.waiting = []
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            self.waiting.append(current_task())
+            await _Park()
+        return True
+
+
+class ThreadSafeFlag:
+    """Bandera que se puede activar desde una IRQ (temporizador, pin)."""
+
+    def __init__(self):
+        self.state = False
+        self.waiting = None
+
+    def set(self):
+        self.state = True
+        if self.waiting is not None:
+            task, self.waiting = self.waiting, None
+            get_event_loop()._schedule(task, 0)
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            self.waiting = current_task()
+            await _Park()
+        self.state = False
+
+
+class Lock:
+
+    def __init__(self):
+        self.state = False
+        self.waiting = []
+
+    def locked(self):
+        return self.state
+
+    async def acquire(self):
+        while self.state:
+            self.waiting.append(current_task())
+            await _Park()
+        self.state = True
+        return True
+
+    def release(self):
+        self.state = False
+        if self.waiting:
+            get_event_loop()._schedule(self.waiting.pop(0), 0)
+
+    async def __aenter__(self):
+        return await self.acquire()
+
+    async def __aexit__(self, *args):
+        self.release()
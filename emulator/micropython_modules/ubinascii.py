@@ -0,0 +1,4 @@
+"""
+Módulo ``ubinascii`` emulado sobre binascii de CPython.
+"""
+from binascii import a2b_base64, b2a_base64, crc32, hexlify, unhexlify  # noqa: F401
@@ -0,0 +1,4 @@
+"""
+Módulo ``ujson`` emulado sobre json de CPython.
+"""
+from json import dump, dumps, load, loads  # noqa: F401
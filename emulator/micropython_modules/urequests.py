@@ -0,0 +1,139 @@
+"""
+Módulo ``urequests`` emulado, equivalente al de micropython-lib.
+
+Abre una conexión nueva (DNS + TCP) por petición sobre ``usocket`` emulado,
+por lo que su coste en tiempo simulado y bytes se refleja en los contadores
+de la placa igual que en el dispositivo.
+"""
+import ujson
+import usocket
+
+
+class Response:
+
+    def __init__(self, sock):
+        self.raw = sock
+        self.status_code = None
+        self.reason = ""
+        self.headers = {}
+        self.encoding = "utf-8"
+        self._cached = None
+
+    def close(self):
+        if self.raw:
+            self.raw.close()
+            self.raw = None
+        self._cached = None
+
+    @property
+    def content(self):
+        if self._cached is None:
+            try:
+                length = None
+                for key, value in self.headers.items():
+                    if key.lower() == "content-length":
+                        length = value
+                if length is not None:
+                    self._cached = self.raw.read(int(length))
+                else:
+                    self._cached = self.raw.read()
+            finally:
+                self.raw.close()
+                self.raw = None
+        return self._cached
+
+    @property
+    def text(self):
+        return str(self.content, self.encoding)
+
+    def json(self):
+        return ujson.loads(self.content)
+
+
+def request(method, url, data=None, json=None, headers=None, stream=None,
+            timeout=None):
+    headers = dict(headers or {})
+
+    try:
+        proto, _, host, path = url.split("/", 3)
+    except ValueError:
+        proto, _, host = url.split("/", 2)
+        path = ""
+
+    if proto == "http:":
+        port = 80
+    else:
+        raise ValueError("Protocolo no soportado en el emulador: " + proto)
+
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+
+    addr = usocket.getaddrinfo(host, port, 0, usocket.SOCK_STREAM)[0][-1]
+    sock = usocket.socket()
+
+    try:
+        if timeout is not None:
+            sock.settimeout(timeout)
+        sock.connect(addr)
+
+        if json is not None:
+            data = ujson.dumps(json)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(data, str):
+            data = data.encode()
+
+        lines = ["%s /%s HTTP/1.0" % (method, path), "Host: %s" % host]
+        for key, value in headers.items():
+            lines.append("%s: %s" % (key, value))
+        if data:
+            lines.append("Content-Length: %d" % len(data))
+        lines.append("Connection: close")
+        sock.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        if data:
+            sock.write(data)
+
+        status_line = sock.readline().split(None, 2)
+        if len(status_line) < 2:
+            raise ValueError("Respuesta HTTP no válida")
+
+        response = Response(sock)
+        response.status_code = int(status_line[1])
+        if len(status_line) > 2:
+            response.reason = status_line[2].rstrip().decode()
+
+        while True:
+            line = sock.readline()
+            if not line or line == b"\r\n":
+                break
+            key, _, value = line.decode().partition(":")
+            response.headers[key.strip()] = value.strip()
+    except BaseException:
+        sock.close()
+        raise
+
+    return response
+
+
+def head(url, **kw):
+    return request("HEAD", url, **kw)
+
+
+def get(url, **kw):
+    return request("GET", url, **kw)
+
+
+def post(url, **kw):
+    return request("POST", url, **kw)
+
+
+def put(url, **kw):
+    return request("PUT", url, **kw)
+
+
+def patch(url, **kw):
+    return request("PATCH", url, **kw)
+
+
+def delete(url, **kw):
+    return request("DELETE", url, **kw)
@@ -0,0 +1,142 @@
+"""
+Módulo ``usocket`` emulado.
+
+Usa sockets reales de CPython (para hablar con el servidor HTTP local del
+emulador) y además carga en el reloj simulado el coste de cada operación de
+red (DNS, handshake TCP, latencia de petición y transferencia) según el
+perfil de red de la placa. Contabiliza conexiones, resoluciones DNS y bytes.
+"""
+import socket as _socket
+
+from emulator.board import get_board
+
+AF_INET = _socket.AF_INET
+SOCK_STREAM = _socket.SOCK_STREAM
+SOCK_DGRAM = _socket.SOCK_DGRAM
+IPPROTO_TCP = _socket.IPPROTO_TCP
+SOL_SOCKET = _socket.SOL_SOCKET
+SO_REUSEADDR = _socket.SO_REUSEADDR
+IPPROTO_TCP = _socket.IPPROTO_TCP
+TCP_NODELAY = getattr(_socket, "TCP_NODELAY", 1)
+
+
+def _require_link():
+    board = get_board()
+    if not any(radio.isconnected() for radio in board.radios):
+        raise OSError(113)  # EHOSTUNREACH
+    return board
+
+
+def _transfer_cost(board, nbytes):
+    kbps = board.network.throughput_kbps
+    if kbps > 0 and nbytes:
+        board.clock.advance_us(nbytes * 8 * 1000 // kbps)
+
+
+def getaddrinfo(host, port, af=0, type=0, proto=0, flags=0):
+    board = _require_link()
+    board.stats.add("dns_lookups")
+    board.clock.sleep_ms(board.network.dns_ms)
+    info = _socket.getaddrinfo(host, port, AF_INET, SOCK_STREAM)
+    return [(f, t, p, c, a) for f, t, p, c, a in info]
+
+
+class socket:
+
+    def __init__(self, af=AF_INET, type=SOCK_STREAM, proto=IPPROTO_TCP):
+        self._sock = _socket.socket(af, type, proto)
+        self._rfile = None
+        self._awaiting_reply = False
+        self._board = get_board()
+        self._sock.settimeout(10)
+
+    def connect(self, address):
+        board = _require_link()
+        board.stats.add("tcp_connects")
+        board.clock.sleep_ms(board.network.tcp_connect_ms)
+        self._sock.connect(address)
+
+    def settimeout(self, value):
+        self._sock.settimeout(value if value is not None else 10)
+
+    def setblocking(self, flag):
+        self._sock.settimeout(10 if flag else 0.0)
+
+    def setsockopt(self, level, optname, value):
+        self._sock.setsockopt(level, optname, value)
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    # ------------------------ Escritura ------------------------
+
+    def send(self, data):
+        _require_link()
+        data = bytes(data)
+        sent = self._sock.send(data)
+        self._account_sent(sent)
+        return sent
+
+    def sendall(self, data):
+        _require_link()
+        data = bytes(data)
+        self._sock.sendall(data)
+        self._account_sent(len(data))
+
+    def write(self, data, length=None):
+        data = bytes(data if length is None else memoryview(data)[:length])
+        self.sendall(data)
+        return len(data)
+
+    def _account_sent(self, n):
+        board = self._board
+        board.stats.add("net_bytes_sent", n)
+        _transfer_cost(board, n)
+        self._awaiting_reply = True
+
+    # ------------------------ Lectura ------------------------
+
+    def _reader(self):
+        if self._rfile is None:
+            self._rfile = self._sock.makefile("rb")
+        if self._awaiting_reply:
+            # Primera lectura tras una petición: latencia de ida y vuelta
+            self._awaiting_reply = False
+            self._board.clock.sleep_ms(self._board.network.request_rtt_ms)
+        return self._rfile
+
+    def _account_received(self, data):
+        n = len(data)
+        self._board.stats.add("net_bytes_received", n)
+        _transfer_cost(self._board, n)
+        return data
+
+    def recv(self, n):
+        return self._account_received(self._reader().read1(n))
+
+    def read(self, n=-1):
+        return self._account_received(self._reader().read(n))
+
+    def readinto(self, buf, n=None):
+        view = memoryview(buf)
+        if n is not None:
+            view = view[:n]
+        count = self._reader().readinto1(view)
+        self._board.stats.add("net_bytes_received", count)
+        _transfer_cost(self._board, count)
+        return count
+
+    def readline(self):
+        return self._account_received(self._reader().readline())
+
+    def close(self):
+        if self._rfile is not None:
+            self._rfile.close()
+            self._rfile = None
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
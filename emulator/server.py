@@ -0,0 +1,203 @@
+"""
+Servidor HTTP local que hace de sustituto de la API.
+
+Escucha en 127.0.0.1 en un puerto libre, admite conexiones persistentes
+(HTTP/1.1 keep-alive) y guarda un registro de cada petición con su tamaño
+para poder medir el volumen de E/S del firmware.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Configuración de ejemplo de docs/api.md
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "location": {
+        "latitude": 40.416775,
+        "longitude": -3.703790,
+        "altitude": 20,
+        "timezone": "Europe/Madrid",
+        "city": "Madrid",
+        "country": "ES",
+        "utc_offset": 3600,
+        "sunrise": "07:00",
+        "sunset": "19:00",
+        "current_utc": "2025-08-09 15:00",
+        "outdoor": False,
+    },
+    "plants": [
+        {"id": 1, "adc": 0, "name": "Planta 1", "optimal_temperature": 20,
+         "optimal_soil_humidity": 20, "optimal_air_humidity": 20},
+    ],
+    "system": {
+        "has_water_pump": False,
+        "has_water_level_sensor": False,
+        "has_light_sensor": False,
+        "has_humidifier": False,
+        "low_power_mode": True,
+        "watering_time_interval": 5,
+        "humidifier_minimal_humidity": 30,
+        "fan_time": [],
+        "prefer_watering_time": [],
+        "light_time": [],
+    },
+}
+
+Handler = Callable[["RequestRecord"], Tuple[int, Dict[str, str], bytes]]
+
+
+class RequestRecord:
+    """Petición recibida por el servidor."""
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode() or "null")
+
+
+class ApiStandIn:
+    """
+    Sustituto local de la API de SmartPlant.
+
+    Por defecto responde a GET con la configuración de ejemplo (200, con
+    ETag; 304 si coincide If-None-Match) y a POST con 201. Se pueden
+    registrar respuestas propias con ``route()``.
+
+    Como la API real, la URL incluye una ruta base (``prefix``, "/api") y
+    las peticiones fuera de ella reciben 404, para detectar clientes que la
+    pierdan.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        self.requests: List[RequestRecord] = []
+        self.connections = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.fail_next = 0  # Número de peticiones a las que responder 503
+        # Ruta base de la URL, como la de la API real; fuera de ella responde 404
+        self.prefix = "/api"
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------ Ciclo de vida ------------------------
+
+    def start(self) -> "ApiStandIn":
+        stand_in = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    body = self._read_chunked()
+                else:
+                    body = self.rfile.read(length) if length else b""
+
+                record = RequestRecord(self.command, self.path, dict(self.headers), body)
+                status, headers, payload = stand_in._dispatch(record)
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if payload and self.command != "HEAD":
+                    self.wfile.write(payload)
+
+                with stand_in._lock:
+                    stand_in.requests.append(record)
+                    stand_in.bytes_received += len(body)
+                    stand_in.bytes_sent += len(payload)
+
+            def _read_chunked(self) -> bytes:
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().strip().split(b";")[0], 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        break
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                return b"".join(chunks)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://localhost:{port}{self.prefix}"
+
+    # ------------------------ Respuestas ------------------------
+
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """Registra una respuesta propia para un método y ruta."""
+        self._routes[(method.upper(), path)] = handler
+
+    def _dispatch(self, record: RequestRecord) -> Tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return 503, {"Content-Type": "application/json"}, b'{"success": false}'
+
+        path = record.path.split("?", 1)[0]
+
+        if self.prefix and path != self.prefix and not path.startswith(self.prefix + "/"):
+            return 404, {"Content-Type": "application/json"}, b'{"success": false}'
+
+        handler = self._routes.get((record.method, path))
+        if handler:
+            return handler(record)
+
+        if record.method == "GET":
+            payload = json.dumps(self.config).encode()
+            etag = '"%s"' % hashlib.sha256(payload).hexdigest()[:16]
+            if record.headers.get("If-None-Match") == etag:
+                return 304, {"ETag": etag}, b""
+            return 200, {"Content-Type": "application/json", "ETag": etag}, payload
+
+        body = {
+            "success": True,
+            "message": "Data sent successfully",
+            "data": {"need_sync_configuration": False, "need_reboot": False},
+        }
+        return 201, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": len(self.requests),
+                "connections": self.connections,
+                "bytes_received": self.bytes_received,
+                "bytes_sent": self.bytes_sent,
+            }
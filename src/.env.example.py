@@ -8,11 +8,33 @@ ALTERNATIVES_AP = [
     #{"ssid": "", "password": ""},
 ]
 
+# Última conexión Wi-Fi correcta (SSID, BSSID, canal e IP) para reconectar sin escanear
+WIFI_CACHE_PATH = "wifi.cache"
+WIFI_STATIC_IP = False # Reutiliza la última IP sin pedirla por DHCP (solo con IP reservada en el router)
+WIFI_FAST_TIMEOUT_MS = 3000 # Tiempo máximo para conectar al punto de acceso guardado antes de escanear
+WIFI_ATTEMPT_TIMEOUT_MS = 15000 # Tiempo máximo de cada intento de conexión
+WIFI_BACKOFF_MS = 5000 # Espera tras un intento fallido, se duplica con cada fallo seguido
+WIFI_BACKOFF_MAX_MS = 600000 # Espera máxima entre intentos (10 minutos)
+WIFI_RADIO_BUDGET_MS = 300000 # Tiempo de radio para intentos de conexión por hora (0 sin límite)
+WIFI_POLL_INTERVAL_MS = 1000 # Intervalo de la tarea que mantiene la conexión
+WIFI_ROAM_RSSI = -75 # Señal (dBm) por debajo de la que se busca un punto de acceso mejor (None desactiva)
+WIFI_ROAM_INTERVAL_MS = 300000 # Intervalo entre comprobaciones de la señal
+
+# Energía de la radio
+RADIO_IDLE = "auto" # Radio entre subidas: "performance" (sin ahorro), "powersave", "off" o "auto"
+RADIO_OFF_MIN_GAP_MS = 600000 # En "auto", se apaga la radio si la siguiente subida tarda al menos esto
+RADIO_ENERGY_BUDGET_MS = 0 # Tiempo de radio encendida por hora con la batería llena (0 sin límite)
+
 # Datos para la API
 API_URL = "http://localhost:8000/api"
 API_TOKEN = "apitoken"
 API_UPLOAD = True
 API_UPLOAD_INTERVAL = 30 # Intervalo entre subidas de datos a la API (En minutos, a partir de 5)
+API_BATCH_SIZE = 120 # Máximo de muestras del histórico por petición
+API_BATCH_BYTES = 8192 # Tamaño máximo de cada petición en bytes (0 sin límite)
+API_CONNECT_TIMEOUT_MS = 5000 # Tiempo máximo para conectar con la API
+API_READ_TIMEOUT_MS = 10000 # Tiempo máximo de espera de cada lectura de la respuesta
+API_CONFIG_INTERVAL_MS = 86400000 # Intervalo entre comprobaciones de la configuración (1 día)
 
 ## Batería
 BATTERY = False ## Indica si se activa la batería para este dispositivo
@@ -48,6 +70,7 @@ ADS1115_2_ADDRESS = 0x49 ## Dirección del módulo
 ADS1115_2_QUANTITY = 4 ## Cantidad de plantas que monitoriza
 
 ## Humedad de suelo (calibración y muestreo)
+SOIL_PINS = (27,)        # Pines ADC de humedad, uno por planta
 SOIL_DRY_VOLTAGE = 3.5   # Voltaje en seco (V alto)
 SOIL_WET_VOLTAGE = 1.8   # Voltaje en húmedo (V bajo)
 SOIL_CALIBRATION_SCALE = 1.0  # Escala de calibración
@@ -55,14 +78,25 @@ SOIL_CALIBRATION_OFFSET = 0.0 # Offset de calibración (V)
 SOIL_SAMPLES = 8              # Número de muestras para promediar
 SOIL_SAMPLE_DELAY_MS = 5      # Retardo entre muestras (ms)
 SOIL_ADS1115_PGA_FS = 4.096   # Rango a plena escala del ADS (V)
+SOIL_FILTER = "mean"          # mean, median, trimmed o hampel
+SOIL_FILTER_TRIM = 1          # Muestras descartadas por extremo (trimmed)
+SOIL_HAMPEL_K = 3.0           # Umbral de hampel (desviaciones)
+SOIL_EMA_ALPHA = 0            # Media exponencial entre lecturas (0 = no)
 
 ## Sensor BME280
 BME280 = True
 BME280_ADDRESS = 0x76
+BME280_ADDRESSES = (0x76,) # Direcciones en las que se buscan sensores en los dos buses, uno por zona
+BME280_ZONES = None # Nombre de cada zona, p. ej. {(0, 0x76): "norte", (1, 0x76): "sur"}
+BME280_SCAN_CACHE = "bme280.scan" # Direcciones encontradas en cada bus guardadas en la flash
+I2C1_SDA_PIN = None # Pines del segundo bus I2C (p. ej. 14 y 15), None sin segundo bus
+I2C1_SCL_PIN = None
 BME280_CORRECTION_TEMPERATURE = 0
 BME280_CORRECTION_PRESSURE = 0
 BME280_CORRECTION_HUMIDITY = 0
-BME280_SAMPLE_DELAY_MS = 500
+BME280_PROFILE = "indoor" # Perfil de medida: weather, indoor, precision o normal
+BME280_COMPENSATION = "float" # Fórmulas de compensación: float o int (enteras de 32 bits)
+BME280_CALIBRATION_CACHE = "bme280" # Prefijo de los ficheros con la calibración guardada en la flash
 
 ## Ventilador
 FAN = False
@@ -72,5 +106,36 @@ FAN_PIN = 3
 HUMIDIFIER = False ## Indica si se activa el humidificador
 HUMIDIFIER_PIN = 8 ## Pin GPIO que activa el humidificador
 
+## Planificador de tareas (periodo de cada tarea en milisegundos)
+SOIL_READ_INTERVAL_MS = 2000      # Lectura de humedad en tierra
+BME280_READ_INTERVAL_MS = 10000   # Lectura del sensor ambiental
+BATTERY_READ_INTERVAL_MS = 60000  # Lectura de la batería externa
+CPU_TEMP_READ_INTERVAL_MS = 60000 # Temperatura de la CPU (DUAL_CORE)
+LED_INTERVAL_MS = 10000           # Actualización de los LEDs
+
+## Muestreo en el segundo núcleo
+DUAL_CORE = False                 # Lee los sensores en el núcleo 1 y deja el núcleo 0 para red y decisiones
+SAMPLE_BUFFER_SIZE = 64           # Capacidad del buffer circular de muestras
+SAMPLE_MAX_JITTER_MS = 50         # Jitter máximo tolerado en el muestreo (ms)
+SAMPLE_DRAIN_INTERVAL_MS = 1000   # Periodo con el que el núcleo 0 vacía el buffer (ms)
+
+# Histórico de lecturas entre subidas
+HISTORY_SIZE = 192 ## Filas que se guardan en memoria (se sobrescriben las más antiguas)
+HISTORY_INTERVAL_MS = 10000 ## Fila del histórico sin BME280 (ms)
+
+# Cola en flash para lecturas sin subir (sin wifi o con error de la API)
+SPOOL = True ## Guarda en flash las lecturas que no se han podido subir
+SPOOL_PATH = 'spool' ## Directorio de la cola
+SPOOL_MAX_BYTES = 65536 ## Espacio máximo en flash, al superarlo se descartan las más antiguas
+SPOOL_SEGMENT_BYTES = 8192 ## Tamaño de cada segmento de la cola
+
+# Modo de bajo consumo por ciclos (deepsleep entre lecturas)
+DUTY_CYCLE = False ## Despierta, lee los sensores, sube si toca y vuelve a dormir
+DUTY_CYCLE_INTERVAL_S = 300 ## Segundos entre despertares
+DUTY_CYCLE_STATE_PATH = 'state.bin' ## Fichero con el estado conservado entre despertares
+
+# Información del dispositivo enviada a la API
+DEVICE_INFO_TTL_MS = 10000 ## Validez de los datos variables (batería, red); los fijos se calculan una vez
+
 # Indica si está en modo debug la aplicación
 DEBUG = False
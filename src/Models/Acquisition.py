@@ -0,0 +1,188 @@
+import time
+
+# Identificadores de las fuentes de muestras
+SOURCE_SOIL = 1
+SOURCE_WEATHER = 2
+SOURCE_BATTERY = 3
+SOURCE_CPU = 4
+
+# Lecturas del clima de cada zona: SOURCE_WEATHER_ZONE + índice del sensor
+SOURCE_WEATHER_ZONE = 16
+
+# Humedad en tierra del resto de plantas del ADC interno: SOURCE_SOIL_PLANT +
+# índice de la planta
+SOURCE_SOIL_PLANT = 32
+
+
+class Source:
+    """
+    Fuente de muestras periódica leída por el núcleo de adquisición.
+
+    :param source_id: Identificador de la fuente guardado en cada muestra.
+    :param reader: Función sin argumentos que devuelve una tupla con hasta
+                   tres valores numéricos.
+    :param period_ms: Periodo entre lecturas en milisegundos.
+    """
+
+    def __init__ (self, source_id, reader, period_ms):
+        self.source_id = source_id
+        self.reader = reader
+        self.period_ms = max(1, int(period_ms))
+        self.next_run = 0
+
+        # Métricas
+        self.reads = 0
+        self.errors = 0
+        self.jitter_ms = 0  # Retraso de la última lectura sobre lo previsto
+        self.jitter_max_ms = 0
+        self.jitter_sum_ms = 0
+        self.jitter_violations = 0  # Lecturas con jitter superior al límite
+        self.duration_max_ms = 0
+        self.last_error = None
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve las métricas de la fuente.
+        """
+        return {
+            "period_ms": self.period_ms,
+            "reads": self.reads,
+            "errors": self.errors,
+            "jitter_ms": self.jitter_ms,
+            "jitter_max_ms": self.jitter_max_ms,
+            "jitter_avg_ms": round(self.jitter_sum_ms / self.reads, 1) if self.reads else 0,
+            "jitter_violations": self.jitter_violations,
+            "duration_max_ms": self.duration_max_ms,
+            "last_error": self.last_error,
+        }
+
+
+class Acquisition:
+    """
+    Trabajador de adquisición para el segundo núcleo del RP2040.
+
+    Lee periódicamente las fuentes registradas (ADC, I2C) y deja las muestras
+    con marca de tiempo en un SampleBuffer. El núcleo 0 solo consume el buffer
+    para tomar decisiones y hacer la comunicación de red, de forma que una
+    espera del Wi-Fi nunca retrasa el muestreo.
+
+    Cada lectura se hace con el cerrojo del controlador tomado para no
+    competir por el ADC o el bus I2C con el núcleo 0.
+
+    :param controller: Instancia RpiPico.
+    :param buffer: Instancia SampleBuffer donde se escriben las muestras.
+    :param max_jitter_ms: Jitter máximo tolerado antes de contarse como violación.
+    :param debug: Indica si se muestran los mensajes de debug.
+    """
+
+    def __init__ (self, controller, buffer, max_jitter_ms=50, debug=False):
+        self.controller = controller
+        self.buffer = buffer
+        self.max_jitter_ms = max_jitter_ms
+        self.DEBUG = debug
+        self.sources = []
+        self.running = False
+        self.stopped = True
+
+    def add_source (self, source_id, reader, period_ms) -> Source:
+        """
+        Registra una fuente de muestras.
+
+        Args:
+            source_id (int): Identificador de la fuente (SOURCE_*).
+            reader: Función que devuelve una tupla con los valores a guardar.
+            period_ms (int): Periodo entre lecturas en milisegundos.
+
+        Returns:
+            Source: Instancia de la fuente registrada.
+        """
+        source = Source(source_id, reader, period_ms)
+        self.sources.append(source)
+
+        return source
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve las métricas de cada fuente y del buffer.
+        """
+        return {
+            "sources": {source.source_id: source.get_stats() for source in self.sources},
+            "buffer": self.buffer.get_stats(),
+        }
+
+    def _read_source (self, source, now) -> None:
+        """
+        Lee una fuente y guarda la muestra en el buffer.
+        """
+        jitter = time.ticks_diff(now, source.next_run)
+
+        source.jitter_ms = jitter
+        source.jitter_sum_ms += jitter
+        if jitter > source.jitter_max_ms:
+            source.jitter_max_ms = jitter
+        if jitter > self.max_jitter_ms:
+            source.jitter_violations += 1
+
+        try:
+            with self.controller.lock:
+                values = source.reader()
+
+            self.buffer.push(source.source_id, now, *values)
+        except Exception as e:
+            source.errors += 1
+            source.last_error = str(e)
+
+            if self.DEBUG:
+                print('Error leyendo la fuente', source.source_id, ':', e)
+
+        source.reads += 1
+
+        duration = time.ticks_diff(time.ticks_ms(), now)
+        if duration > source.duration_max_ms:
+            source.duration_max_ms = duration
+
+        # Siguiente lectura sobre la rejilla prevista, sin acumular deriva
+        source.next_run = time.ticks_add(source.next_run, source.period_ms)
+
+        if time.ticks_diff(now, source.next_run) >= 0:
+            source.next_run = time.ticks_add(now, source.period_ms)
+
+    def run (self) -> None:
+        """
+        Bucle de adquisición. Se ejecuta en el núcleo 1 hasta llamar a stop().
+        """
+        self.running = True
+        self.stopped = False
+
+        now = time.ticks_ms()
+        for source in self.sources:
+            source.next_run = now
+
+        while self.running:
+            now = time.ticks_ms()
+            wait = None
+
+            for source in self.sources:
+                remaining = time.ticks_diff(source.next_run, now)
+
+                if remaining <= 0:
+                    self._read_source(source, now)
+                    now = time.ticks_ms()
+                    remaining = time.ticks_diff(source.next_run, now)
+
+                if wait is None or remaining < wait:
+                    wait = remaining
+
+            if wait is None:
+                wait = 100
+
+            if wait > 0:
+                time.sleep_ms(wait)
+
+        self.stopped = True
+
+    def stop (self) -> None:
+        """
+        Pide al bucle de adquisición que termine tras la lectura en curso.
+        """
+        self.running = False
@@ -0,0 +1,170 @@
+import time
+import uasyncio as asyncio
+from array import array
+
+
+class AnalogSampler:
+    """
+    Muestreo de varios canales del ADC interno (pines 26, 27 y 28 y el
+    sensor de temperatura ADC(4)) intercalando las conversiones.
+
+    En cada ronda se toma una muestra de cada canal seguida, por lo que la
+    espera entre muestras de un canal la aprovechan los demás: un barrido de
+    todos los canales dura lo mismo que leer uno solo. El resultado es un
+    único frame con el valor filtrado de cada canal.
+
+    Cada canal usa un único objeto ADC (el de RpiPico.get_adc) y su propio
+    buffer de muestras preasignado, sin reservar memoria por barrido.
+
+    El muestreo no toma el cerrojo del hardware: en DUAL_CORE lo hace quien
+    llama (Acquisition).
+
+    :param rpi: Instancia RpiPico.
+    :param samples: Muestras de cada canal por barrido.
+    :param sample_delay_ms: Espera entre rondas de muestras.
+    :param debug: Muestra información de depuración.
+    """
+
+    def __init__ (self, rpi, samples=8, sample_delay_ms=5, debug=False):
+        self.rpi = rpi
+        self.samples = max(1, int(samples))
+        self.sample_delay_ms = sample_delay_ms
+        self.debug = debug
+
+        self.names = []
+        self.reads = []  # read_u16 de cada canal
+        self.buffers = []
+        self.filters = []
+
+        # Último barrido, se reutiliza en cada uno
+        self.frame = {}
+
+        self.sweeps = 0
+        self.conversions = 0
+        self.busy_us = 0  # Tiempo convirtiendo (sin las esperas) del último barrido
+        self.busy_max_us = 0
+        self.duration_ms = 0  # Duración total del último barrido
+
+    def add_channel (self, name, pin, sample_filter=None) -> None:
+        """
+        Añade un canal al barrido.
+
+        Args:
+            name: Clave del canal en el frame.
+            pin (int): GPIO (26-28) o canal (4 para la temperatura de la CPU).
+            sample_filter: SampleFilter de las muestras del canal, media si
+                           es None.
+        """
+        self.names.append(name)
+        self.reads.append(self.rpi.get_adc(pin).read_u16)
+        self.buffers.append(array('H', [0] * self.samples))
+        self.filters.append(sample_filter)
+        self.frame[name] = None
+
+    def _prepare (self, samples):
+        n = int(samples if samples is not None else self.samples)
+        n = n if n > 0 else 1
+
+        if n > self.samples:
+            self.samples = n
+            self.buffers = [array('H', [0] * n) for _ in self.names]
+
+        return n
+
+    def _round (self, index) -> int:
+        """
+        Toma la muestra index de todos los canales seguidos.
+
+        Returns:
+            int: Duración de la ronda en µs.
+        """
+        reads = self.reads
+        buffers = self.buffers
+        start = time.ticks_us()
+
+        for channel in range(len(reads)):
+            buffers[channel][index] = reads[channel]()
+
+        return time.ticks_diff(time.ticks_us(), start)
+
+    def _finish (self, n, busy, start) -> dict:
+        frame = self.frame
+
+        for channel in range(len(self.names)):
+            buffer = self.buffers[channel]
+            sample_filter = self.filters[channel]
+
+            if sample_filter:
+                value = sample_filter.apply(buffer, n)
+            else:
+                total = 0
+
+                for i in range(n):
+                    total += buffer[i]
+
+                value = total // n
+
+            frame[self.names[channel]] = value
+
+        frame['ts_ms'] = time.ticks_ms()
+
+        self.sweeps += 1
+        self.conversions += n * len(self.names)
+        self.busy_us = busy
+        self.duration_ms = time.ticks_diff(frame['ts_ms'], start)
+
+        if busy > self.busy_max_us:
+            self.busy_max_us = busy
+
+        return frame
+
+    def sweep (self, samples=None, sample_delay_ms=None) -> dict:
+        """
+        Barre todos los canales.
+
+        Returns:
+            dict: Valor filtrado del ADC (16 bits) de cada canal y ts_ms. Es
+                  el mismo diccionario en cada barrido.
+        """
+        n = self._prepare(samples)
+        delay = self.sample_delay_ms if sample_delay_ms is None else sample_delay_ms
+        start = time.ticks_ms()
+        busy = 0
+
+        for index in range(n):
+            busy += self._round(index)
+
+            if delay and index < n - 1:
+                time.sleep_ms(delay)
+
+        return self._finish(n, busy, start)
+
+    async def sweep_async (self, samples=None, sample_delay_ms=None) -> dict:
+        """
+        Igual que sweep() cediendo el control al resto de tareas entre rondas.
+        """
+        n = self._prepare(samples)
+        delay = self.sample_delay_ms if sample_delay_ms is None else sample_delay_ms
+        start = time.ticks_ms()
+        busy = 0
+
+        for index in range(n):
+            busy += self._round(index)
+
+            if delay and index < n - 1:
+                await asyncio.sleep_ms(delay)
+
+        return self._finish(n, busy, start)
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve los canales y la duración de los barridos.
+        """
+        return {
+            "channels": len(self.names),
+            "sweeps": self.sweeps,
+            "conversions": self.conversions,
+            "busy_us": self.busy_us,
+            "busy_max_us": self.busy_max_us,
+            "duration_ms": self.duration_ms,
+        }
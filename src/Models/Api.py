@@ -1,12 +1,415 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 #
-import urequests
+import os
+import usocket
 import ujson
+import ubinascii
+import hashlib
+from time import ticks_ms, ticks_diff
+from Models.JsonStream import encode, encode_samples, measure
 
 
 ## TODO: Revisar, ya no existe hardware_device_id
 
+
+class HttpClient:
+    """
+    Cliente HTTP/1.1 mínimo con conexión persistente (keep-alive).
+
+    Reutiliza el socket entre peticiones, guarda la resolución DNS y usa
+    buffers de envío y recepción reservados una sola vez. Si el servidor ha
+    cerrado la conexión mientras estaba inactiva (socket caducado), la
+    petición se repite una vez con una conexión nueva.
+
+    :param url: URL base (http:// o https://) con puerto y ruta opcionales
+                (p. ej. http://host:8000/api). La ruta se antepone a la de
+                cada petición.
+    :param connect_timeout_ms: Tiempo máximo para conectar.
+    :param read_timeout_ms: Tiempo máximo de espera en cada lectura.
+    :param buffer_size: Tamaño de los buffers de envío y recepción.
+    :param debug: Muestra información de depuración.
+    """
+
+    def __init__ (self, url, connect_timeout_ms=5000, read_timeout_ms=10000,
+                  buffer_size=1024, debug=False):
+        parts = url.split('/', 3)
+        proto, host = parts[0], parts[2]
+
+        # Ruta base de la URL, sin barra final ('' si no tiene)
+        self.base_path = ''
+
+        if len(parts) > 3 and parts[3].strip('/'):
+            self.base_path = '/' + parts[3].strip('/')
+
+        self.tls = proto == 'https:'
+        self.port = 443 if self.tls else 80
+
+        if ':' in host:
+            host, port = host.split(':', 1)
+            self.port = int(port)
+
+        self.host = host
+        self.connect_timeout = connect_timeout_ms / 1000
+        self.read_timeout = read_timeout_ms / 1000
+        self.debug = debug
+
+        self.sock = None
+        self._addr = None
+
+        # Buffers reutilizados en todas las peticiones
+        self._tx = bytearray(buffer_size)
+        self._tx_len = 0
+        self._chunked = False
+        self._rx = bytearray(buffer_size)
+        self._rx_view = memoryview(self._rx)
+        self._rx_start = 0
+        self._rx_end = 0
+
+        # Cabeceras de la última respuesta (nombres en minúsculas)
+        self.headers = {}
+
+        self.stats = {
+            "requests": 0,
+            "connections": 0,
+            "reused": 0,
+            "reconnects": 0,
+            "dns_lookups": 0,
+            "errors": 0,
+            "last_latency_ms": 0,
+        }
+
+    def connect (self) -> None:
+        """
+        Abre la conexión con el servidor usando la dirección en caché.
+        """
+        self.close()
+
+        if self._addr is None:
+            self._addr = usocket.getaddrinfo(self.host, self.port, 0,
+                                             usocket.SOCK_STREAM)[0][-1]
+            self.stats["dns_lookups"] += 1
+
+        sock = usocket.socket()
+
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self._addr)
+
+            if self.tls:
+                import ssl
+                sock = ssl.wrap_socket(sock, server_hostname=self.host)
+
+            sock.settimeout(self.read_timeout)
+        except Exception:
+            sock.close()
+
+            # La dirección puede haber cambiado, se vuelve a resolver
+            self._addr = None
+            raise
+
+        self.sock = sock
+        self._rx_start = self._rx_end = 0
+        self.stats["connections"] += 1
+
+    def close (self) -> None:
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+
+            self.sock = None
+
+    # ------------------------ Escritura ------------------------
+
+    def write (self, data) -> None:
+        """
+        Añade datos al buffer de envío y lo vacía al llenarse.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+
+        size = len(data)
+        tx = self._tx
+
+        if self._tx_len + size > len(tx):
+            self.flush()
+
+            if size > len(tx):
+                self._emit(data)
+                return
+
+        tx[self._tx_len:self._tx_len + size] = data
+        self._tx_len += size
+
+    def flush (self) -> None:
+        if self._tx_len:
+            self._emit(memoryview(self._tx)[:self._tx_len])
+            self._tx_len = 0
+
+    def _emit (self, data) -> None:
+        """
+        Escribe en el socket; en modo chunked cada escritura es un fragmento.
+        """
+        if self._chunked:
+            self.sock.write(('%x\r\n' % len(data)).encode())
+            self.sock.write(data)
+            self.sock.write(b'\r\n')
+        else:
+            self.sock.write(data)
+
+    # ------------------------ Lectura ------------------------
+
+    def _fill (self) -> None:
+        """
+        Lee del socket al buffer de recepción conservando lo no procesado.
+        """
+        rx = self._rx
+
+        if self._rx_start:
+            pending = self._rx_end - self._rx_start
+            rx[:pending] = self._rx_view[self._rx_start:self._rx_end]
+            self._rx_start, self._rx_end = 0, pending
+
+        if self._rx_end >= len(rx):
+            raise ValueError('Cabecera HTTP demasiado larga')
+
+        count = self.sock.readinto(self._rx_view[self._rx_end:])
+
+        if not count:
+            # El servidor ha cerrado la conexión
+            raise OSError(104)
+
+        self._rx_end += count
+
+    def _readline (self) -> bytes:
+        while True:
+            end = self._rx.find(b'\n', self._rx_start, self._rx_end)
+
+            if end >= 0:
+                line = bytes(self._rx_view[self._rx_start:end + 1])
+                self._rx_start = end + 1
+                return line
+
+            self._fill()
+
+    def _read (self, size) -> bytes:
+        """
+        Lee exactamente ``size`` bytes del cuerpo de la respuesta.
+        """
+        buffered = self._rx_end - self._rx_start
+
+        if size <= buffered:
+            data = bytes(self._rx_view[self._rx_start:self._rx_start + size])
+            self._rx_start += size
+            return data
+
+        body = bytearray(size)
+        body[:buffered] = self._rx_view[self._rx_start:self._rx_end]
+        self._rx_start = self._rx_end = 0
+        view = memoryview(body)
+        received = buffered
+
+        while received < size:
+            count = self.sock.readinto(view[received:])
+
+            if not count:
+                raise OSError(104)
+
+            received += count
+
+        return bytes(body)
+
+    def _read_chunked (self) -> bytes:
+        chunks = []
+
+        while True:
+            size = int(self._readline().split(b';')[0].strip(), 16)
+
+            if not size:
+                self._readline()
+                break
+
+            chunks.append(self._read(size))
+            self._readline()
+
+        return b''.join(chunks)
+
+    def _read_until_close (self) -> bytes:
+        chunks = [bytes(self._rx_view[self._rx_start:self._rx_end])]
+        self._rx_start = self._rx_end = 0
+
+        while True:
+            count = self.sock.readinto(self._rx_view)
+
+            if not count:
+                break
+
+            chunks.append(bytes(self._rx_view[:count]))
+
+        self.close()
+
+        return b''.join(chunks)
+
+    # ------------------------ Peticiones ------------------------
+
+    def _send (self, method, path, headers, body, length=None) -> None:
+        path = path.lstrip('/')
+
+        self.write(method)
+        self.write(' ')
+        self.write(self.base_path)
+
+        # Sin ruta propia la petición va a la ruta base tal cual (/api)
+        if path or not self.base_path:
+            self.write('/')
+            self.write(path)
+        self.write(' HTTP/1.1\r\nHost: ')
+        self.write(self.host)
+
+        if headers:
+            for key, value in headers.items():
+                self.write('\r\n')
+                self.write(key)
+                self.write(': ')
+                self.write(value)
+
+        streamed = callable(body)
+
+        if streamed and length is None:
+            self.write('\r\nTransfer-Encoding: chunked')
+        elif body is not None:
+            self.write('\r\nContent-Length: ')
+            self.write(str(length if streamed else len(body)))
+
+        self.write('\r\n\r\n')
+
+        if streamed:
+            self.flush()
+            self._chunked = length is None
+
+            try:
+                for chunk in body():
+                    self.write(chunk)
+
+                self.flush()
+            finally:
+                self._chunked = False
+
+            if length is None:
+                self.sock.write(b'0\r\n\r\n')
+        elif body is not None:
+            self.write(body)
+
+        self.flush()
+
+    def _receive (self, method):
+        """
+        Lee la respuesta completa.
+
+        Returns:
+            tuple: (código de estado, cuerpo en bytes).
+        """
+        status_line = self._readline().split(None, 2)
+
+        if len(status_line) < 2:
+            raise ValueError('Respuesta HTTP no válida')
+
+        status = int(status_line[1])
+        keep_alive = status_line[0] == b'HTTP/1.1'
+
+        headers = self.headers
+        headers.clear()
+
+        while True:
+            line = self._readline()
+
+            if line == b'\r\n' or line == b'\n':
+                break
+
+            key, _, value = line.decode().partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+
+        if connection == 'close':
+            keep_alive = False
+        elif connection == 'keep-alive':
+            keep_alive = True
+
+        if method == 'HEAD' or status == 204 or status == 304 or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = self._read_chunked()
+        elif 'content-length' in headers:
+            body = self._read(int(headers['content-length']))
+        else:
+            body = self._read_until_close()
+
+        if not keep_alive:
+            self.close()
+
+        return status, body
+
+    def request (self, method, path='', headers=None, body=None, length=None):
+        """
+        Realiza una petición reutilizando la conexión si sigue abierta.
+
+        El cuerpo puede ser una función que devuelva un generador de
+        fragmentos (str ASCII o bytes): se escribe en el socket según se
+        genera a través del buffer de envío, con Content-Length si se indica
+        ``length`` o con Transfer-Encoding: chunked si no. La función se
+        vuelve a llamar si hay que repetir la petición.
+
+        Args:
+            method (str): Método HTTP.
+            path (str): Ruta en el servidor.
+            headers (dict): Cabeceras adicionales.
+            body (str|bytes|callable): Cuerpo de la petición.
+            length (int): Bytes del cuerpo generado, si se conocen.
+
+        Returns:
+            tuple: (código de estado, cuerpo en bytes).
+        """
+        if isinstance(body, str):
+            body = body.encode()
+
+        start = ticks_ms()
+        self.stats["requests"] += 1
+
+        for attempt in range(2):
+            reused = self.sock is not None
+
+            try:
+                if not reused:
+                    self.connect()
+
+                self._tx_len = 0
+                self._send(method, path, headers, body, length)
+                result = self._receive(method)
+
+                if reused:
+                    self.stats["reused"] += 1
+
+                self.stats["last_latency_ms"] = ticks_diff(ticks_ms(), start)
+
+                return result
+            except Exception as e:
+                self.close()
+
+                # Conexión caducada: se reintenta una vez con una nueva
+                if reused and attempt == 0 and isinstance(e, OSError):
+                    self.stats["reconnects"] += 1
+
+                    if self.debug:
+                        print('Conexión HTTP caducada, reconectando:', e)
+
+                    continue
+
+                self.stats["errors"] += 1
+                raise
+
 class Api:
     """
     A class representing an API connection with methods to interact with the endpoint.
@@ -17,73 +420,207 @@ class Api:
     :param token: The authentication token for accessing the API.
     :param device_id: The unique identifier of the device.
     :param debug: Optional boolean flag for debugging mode.
+    :param batch_size: Maximum number of samples per upload.
+    :param batch_bytes: Maximum payload size in bytes per upload.
+    :param connect_timeout_ms: Timeout to open the connection.
+    :param read_timeout_ms: Timeout for each socket read.
+    :param config_path: File on flash where the last configuration is cached.
     """
 
-    def __init__ (self, controller, url, path, token, device_id, debug=False):
+    def __init__ (self, controller, url, path, token, device_id, debug=False,
+                  batch_size=120, batch_bytes=8192, connect_timeout_ms=5000,
+                  read_timeout_ms=10000, config_path='api_config.cache'):
         self.URL = url
         self.TOKEN = token
         self.DEVICE_ID = device_id
         self.URL_PATH = path
         self.CONTROLLER = controller
         self.DEBUG = debug
+        self.BATCH_SIZE = max(1, batch_size)
+        self.BATCH_BYTES = batch_bytes
+
+        # Conexión persistente con la API
+        self.http = HttpClient(url, connect_timeout_ms=connect_timeout_ms,
+                               read_timeout_ms=read_timeout_ms, debug=debug)
+
+        # Configuración descargada de la API y su versión (ETag o hash)
+        self.CONFIG_PATH = config_path
+        self.config = None
+        self.config_version = None
+        self.need_sync_configuration = False
+
+        # Cabeceras comunes, se construyen una sola vez
+        self.headers = {
+            "Authorization": "Bearer " + token,
+            "Content-Type": "application/json",
+            "Device-Id": str(device_id),
+        }
+
+        # Métricas de subidas por lotes
+        self.stats = {
+            "requests": 0,
+            "batches_sent": 0,
+            "batches_failed": 0,
+            "samples_sent": 0,
+            "bytes_sent": 0,
+            "config_downloads": 0,
+            "config_not_modified": 0,
+        }
+
+    def load_cached_config (self):
+        """
+        Carga la última configuración guardada en la flash. Se usa al
+        arrancar para no esperar a la red.
+
+        Returns:
+            dict|None: Configuración guardada o None si no hay.
+        """
+        try:
+            with open(self.CONFIG_PATH, 'r') as f:
+                version = f.readline().strip()
+                config = ujson.loads(f.read())
+        except (OSError, ValueError) as e:
+            if self.DEBUG:
+                print('No hay configuración de la API en caché:', e)
+            return None
+
+        self.config = config
+        self.config_version = version or None
+
+        return config
+
+    def _save_config (self, version, body) -> None:
+        """
+        Guarda la configuración en la flash junto a su versión. Se escribe en
+        un fichero temporal y se renombra para no dejar una caché a medias.
+        """
+        tmp = self.CONFIG_PATH + '.tmp'
+
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(version.encode())
+                f.write(b'\n')
+                f.write(body)
+
+            os.rename(tmp, self.CONFIG_PATH)
+        except OSError as e:
+            if self.DEBUG:
+                print('No se pudo guardar la configuración de la API:', e)
 
     def get_data_from_api (self):
+        """
+        Descarga la configuración del dispositivo con una petición
+        condicional (If-None-Match). Si no ha cambiado (304), o el contenido
+        recibido tiene la misma versión que la caché, se devuelve la
+        configuración en memoria sin volver a interpretar el JSON.
+
+        Returns:
+            dict|bool: Configuración o False si no se pudo obtener.
+        """
         try:
+            headers = self.headers
+
+            if self.config is not None and self.config_version:
+                headers = dict(self.headers)
+                headers["If-None-Match"] = self.config_version
+
+            status, body = self.http.request('GET', self.URL_PATH, headers)
+
+            if self.DEBUG:
+                print('Respuesta de la API:', status)
 
-            headers = {
-                "Authorization": "Bearer " + self.TOKEN,
-                "Content-Type": "application/json",
-                "Device-Id": str(self.DEVICE_ID)
-            }
+            if status == 304 and self.config is not None:
+                self.stats["config_not_modified"] += 1
+                self.need_sync_configuration = False
+                return self.config
 
-            url = self.URL + self.URL_PATH
+            if status != 200 and status != 201:
+                return False
 
-            response = urequests.get(url, headers=headers)
+            # Sin ETag se usa un hash del contenido como versión
+            version = self.http.headers.get('etag')
 
-            data = ujson.loads(response.text)
+            if not version:
+                version = ubinascii.hexlify(hashlib.sha256(body).digest()[:8]).decode()
+
+            self.need_sync_configuration = False
+
+            if version == self.config_version and self.config is not None:
+                self.stats["config_not_modified"] += 1
+                return self.config
+
+            data = ujson.loads(body)
 
             if self.DEBUG:
-                print('Respuesta de la API:', response)
                 print('Respuesta de la API en json:', data)
 
-            if response.status_code == 201:
-                return data
+            self._save_config(version, body)
+            self.config = data
+            self.config_version = version
+            self.stats["config_downloads"] += 1
+
+            return data
 
         except Exception as e:
             if self.DEBUG:
                 print("Error al obtener los datos de la api: ", e)
             return False
 
-    def send_to_api (self, data={}) -> bool:
+    def _payload (self, data, history=None, rows=0):
+        """
+        Generador del cuerpo de una subida: el estado del sistema y, si se
+        indica, las ``rows`` muestras más antiguas del histórico.
+        """
+        yield '{"data":'
+        yield from encode(data)
+        yield ',"hardware_device_id":'
+        yield from encode(self.DEVICE_ID)
+
+        if history is not None and rows:
+            yield ',"samples":'
+            yield from encode_samples(history, rows)
+
+        yield '}'
+
+    def send_to_api (self, data={}, history=None, rows=0) -> bool:
         """
         Envía los datos a la API mediante una petición POST.
 
+        El JSON se genera por fragmentos y se escribe directamente en el
+        socket con su Content-Length calculado antes, sin construir el
+        documento completo en memoria.
+
         Args:
             data: Diccionario con los datos a enviar.
+            history: Histórico de lecturas (Models.TimeSeries) del que se
+                     envían las ``rows`` muestras más antiguas.
+            rows (int): Número de muestras del histórico a incluir.
 
         Returns:
             bool: True si la petición fue exitosa, False en caso contrario.
         """
         try:
-            headers = {
-                "Authorization": "Bearer " + self.TOKEN,
-                "Content-Type": "application/json"
-            }
-
-            url = self.URL + self.URL_PATH
+            length = measure(self._payload(data, history, rows))
 
-            payload = {
-                "data": data,
-                "hardware_device_id": self.DEVICE_ID
-            }
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += length
 
-            response = urequests.post(url, headers=headers, json=payload)
-            #data = ujson.loads(response.text)
+            status, response = self.http.request(
+                'POST', self.URL_PATH, self.headers,
+                lambda: self._payload(data, history, rows), length)
 
             if self.DEBUG:
-                print('Respuesta de la API:', response)
+                print('Respuesta de la API:', status, response)
+
+            if status == 201:
+                # La API indica si hay que volver a descargar la configuración
+                if b'need_sync_configuration' in response:
+                    try:
+                        sync = ujson.loads(response).get('data', {})
+                        self.need_sync_configuration = bool(sync.get('need_sync_configuration'))
+                    except (ValueError, AttributeError):
+                        pass
 
-            if response.status_code == 201:
                 return True
 
         except Exception as e:
@@ -91,3 +628,58 @@ class Api:
                 print("Error al obtener los datos de la api: ", e)
 
             return False
+
+    def _batch_rows (self, data, history) -> int:
+        """
+        Número de muestras más antiguas del histórico que entran en un lote
+        respetando el máximo de muestras y de bytes.
+        """
+        rows = min(len(history), self.BATCH_SIZE)
+
+        if not self.BATCH_BYTES:
+            return rows
+
+        # Se reduce el lote proporcionalmente hasta entrar en el presupuesto
+        while rows > 1:
+            size = measure(self._payload(data, history, rows))
+
+            if size <= self.BATCH_BYTES:
+                break
+
+            rows = max(1, rows * self.BATCH_BYTES // size)
+
+        return rows
+
+    def send_batches (self, data, history) -> int:
+        """
+        Sube todo el histórico pendiente en lotes, de la muestra más antigua a
+        la más reciente. Cada lote confirmado se descarta del histórico; si un
+        lote falla se detiene la subida y sus muestras se conservan para
+        reintentar el mismo lote completo en la próxima subida.
+
+        Args:
+            data: Estado actual del sistema, se incluye en cada lote.
+            history: Histórico de lecturas (Models.TimeSeries).
+
+        Returns:
+            int: Número de muestras subidas.
+        """
+        sent = 0
+
+        while len(history):
+            rows = self._batch_rows(data, history)
+
+            if not self.send_to_api(data, history, rows):
+                self.stats["batches_failed"] += 1
+                break
+
+            history.consume(rows)
+            self.stats["batches_sent"] += 1
+            self.stats["samples_sent"] += rows
+            sent += rows
+
+        if self.DEBUG:
+            print('Muestras subidas a la API:', sent, 'pendientes:', len(history))
+
+        return sent
+
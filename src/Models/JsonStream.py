@@ -0,0 +1,175 @@
+# Codificador JSON por fragmentos para enviar documentos grandes sin
+# construirlos completos en memoria. Cada función es un generador que
+# devuelve trozos pequeños (str ASCII) que se escriben directamente en el
+# socket, por lo que el pico de memoria no depende del tamaño del documento.
+#
+# La salida solo contiene caracteres ASCII (el resto se escapan como \uXXXX),
+# así que la longitud de cada trozo coincide con sus bytes y se puede
+# calcular el Content-Length recorriendo el generador sin codificar nada.
+
+_ESCAPES = {
+    '"': '\\"',
+    '\\': '\\\\',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\b': '\\b',
+    '\f': '\\f',
+}
+
+
+def encode_string (value):
+    yield '"'
+
+    start = 0
+    i = 0
+
+    for c in value:
+        code = ord(c)
+
+        if code < 0x20 or code > 0x7E or c == '"' or c == '\\':
+            if i > start:
+                yield value[start:i]
+
+            escape = _ESCAPES.get(c)
+
+            if escape:
+                yield escape
+            elif code > 0xFFFF:
+                code -= 0x10000
+                yield '\\u%04x\\u%04x' % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+            else:
+                yield '\\u%04x' % code
+
+            start = i + 1
+
+        i += 1
+
+    if start == 0:
+        yield value
+    elif start < i:
+        yield value[start:]
+
+    yield '"'
+
+
+def encode_float (value, digits=2) -> str:
+    """
+    Número con ``digits`` decimales; NaN e infinito se codifican como null.
+    """
+    if value != value or value in (float('inf'), float('-inf')):
+        return 'null'
+
+    return str(round(value, digits))
+
+
+def encode (value):
+    """
+    Codifica cualquier combinación de dict, list, tuple, str, int, float,
+    bool y None.
+    """
+    if value is None:
+        yield 'null'
+    elif value is True:
+        yield 'true'
+    elif value is False:
+        yield 'false'
+    elif isinstance(value, str):
+        yield from encode_string(value)
+    elif isinstance(value, float):
+        yield encode_float(value, 6)
+    elif isinstance(value, int):
+        yield str(value)
+    elif isinstance(value, dict):
+        yield '{'
+        first = True
+
+        for key, item in value.items():
+            if not first:
+                yield ','
+
+            first = False
+
+            yield from encode_string(str(key))
+            yield ':'
+            yield from encode(item)
+
+        yield '}'
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        first = True
+
+        for item in value:
+            if not first:
+                yield ','
+
+            first = False
+
+            yield from encode(item)
+
+        yield ']'
+    else:
+        yield from encode_string(str(value))
+
+
+def _encode_column (history, column, count, digits):
+    yield '['
+    first = True
+
+    for segment in history.segments(column, count):
+        for value in segment:
+            if not first:
+                yield ','
+
+            first = False
+
+            yield str(value) if digits is None else encode_float(value, digits)
+
+    yield ']'
+
+
+def encode_samples (history, count):
+    """
+    Codifica las ``count`` filas más antiguas de un histórico
+    (Models.TimeSeries) en el mismo formato columnar que TimeSeries.to_dict(),
+    leyendo directamente de sus columnas.
+    """
+    yield '{"timestamp":'
+    yield from _encode_column(history, 'timestamps', count, None)
+
+    for column, name in (('temperature', 'temperature'), ('pressure', 'pressure'),
+                         ('humidity', 'humidity'), ('battery', 'battery_voltage')):
+        yield ',"'
+        yield name
+        yield '":'
+        yield from _encode_column(history, column, count, 2)
+
+    yield ',"soil_humidity":['
+
+    plants = history.plants
+    index = 0
+
+    for segment in history.segments('soil', count):
+        for value in segment:
+            if index % plants == 0:
+                yield '[' if index == 0 else '],['
+            else:
+                yield ','
+
+            yield encode_float(value, 1)
+            index += 1
+
+    yield ']]' if index else ']'
+    yield '}'
+
+
+def measure (chunks) -> int:
+    """
+    Bytes totales de un documento recorriendo su generador sin guardarlo.
+    """
+    size = 0
+
+    for chunk in chunks:
+        size += len(chunk)
+
+    return size
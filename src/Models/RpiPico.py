@@ -5,6 +5,10 @@ from time import sleep_ms
 import time
 import ubinascii
 import sys
+import _thread
+import uasyncio as asyncio
+from Models.RunningStats import RunningStats
+from Models.Wifi import Wifi, STATE_IDLE, STATE_CONNECTED, STATE_OFFLINE
 
 # Intento importar variables de entorno si existen
 try:
@@ -13,6 +17,11 @@ except Exception:
     ENV = None
 
 # Constants
+RADIO_IDLE_PERFORMANCE = 'performance'
+RADIO_IDLE_POWERSAVE = 'powersave'
+RADIO_IDLE_OFF = 'off'
+RADIO_IDLE_AUTO = 'auto'
+
 WIFI_DISCONNECTED = 0
 WIFI_CONNECTING = 1
 WIFI_CONNECTED = 3
@@ -28,31 +37,6 @@ class RpiPico:
     # Voltaje de trabajo.
     voltage_working = 3.3
 
-    # Estadísticas para la temperatura del procesador.
-    cpu_temp_stats = {
-        "max": 0.0,
-        "min": 0.0,
-        "avg": 0.0,
-        "current": 0.0,
-        "num_of_measurements": 0, # Veces que se ha medido
-        "sum_of_temps": 0.0, # Suma de todas las temperaturas medidas
-    }
-
-    # Número de mediciones de temperatura.
-    num_of_measurements = 0
-
-    max = 0
-    min = 0
-    avg = 0
-    current = 0
-    sum_of_temps = 0  # Suma de todas las lecturas de temperatura.
-
-    # Indica si el microcontrolador está bloqueado con una operación delicada.
-    locked = False
-
-    # Instancia que representa el Wireless si estuviera establecido.
-    wifi = None
-
     # Configuración de Buses I2C.
     i2c0 = None
     i2c1 = None
@@ -73,7 +57,14 @@ class RpiPico:
     is_rtc_set = False
 
     def __init__ (self, ssid=None, password=None, debug=False, country="ES",
-                  alternatives_ap=None, hostname="Rpi-Pico-W"):
+                  alternatives_ap=None, hostname="Rpi-Pico-W", connect=True,
+                  wifi_cache_path='wifi.cache', wifi_static_ip=False,
+                  wifi_fast_timeout_ms=3000, wifi_attempt_timeout_ms=15000,
+                  wifi_backoff_ms=5000, wifi_backoff_max_ms=600000,
+                  wifi_radio_budget_ms=300000, wifi_roam_rssi=-75,
+                  wifi_roam_interval_ms=300000, radio_idle=RADIO_IDLE_AUTO,
+                  radio_off_min_gap_ms=600000, radio_energy_budget_ms=0,
+                  device_info_ttl_ms=10000):
         """
         Constructor de la clase para Raspberry Pi Pico W.
 
@@ -84,8 +75,36 @@ class RpiPico:
             country (str): Código del país. Por defecto 'ES'.
             alternatives_ap (tuple): Puedes pasar una tupla con redes adicionales.
             hostname (str): Nombre del dispositivo en la red.
+            connect (bool): Conecta al Wi-Fi en el constructor. Con False se
+                            conecta más tarde con wifi_connect().
+            wifi_cache_path (str): Fichero en la flash con la última conexión
+                                   correcta (None para no guardarla).
+            wifi_static_ip (bool): Reutiliza la IP de la última conexión en
+                                   lugar de pedirla por DHCP.
+            wifi_fast_timeout_ms (int): Tiempo máximo para conectar al punto
+                                        de acceso guardado antes de escanear.
+            wifi_attempt_timeout_ms (int): Tiempo máximo de cada intento de conexión.
+            wifi_backoff_ms (int): Espera tras el primer intento fallido, se
+                                   duplica con cada fallo seguido.
+            wifi_backoff_max_ms (int): Espera máxima entre intentos.
+            wifi_radio_budget_ms (int): Tiempo de radio para intentos de
+                                        conexión por hora (0 sin límite).
+            wifi_roam_rssi (int): Señal (dBm) por debajo de la que se busca
+                                  un punto de acceso mejor (None desactiva).
+            wifi_roam_interval_ms (int): Intervalo entre comprobaciones de la señal.
+            radio_idle (str): Estado de la radio entre ráfagas de red:
+                              'performance', 'powersave', 'off' o 'auto'.
+            radio_off_min_gap_ms (int): En 'auto', pausa mínima hasta la
+                                        siguiente ráfaga para apagar la radio.
+            radio_energy_budget_ms (int): Tiempo de radio encendida por hora
+                                          con la batería llena (0 sin límite).
+            device_info_ttl_ms (int): Validez de los datos variables de
+                                      get_device_info() (batería, red).
         """
-        self.locked = True
+        # Cerrojo para operaciones delicadas sobre el hardware (ADC, I2C, SPI,
+        # IRQ). Se comparte entre los dos núcleos del RP2040.
+        self.lock = _thread.allocate_lock()
+
         self.DEBUG = debug
         self.SSID = ssid
         self.PASSWORD = password
@@ -93,8 +112,53 @@ class RpiPico:
         self.hostname = hostname
         self.alternatives_ap = alternatives_ap
 
+        # Información del dispositivo: fija (una vez) y variable (con caducidad)
+        self._id = None
+        self._descriptor = None
+        self._device_info = None
+        self._device_info_at = 0
+        self._device_info_state = None
+        self.device_info_ttl_ms = device_info_ttl_ms
+
+        # Conexión Wi-Fi sin bloqueos con reintentos
+        self.wifi_manager = Wifi(ssid=ssid, password=password,
+                                 alternatives_ap=alternatives_ap,
+                                 hostname=hostname, cache_path=wifi_cache_path,
+                                 static_ip=wifi_static_ip,
+                                 fast_timeout_ms=wifi_fast_timeout_ms,
+                                 attempt_timeout_ms=wifi_attempt_timeout_ms,
+                                 backoff_ms=wifi_backoff_ms,
+                                 backoff_max_ms=wifi_backoff_max_ms,
+                                 radio_budget_ms=wifi_radio_budget_ms,
+                                 roam_rssi=wifi_roam_rssi,
+                                 roam_interval_ms=wifi_roam_interval_ms,
+                                 debug=debug)
+
+        # Política de energía de la radio
+        self.radio_idle = radio_idle
+        self.radio_off_min_gap_ms = radio_off_min_gap_ms
+        self.radio_energy_budget_ms = radio_energy_budget_ms
+        self.radio_stats = {
+            "bursts": 0,
+            "deferred": 0,  # Ráfagas aplazadas por el presupuesto de energía
+            "not_connected": 0,  # Ráfagas saltadas sin conectar a tiempo
+            "idle_off": 0,
+            "idle_powersave": 0,
+        }
+
+        # Un único objeto ADC por canal (get_adc)
+        self._adcs = {}
+
         # Sensor interno de Raspberry Pi Pico para temperatura de CPU.
-        self.TEMP_SENSOR = ADC(4)
+        self.TEMP_SENSOR = self.get_adc(4)
+
+        # Estadísticas de la temperatura del procesador (de cada instancia)
+        self.cpu_temp_stats = RunningStats()
+
+        # Estadísticas del voltaje de la batería externa, instantáneo y
+        # estimado
+        self.battery_stats = RunningStats()
+        self.battery_estimated_stats = RunningStats()
 
         # Defino Pin para el LED integrado
         self.LED_INTEGRATED = Pin("LED", Pin.OUT)
@@ -106,16 +170,30 @@ class RpiPico:
         self.adc_conversion_factor = self.voltage_working / 65535
 
         # Si se proporcionan credenciales del AP intenta la conexión
-        if ssid and password:
+        if ssid and password and connect:
             if self.DEBUG:
                 print('Iniciando la conexión inalámbrica')
 
             self.wifi_connect(ssid, password)
+            self.radio_burst_end()
 
         sleep_ms(100)
 
         self.cpu_temperature_reset_stats()
-        self.locked = False
+
+    @property
+    def wifi(self):
+        """
+        Instancia que representa el Wireless si estuviera establecido.
+        """
+        return self.wifi_manager.wlan
+
+    @property
+    def locked(self) -> bool:
+        """
+        Indica si el microcontrolador está bloqueado con una operación delicada.
+        """
+        return self.lock.locked()
 
     def get_versions(self):
         version_string = sys.version
@@ -154,42 +232,101 @@ class RpiPico:
 
         return firmware, micropython
 
-    def get_device_info(self):
+    def get_descriptor(self):
+        """
+        Datos del dispositivo que no cambian durante la ejecución. Se
+        calculan una vez y se guardan en una tupla.
+
+        Returns:
+            tuple: (device_id, firmware, micropython, hardware, mac_address)
+        """
+        descriptor = self._descriptor
+
+        if descriptor is None:
+            firmware, micropython = self.get_versions()
+            descriptor = self._descriptor = (
+                self.get_id(), firmware, micropython, "Raspberry Pi Pico W",
+                self.get_wireless_mac())
+        elif descriptor[4] is None:
+            # Sin la MAC (radio sin iniciar) se vuelve a intentar más tarde
+            mac = self.get_wireless_mac()
+
+            if mac:
+                descriptor = self._descriptor = descriptor[:4] + (mac,)
+
+        return descriptor
+
+    def get_device_info(self, read_battery=True):
         """
         Devuelve la información del dispositivo.
+
+        Los datos fijos salen de get_descriptor(). Los variables (batería,
+        red) se leen como mucho una vez cada ``device_info_ttl_ms`` o al
+        cambiar el estado de la conexión; el tiempo encendido y las métricas
+        del Wi-Fi se actualizan en cada llamada. Se devuelve siempre el mismo
+        diccionario actualizado.
+
+        :param read_battery: Si es False usa la última lectura de la batería
+                             y de la temperatura de la CPU (las toma el
+                             núcleo 1).
         :return:
         """
+        info = self._device_info
+        now = time.ticks_ms()
+        wifi = self.wifi_manager
+
+        if info is None:
+            device_id, firmware, micropython, hardware, mac = self.get_descriptor()
+            info = self._device_info = {
+                "device_id": device_id,
+                "firmware": firmware,
+                "micropython": micropython,
+                "hardware": hardware,
+                "temperature": 37,
+                "mac_address": mac,
+            }
+            expired = True
+        else:
+            expired = (time.ticks_diff(now, self._device_info_at) >= self.device_info_ttl_ms
+                       or self._device_info_state != wifi.state)
 
-        battery = self.get_battery_stats()
+        if expired:
+            if read_battery:
+                self.cpu_temperature_read_sensor()
 
-        firmware, micropython = self.get_versions()
+            battery = self.get_battery_stats(read=read_battery)
 
-        return {
-            "device_id": self.get_id(),
-            "firmware": firmware,
-            "micropython": micropython,
-            "hardware": "Raspberry Pi Pico W",
-            "temperature": 37,
-            "battery": battery.get('percentage'),
-            "battery_voltage": battery.get('voltage'),
-            "uptime": int(time.ticks_ms() / 1000),
-            "mac_address": self.get_wireless_mac(),
-            "wifi_rssi": self.get_wireless_rssi(),
-            "wifi_ssid": self.get_wireless_ssid(),
-            "wifi_ip": self.get_wireless_ip(),
-        }
+            if info["mac_address"] is None:
+                info["mac_address"] = self.get_descriptor()[4]
+
+            info["battery"] = battery.get('percentage')
+            info["battery_voltage"] = battery.get('voltage')
+            info["wifi_rssi"] = self.get_wireless_rssi()
+            info["wifi_ssid"] = self.get_wireless_ssid()
+            info["wifi_ip"] = self.get_wireless_ip()
+
+            self._device_info_at = now
+            self._device_info_state = wifi.state
+
+        if self.cpu_temp_stats.count:
+            info["temperature"] = self.cpu_temp_stats.last
+        info["uptime"] = now // 1000
+        info["wifi_connect_ms"] = wifi.connect_ms
+        info["wifi_boot_to_connected_ms"] = wifi.boot_to_connected_ms
+        info["wifi_fast_connect"] = wifi.fast_connect
+        info["wifi_radio_on_ms_hour"] = wifi.radio_on_hour_ms()
+
+        return info
 
     def get_id(self):
         """
         Devuelve el ID del chip.
         """
-        # ID único del chip como bytes
-        id = unique_id()
+        if self._id is None:
+            # ID único del chip como bytes convertido a hexadecimal
+            self._id = 'rpi_pico_w_' + ubinascii.hexlify(unique_id()).decode()
 
-        # Convierto a hexadecimal para usar como string
-        unique_id_hex = ubinascii.hexlify(id).decode()
-
-        return 'rpi_pico_w_' + unique_id_hex
+        return self._id
 
     def set_callback_to_pin(self, pin_number, callback, event="HIGH"):
         """
@@ -204,27 +341,25 @@ class RpiPico:
             ValueError: Si ya existe un callback configurado para el pin.
         """
 
-        self.locked = True
-        sleep_ms(100)
-
-        # Verifico si ya existe un callback para el pin
-        for cb_data in self.callbacks:
-            if cb_data["pin"] == pin_number:
-                raise ValueError(
-                    f"Ya existe un callback configurado para el pin {str(pin_number)}")
+        with self.lock:
+            sleep_ms(100)
 
-        # Configura el pin como entrada con pull-up
-        pin = Pin(pin_number, Pin.IN, Pin.PULL_UP)
-        trigger = Pin.IRQ_RISING if event == "HIGH" else Pin.IRQ_FALLING
-        pin.irq(trigger=trigger, handler=callback)
+            # Verifico si ya existe un callback para el pin
+            for cb_data in self.callbacks:
+                if cb_data["pin"] == pin_number:
+                    raise ValueError(
+                        f"Ya existe un callback configurado para el pin {str(pin_number)}")
 
-        # Agrega el callback a la lista
-        self.callbacks.append({
-            "pin": pin,
-            "callback": callback
-        })
+            # Configura el pin como entrada con pull-up
+            pin = Pin(pin_number, Pin.IN, Pin.PULL_UP)
+            trigger = Pin.IRQ_RISING if event == "HIGH" else Pin.IRQ_FALLING
+            pin.irq(trigger=trigger, handler=callback)
 
-        self.locked = False
+            # Agrega el callback a la lista
+            self.callbacks.append({
+                "pin": pin,
+                "callback": callback
+            })
 
         return pin
 
@@ -233,14 +368,13 @@ class RpiPico:
         Deshabilita todos los callbacks que existan asociados a IRQ.
         :return:
         """
-        self.locked = True
-        sleep_ms(100)
+        with self.lock:
+            sleep_ms(100)
 
-        for callback_data in self.callbacks:
-            callback_data["pin"].irq(trigger=Pin.IRQ_DISABLE)
+            for callback_data in self.callbacks:
+                callback_data["pin"].irq(trigger=Pin.IRQ_DISABLE)
 
-        self.callbacks.clear()
-        self.locked = False
+            self.callbacks.clear()
 
     def set_i2c(self, pin_sda, pin_scl, bus=0, frequency=400000):
         """
@@ -258,25 +392,21 @@ class RpiPico:
         if bus > 1:
             return None
 
-        self.locked = True
-        sleep_ms(100)
-
-        try:
-            i2c = I2C(bus, sda=Pin(pin_sda), scl=Pin(pin_scl), freq=frequency)
-
-            if bus == 0:
-                self.i2c0 = i2c
-            elif bus == 1:
-                self.i2c1 = i2c
-        except Exception as e:
-            if self.DEBUG:
-                print('Error en set_i2c:', e)
+        with self.lock:
+            sleep_ms(100)
 
-            self.locked = False
+            try:
+                i2c = I2C(bus, sda=Pin(pin_sda), scl=Pin(pin_scl), freq=frequency)
 
-            return None
+                if bus == 0:
+                    self.i2c0 = i2c
+                elif bus == 1:
+                    self.i2c1 = i2c
+            except Exception as e:
+                if self.DEBUG:
+                    print('Error en set_i2c:', e)
 
-        self.locked = False
+                return None
 
         return i2c
 
@@ -298,33 +428,29 @@ class RpiPico:
         if bus > 1:
             return None
 
-        self.locked = True
-        sleep_ms(100)
-
-        try:
-            if pin_miso:
-                spi = SPI(bus, sck=Pin(pin_sck), mosi=Pin(pin_mosi),
-                          miso=Pin(pin_miso), baudrate=baudrate)
-            else:
-                spi = SPI(bus, sck=Pin(pin_sck), mosi=Pin(pin_mosi), baudrate=baudrate)
-
-            spi_cs = Pin(pin_cs, Pin.OUT)
-
-            if bus == 0:
-                self.spi0 = spi
-                self.spi0_cs = spi_cs
-            elif bus == 1:
-                self.spi1 = spi
-                self.spi1_cs = spi_cs
-        except Exception as e:
-            if self.DEBUG:
-                print('Error en set_spi:', e)
+        with self.lock:
+            sleep_ms(100)
 
-            self.locked = False
-
-            return None
+            try:
+                if pin_miso:
+                    spi = SPI(bus, sck=Pin(pin_sck), mosi=Pin(pin_mosi),
+                              miso=Pin(pin_miso), baudrate=baudrate)
+                else:
+                    spi = SPI(bus, sck=Pin(pin_sck), mosi=Pin(pin_mosi), baudrate=baudrate)
+
+                spi_cs = Pin(pin_cs, Pin.OUT)
+
+                if bus == 0:
+                    self.spi0 = spi
+                    self.spi0_cs = spi_cs
+                elif bus == 1:
+                    self.spi1 = spi
+                    self.spi1_cs = spi_cs
+            except Exception as e:
+                if self.DEBUG:
+                    print('Error en set_spi:', e)
 
-        self.locked = False
+                return None
 
         return spi
 
@@ -348,47 +474,39 @@ class RpiPico:
         Args:
             temp (float): Valor inicial con el que resetear las estadísticas. Por defecto 0.0.
         """
-        temp = temp if temp else self.cpu_temperature_read_sensor()
+        self.cpu_temp_stats.reset()
 
-        self.cpu_temp_stats["num_of_measurements"] = 1
-        self.cpu_temp_stats["sum_of_temps"] = temp
-        self.cpu_temp_stats["max"] = temp
-        self.cpu_temp_stats["min"] = temp
-        self.cpu_temp_stats["avg"] = temp
-        self.cpu_temp_stats["current"] = temp
+        if temp:
+            self.cpu_temp_stats.update(temp)
+        else:
+            self.cpu_temperature_read_sensor()
 
-    def cpu_temperature_read_sensor (self) -> float:
+    def cpu_temperature_read_sensor (self, raw=None) -> float:
         """
         Lee la temperatura actual del sensor.
 
+        Args:
+            raw (int): Lectura del ADC ya tomada (AnalogSampler), sin acceder
+                       al sensor.
+
         Returns:
             float: Temperatura leída.
         """
-        # Continúa si no está bloqueado
-        if self.locked:
-            return self.cpu_temp_stats["current"]
+        if raw is None:
+            # Continúa si no está bloqueado, sin esperar a que se libere
+            if not self.lock.acquire(0):
+                return self.cpu_temp_stats.last
 
-        self.locked = True
+            try:
+                raw = self.TEMP_SENSOR.read_u16()
+            finally:
+                self.lock.release()
 
-        reading = (self.TEMP_SENSOR.read_u16() * self.adc_conversion_factor) - self.adc_voltage_correction
+        reading = (raw * self.adc_conversion_factor) - self.adc_voltage_correction
         value = self.INTEGRATED_TEMP_CORRECTION - reading / 0.001721
 
         cpu_temp = round(float(value), 1)
-        self.cpu_temp_stats["current"] = cpu_temp
-
-        # Comprueba si supera la máxima registrada.
-        if cpu_temp > self.cpu_temp_stats["max"]:
-            self.cpu_temp_stats["max"] = cpu_temp
-
-        # Comprueba si es inferior a la mínima registrada.
-        if cpu_temp < self.cpu_temp_stats["min"]:
-            self.cpu_temp_stats["min"] = cpu_temp
-
-        self.cpu_temp_stats["num_of_measurements"] += 1
-        self.cpu_temp_stats["sum_of_temps"] += cpu_temp
-        self.cpu_temp_stats["avg"] = round(self.cpu_temp_stats["sum_of_temps"] / self.cpu_temp_stats["num_of_measurements"], 1)
-
-        self.locked = False
+        self.cpu_temp_stats.update(cpu_temp)
 
         return cpu_temp
 
@@ -439,9 +557,10 @@ class RpiPico:
         Obtiene las estadísticas actuales de temperatura.
 
         Returns:
-            dict: Contiene la temperatura máxima, mínima, promedio y actual.
+            dict: Temperatura actual (last), máxima, mínima, media, desviación
+                  típica y número de medidas.
         """
-        return self.cpu_temp_stats
+        return self.cpu_temp_stats.get_stats(1)
 
     def wifi_status (self) -> int:
         """
@@ -560,7 +679,9 @@ class RpiPico:
 
     def wifi_connect (self, ssid=None, password=None) -> bool:
         """
-        Intenta conectar a Wi-Fi con las credenciales dadas.
+        Hace un intento de conexión Wi-Fi esperando a que termine, como mucho
+        el tiempo máximo de cada intento (Models.Wifi). Si falla, la tarea
+        que llama a ``wifi_poll()`` sigue reintentando.
 
         Args:
             ssid (str): ID de red para la conexión Wi-Fi.
@@ -569,42 +690,186 @@ class RpiPico:
         Retorno:
             bool: True si se logra conectarse, False en caso contrario.
         """
-        if ssid is None and password is None:
-            ssid, password = self.SSID, self.PASSWORD
+        if ssid is not None or password is not None:
+            self.wifi_manager.ssid, self.wifi_manager.password = ssid, password
 
-        self.wifi = network.WLAN(network.STA_IF)
-        self.wifi.active(True)
+        connected = self.wifi_manager.connect()
 
-        # Establezco el nombre del host
-        network.hostname(self.hostname)
+        if connected and self.DEBUG:
+            self.wifi_debug()
 
-        # Desactivo el ahorro de energía
-        self.wifi.config(pm=0xa11140)
+        return connected
 
-        while not self.wifi_is_connected():
-            # Escaneo las redes disponibles
-            available_ssids = self.wifi.scan()
-            available_ssids = [ap[0].decode('utf-8') for ap in available_ssids]
+    def wifi_poll (self) -> int:
+        """
+        Avanza la conexión Wi-Fi sin bloquear (salvo al escanear redes).
+        Se llama periódicamente desde el planificador. Apaga la radio si se
+        ha agotado el presupuesto de energía de la hora en curso.
 
-            # Si la red principal se encuentra disponible, intenta conectar a ella
-            if self.SSID in available_ssids:
-                self.wifi.connect(self.SSID, self.PASSWORD)
-            else:
-                # Si no esta la red principal, intenta conectar a las redes secundarias disponibles
-                for ap in self.alternatives_ap:
-                    if ap['ssid'] in available_ssids:
-                        self.wifi.connect(ap['ssid'], ap['password'])
+        Returns:
+            int: Estado de la conexión (Models.Wifi.STATE_*).
+        """
+        if self.wifi_manager.state != STATE_IDLE and self.radio_budget_exceeded():
+            if self.DEBUG:
+                print('Radio: presupuesto de energía agotado, se apaga la radio')
 
-            sleep_ms(1000)
+            self.radio_stats["idle_off"] += 1
+            self.wifi_manager.stop()
 
-            if self.wifi_is_connected():
-                if self.DEBUG:
-                    self.wifi_debug()
+        return self.wifi_manager.poll()
+
+    def radio_energy_factor (self) -> float:
+        """
+        Fracción del presupuesto de radio según la carga de la batería
+        externa (entre 0.1 y 1). Sin batería configurada es 1.
+        """
+        battery = self.external_battery
+
+        if not battery:
+            return 1.0
+
+        percentage = battery.get('voltage_percentage_estimated')
+
+        if percentage is None:
+            percentage = battery.get('voltage_percentage')
+
+        if percentage is None:
+            return 1.0
+
+        return min(1.0, max(0.1, percentage / 100))
+
+    def radio_budget_exceeded (self) -> bool:
+        """
+        Indica si en la hora en curso la radio ha estado encendida más
+        tiempo del presupuesto de energía.
+        """
+        if not self.radio_energy_budget_ms:
+            return False
+
+        budget = self.radio_energy_budget_ms * self.radio_energy_factor()
+
+        return self.wifi_manager.radio_on_hour_ms() >= budget
+
+    def _radio_burst_prepare (self) -> bool:
+        """
+        Comprueba el presupuesto de energía y quita el ahorro de energía de
+        la radio para una ráfaga.
+
+        Returns:
+            bool: False si la ráfaga se aplaza por el presupuesto.
+        """
+        if self.radio_budget_exceeded():
+            self.radio_stats["deferred"] += 1
+
+            if self.DEBUG:
+                print('Radio: presupuesto de energía agotado, se aplaza la ráfaga')
 
-                return True
+            return False
+
+        self.radio_stats["bursts"] += 1
+        self.wifi_manager.set_power_mode(True)
+
+        return True
+
+    def radio_burst_begin (self) -> bool:
+        """
+        Prepara la radio para una ráfaga de red (subida o configuración):
+        sin ahorro de energía y conectada. Si la radio está apagada entre
+        ráfagas se conecta ahora esperando al intento, por lo que solo se usa
+        fuera del planificador (DUTY_CYCLE); si ya se reintenta en segundo
+        plano no se espera.
+
+        Returns:
+            bool: True si hay conexión para la ráfaga.
+        """
+        wifi = self.wifi_manager
+
+        if not self._radio_burst_prepare():
+            return False
+
+        if wifi.is_connected():
+            return True
+
+        if wifi.state == STATE_IDLE and (self.SSID or self.alternatives_ap):
+            return self.wifi_connect()
 
         return False
 
+    async def radio_burst_begin_async (self, timeout_ms=None) -> bool:
+        """
+        Igual que radio_burst_begin() sin bloquear el planificador: con la
+        radio apagada activa la conexión (Models.Wifi.start) y espera cediendo
+        el control a que la tarea que llama a ``wifi_poll()`` conecte.
+
+        Args:
+            timeout_ms (int): Espera máxima, por defecto la de un intento
+                              rápido más uno completo.
+
+        Returns:
+            bool: True si hay conexión para la ráfaga; False si no se ha
+                  conectado a tiempo (la ráfaga se salta).
+        """
+        wifi = self.wifi_manager
+
+        if not self._radio_burst_prepare():
+            return False
+
+        if wifi.is_connected():
+            return True
+
+        if not (self.SSID or self.alternatives_ap):
+            return False
+
+        if timeout_ms is None:
+            timeout_ms = wifi.fast_timeout_ms + wifi.attempt_timeout_ms
+
+        wifi.start()
+        start = time.ticks_ms()
+
+        while wifi.state != STATE_CONNECTED:
+            if (wifi.state in (STATE_IDLE, STATE_OFFLINE) or
+                    time.ticks_diff(time.ticks_ms(), start) >= timeout_ms):
+                self.radio_stats["not_connected"] += 1
+
+                if self.DEBUG:
+                    print('Radio: sin conexión para la ráfaga, se salta')
+
+                return False
+
+            await asyncio.sleep_ms(100)
+
+        return True
+
+    def radio_burst_end (self, next_burst_ms=None) -> None:
+        """
+        Termina una ráfaga de red y deja la radio con ahorro de energía o
+        apagada hasta la siguiente.
+
+        Args:
+            next_burst_ms (int): Tiempo previsto hasta la siguiente ráfaga;
+                                 en modo 'auto' decide si se apaga la radio.
+        """
+        idle = self.radio_idle
+
+        if idle == RADIO_IDLE_PERFORMANCE:
+            return
+
+        if idle == RADIO_IDLE_AUTO:
+            if next_burst_ms is not None and next_burst_ms >= self.radio_off_min_gap_ms:
+                idle = RADIO_IDLE_OFF
+            else:
+                idle = RADIO_IDLE_POWERSAVE
+
+        if self.radio_budget_exceeded():
+            idle = RADIO_IDLE_OFF
+
+        if idle == RADIO_IDLE_OFF:
+            self.radio_stats["idle_off"] += 1
+            self.wifi_manager.stop()
+        else:
+            self.radio_stats["idle_powersave"] += 1
+            self.wifi_manager.set_power_mode(False)
+
     def wireless_info (self):
         info_client = [
             {
@@ -648,11 +913,29 @@ class RpiPico:
 
     def wifi_disconnect (self) -> None:
         """
-        Desconecta el wi-fi.
+        Desconecta el wi-fi, apaga la radio y deja de reintentar la conexión.
 
         :return: None
         """
-        self.wifi.disconnect()
+        self.wifi_manager.stop()
+
+    def get_adc (self, pin):
+        """
+        Devuelve el objeto ADC de un pin o canal, creándolo solo la primera vez.
+
+        Args:
+            pin (int): GPIO (26-28) o canal del ADC (4 para la temperatura).
+
+        Returns:
+            ADC: Objeto ADC compartido del canal.
+        """
+        adc = self._adcs.get(pin)
+
+        if adc is None:
+            adc = ADC(pin)
+            self._adcs[pin] = adc
+
+        return adc
 
     def read_analog_input (self, pin) -> float:
         """
@@ -664,13 +947,42 @@ class RpiPico:
         Returns:
             float: Lectura analógica.
         """
-        reading = ADC(pin).read_u16()
+        with self.lock:
+            reading = self.get_adc(pin).read_u16()
 
         return self.voltage_working - ((reading / 65535) * self.voltage_working)
 
-    def read_external_battery (self):
+    def battery_percentage (self, voltage):
+        """
+        Porcentaje de carga de un voltaje entre los umbrales de la batería.
+
+        Returns:
+            float: Porcentaje (0-100), None sin voltaje.
+        """
+        if voltage is None:
+            return None
+
         min_voltage = self.external_battery["threshold_voltage_min"]
         max_voltage = self.external_battery["threshold_voltage_max"]
+
+        if max_voltage <= min_voltage:
+            return 0.0
+
+        percentage = (voltage - min_voltage) / (max_voltage - min_voltage) * 100.0
+
+        return max(0.0, min(percentage, 100.0))
+
+    def read_external_battery (self, adc_raw=None):
+        """
+        Lee la batería externa y actualiza su estimación.
+
+        Args:
+            adc_raw (int): Lectura del ADC ya tomada (AnalogSampler o el
+                           núcleo 1 con el cerrojo), sin acceder al ADC.
+
+        Returns:
+            dict: Estado de la batería externa.
+        """
         adc = self.external_battery["adc"]
         r1 = self.external_battery.get("divider_r1_ohms", 100000)
         r2 = self.external_battery.get("divider_r2_ohms", 100000)
@@ -678,7 +990,9 @@ class RpiPico:
         calib_offset = self.external_battery.get("calibration_offset", 0.0)
         estimation_alpha = self.external_battery.get("estimation_alpha", 0.2)
 
-        adc_raw = adc.read_u16()
+        if adc_raw is None:
+            with self.lock:
+                adc_raw = adc.read_u16()
 
         # Voltaje en el pin ADC
         adc_voltage = adc_raw * self.adc_conversion_factor
@@ -691,11 +1005,7 @@ class RpiPico:
         battery_voltage = battery_voltage * calib_scale + calib_offset
 
         # Porcentaje entre umbrales (valor instantáneo)
-        if max_voltage <= min_voltage:
-            percentage = 0.0
-        else:
-            percentage_raw = ((battery_voltage - min_voltage) / (max_voltage -  min_voltage) * 100.0)
-            percentage = max(0.0, min(percentage_raw, 100.0))
+        percentage = self.battery_percentage(battery_voltage)
 
         # Estimación mediante EMA
         try:
@@ -712,11 +1022,7 @@ class RpiPico:
             voltage_estimated = (alpha * battery_voltage) + ((1.0 - alpha) * prev_est)
 
         # Porcentaje estimado
-        if max_voltage <= min_voltage:
-            percentage_estimated = 0.0
-        else:
-            percentage_estimated_raw = ((voltage_estimated - min_voltage) / (max_voltage -  min_voltage) * 100.0)
-            percentage_estimated = max(0.0, min(percentage_estimated_raw, 100.0))
+        percentage_estimated = self.battery_percentage(voltage_estimated)
 
         # Actualizo métricas
         self.external_battery["adc_raw"] = adc_raw
@@ -726,23 +1032,9 @@ class RpiPico:
         self.external_battery["voltage_estimated"] = voltage_estimated
         self.external_battery["voltage_percentage_estimated"] = percentage_estimated
 
-        # Actualizar min/max de instantáneo
-        if self.external_battery["voltage_min"] is None or battery_voltage < self.external_battery["voltage_min"]:
-            self.external_battery["voltage_min"] = battery_voltage
-            self.external_battery["voltage_percentage_min"] = percentage
-
-        if (self.external_battery["voltage_max"] is None or battery_voltage > self.external_battery["voltage_max"]):
-            self.external_battery["voltage_max"] = battery_voltage
-            self.external_battery["voltage_percentage_max"] = percentage
-
-        # Actualizar min/max estimados
-        if self.external_battery.get("voltage_estimated_min") is None or voltage_estimated < self.external_battery["voltage_estimated_min"]:
-            self.external_battery["voltage_estimated_min"] = voltage_estimated
-            self.external_battery["voltage_percentage_estimated_min"] = percentage_estimated
-
-        if self.external_battery.get("voltage_estimated_max") is None or voltage_estimated > self.external_battery["voltage_estimated_max"]:
-            self.external_battery["voltage_estimated_max"] = voltage_estimated
-            self.external_battery["voltage_percentage_estimated_max"] = percentage_estimated
+        # Mínimo, máximo, media y desviación del instantáneo y del estimado
+        self.battery_stats.update(battery_voltage)
+        self.battery_estimated_stats.update(voltage_estimated)
 
         return self.external_battery
 
@@ -772,37 +1064,50 @@ class RpiPico:
 
         self.external_battery = {
             "pin": pin,
-            "adc": ADC(pin),
+            "adc": self.get_adc(pin),
             "threshold_voltage_min": threshold_voltage_min,
             "threshold_voltage_max": threshold_voltage_max,
             "voltage_current": None,
-            "voltage_min": None,
-            "voltage_max": None,
             "voltage_percentage": None,
-            "voltage_percentage_min": None,
-            "voltage_percentage_max": None,
             "divider_r1_ohms": r1,
             "divider_r2_ohms": r2,
             "calibration_scale": calib_scale,
             "calibration_offset": calib_offset,
             "estimation_alpha": estimation_alpha,
-            # Valores estimados y sus extremos
+            # Valores estimados (los extremos están en battery_estimated_stats)
             "voltage_estimated": None,
-            "voltage_estimated_min": None,
-            "voltage_estimated_max": None,
             "voltage_percentage_estimated": None,
-            "voltage_percentage_estimated_min": None,
-            "voltage_percentage_estimated_max": None,
         }
 
+        self.battery_stats.reset()
+        self.battery_estimated_stats.reset()
+
         self.read_external_battery()
 
-    def get_battery_stats(self):
-        datas = self.read_external_battery()
+    def get_battery_stats(self, read=True):
+        """
+        Devuelve el voltaje y porcentaje de la batería externa.
+
+        Args:
+            read (bool): Si es False devuelve la última lectura sin acceder al
+                         ADC (cuando otro núcleo se encarga de leerla).
+
+        Returns:
+            dict: Voltaje y porcentaje, None si no hay batería configurada.
+        """
+        if not self.external_battery:
+            return {
+                "voltage": None,
+                "percentage": None,
+            }
+
+        datas = self.read_external_battery() if read else self.external_battery
+        voltage = datas.get('voltage_current')
+        percentage = datas.get('voltage_percentage')
 
         return {
-            "voltage": round(datas.get('voltage_current'), 2),
-            "percentage": round(datas.get('voltage_percentage'), 1),
+            "voltage": round(voltage, 2) if voltage is not None else None,
+            "percentage": round(percentage, 1) if percentage is not None else None,
         }
 
     def sync_rtc_time (self):
@@ -924,4 +1229,4 @@ class RpiPico:
         Para evitar problemas al entrar en el modo, se necesita desactivar el wireless primero.
         """
         self.wifi_disconnect()
-        deepsleep(seconds * 1000)
+        deepsleep(int(seconds * 1000))
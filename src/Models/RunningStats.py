@@ -0,0 +1,132 @@
+import math
+import time
+
+INF = float('inf')
+
+
+class RunningStats:
+    """
+    Estadísticas acumuladas de una magnitud: mínimo, máximo, media y varianza
+    (algoritmo de Welford), número de medidas, último valor y su instante.
+
+    Cada actualización solo reescribe atributos, sin buscar claves en un
+    diccionario ni crear contenedores. El diccionario de get_stats() se crea
+    solo al consultarlo.
+
+    El mínimo y el máximo pueden conservarse sin medidas (count 0), por
+    ejemplo al restaurar los extremos guardados entre despertares.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'last', 'ts_ms')
+
+    def __init__ (self):
+        self.reset()
+
+    def reset (self) -> None:
+        """
+        Olvida todas las medidas.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Suma de los cuadrados de las desviaciones
+        self.min = INF
+        self.max = -INF
+        self.last = None
+        self.ts_ms = 0
+
+    def update (self, value, ts_ms=None) -> None:
+        """
+        Añade una medida.
+
+        Args:
+            value (float): Valor medido.
+            ts_ms (int): ticks_ms() de la medida, el actual si es None.
+        """
+        count = self.count + 1
+        delta = value - self.mean
+        mean = self.mean + delta / count
+
+        self.count = count
+        self.mean = mean
+        self.m2 += delta * (value - mean)
+        self.last = value
+        self.ts_ms = time.ticks_ms() if ts_ms is None else ts_ms
+
+        if value < self.min:
+            self.min = value
+
+        if value > self.max:
+            self.max = value
+
+    def restore (self, count=0, mean=0.0, m2=0.0, minimum=None, maximum=None,
+                 last=None) -> None:
+        """
+        Recupera unas estadísticas guardadas (Models.Snapshot).
+        """
+        self.count = int(count)
+        self.mean = mean if count else 0.0
+        self.m2 = m2 if count else 0.0
+        self.min = INF if minimum is None else minimum
+        self.max = -INF if maximum is None else maximum
+        self.last = last
+
+    def include_range (self, minimum=None, maximum=None) -> None:
+        """
+        Amplía el mínimo y el máximo con unos extremos guardados, sin contar
+        medidas.
+        """
+        if minimum is not None and minimum < self.min:
+            self.min = minimum
+
+        if maximum is not None and maximum > self.max:
+            self.max = maximum
+
+    @property
+    def minimum (self):
+        """Mínimo o None sin medidas"""
+        return None if self.min == INF else self.min
+
+    @property
+    def maximum (self):
+        """Máximo o None sin medidas"""
+        return None if self.max == -INF else self.max
+
+    @property
+    def variance (self) -> float:
+        """Varianza muestral (0 con menos de dos medidas)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std (self) -> float:
+        """Desviación típica muestral"""
+        return math.sqrt(self.variance)
+
+    def get_stats (self, digits=None) -> dict:
+        """
+        Devuelve las estadísticas.
+
+        Args:
+            digits (int): Decimales a los que se redondea, sin redondear si
+                          es None.
+
+        Returns:
+            dict: count, last, min, max, mean, std y ts_ms (None lo que
+                  todavía no se conoce).
+        """
+        values = [self.last, self.minimum, self.maximum,
+                  self.mean if self.count else None,
+                  self.std if self.count else None]
+
+        if digits is not None:
+            values = [None if value is None else round(value, digits)
+                      for value in values]
+
+        return {
+            "count": self.count,
+            "last": values[0],
+            "min": values[1],
+            "max": values[2],
+            "mean": values[3],
+            "std": values[4],
+            "ts_ms": self.ts_ms,
+        }
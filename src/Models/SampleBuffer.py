@@ -0,0 +1,112 @@
+from array import array
+import _thread
+
+
+class SampleBuffer:
+    """
+    Buffer circular preasignado de muestras con marca de tiempo.
+
+    Está pensado para comunicar los dos núcleos del RP2040: el núcleo 1 escribe
+    muestras con ``push()`` y el núcleo 0 las consume con ``pop()``. Todos los
+    accesos se protegen con un cerrojo de ``_thread`` y el almacenamiento se
+    reserva una sola vez en el constructor, por lo que escribir o leer una
+    muestra no reserva memoria nueva.
+
+    Si el buffer se llena se sobrescribe la muestra más antigua y se contabiliza
+    en ``dropped``.
+
+    :param capacity: Número máximo de muestras almacenadas.
+    :param width: Número de valores por muestra.
+    """
+
+    def __init__ (self, capacity=64, width=3):
+        self.capacity = max(1, int(capacity))
+        self.width = max(1, int(width))
+
+        self.timestamps = array('L', [0] * self.capacity)
+        self.sources = bytearray(self.capacity)
+        self.values = array('f', [0.0] * (self.capacity * self.width))
+
+        self.head = 0  # Próxima posición de escritura
+        self.count = 0  # Muestras pendientes de leer
+        self.dropped = 0  # Muestras sobrescritas sin haberse leído
+        self.pushed = 0  # Muestras escritas en total
+
+        # Marca de tiempo de la última muestra leída con pop()
+        self.last_timestamp = 0
+
+        self.lock = _thread.allocate_lock()
+
+    def push (self, source, timestamp, v0=0.0, v1=0.0, v2=0.0) -> None:
+        """
+        Añade una muestra al buffer.
+
+        Args:
+            source (int): Identificador de la fuente (0-255).
+            timestamp (int): Instante de la muestra en ms (time.ticks_ms()).
+            v0, v1, v2 (float): Valores de la muestra. Se ignoran los que
+                                excedan el ancho del buffer.
+        """
+        with self.lock:
+            i = self.head
+            self.timestamps[i] = timestamp
+            self.sources[i] = source
+
+            base = i * self.width
+            values = self.values
+            values[base] = v0
+            if self.width > 1:
+                values[base + 1] = v1
+            if self.width > 2:
+                values[base + 2] = v2
+
+            self.head = (i + 1) % self.capacity
+            self.pushed += 1
+
+            if self.count < self.capacity:
+                self.count += 1
+            else:
+                self.dropped += 1
+
+    def pop (self, out) -> int:
+        """
+        Extrae la muestra más antigua copiando sus valores en ``out``.
+
+        Args:
+            out: Array preasignado con al menos ``width`` posiciones.
+
+        Returns:
+            int: Identificador de la fuente o -1 si el buffer está vacío. La
+                 marca de tiempo queda en ``last_timestamp``.
+        """
+        with self.lock:
+            if not self.count:
+                return -1
+
+            i = (self.head - self.count) % self.capacity
+            self.count -= 1
+            self.last_timestamp = self.timestamps[i]
+
+            base = i * self.width
+            for j in range(self.width):
+                out[j] = self.values[base + j]
+
+            return self.sources[i]
+
+    def clear (self) -> None:
+        """
+        Descarta todas las muestras pendientes.
+        """
+        with self.lock:
+            self.count = 0
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve el estado de ocupación del buffer.
+        """
+        return {
+            "capacity": self.capacity,
+            "pending": self.count,
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,185 @@
+from array import array
+
+# Métodos de filtrado disponibles
+METHODS = ('mean', 'median', 'trimmed', 'hampel')
+
+# Factor que convierte la MAD en desviación típica para ruido gaussiano
+MAD_SCALE = 1.4826
+
+
+def sort_in_place (buffer, n) -> None:
+    """
+    Ordena las n primeras posiciones de un array por inserción, sin reservar
+    memoria (para los pocos elementos de una lectura es más rápido que
+    sorted()).
+    """
+    for i in range(1, n):
+        value = buffer[i]
+        j = i - 1
+
+        while j >= 0 and buffer[j] > value:
+            buffer[j + 1] = buffer[j]
+            j -= 1
+
+        buffer[j + 1] = value
+
+
+def median_sorted (buffer, n) -> int:
+    """
+    Mediana entera de las n primeras posiciones de un array ya ordenado.
+    """
+    middle = n >> 1
+
+    if n & 1:
+        return buffer[middle]
+
+    return (buffer[middle - 1] + buffer[middle]) >> 1
+
+
+class SampleFilter:
+    """
+    Filtro de las muestras crudas del ADC de una lectura, sobre el propio
+    buffer de muestras y un buffer auxiliar preasignado, sin reservar memoria
+    por lectura.
+
+    Métodos:
+    - mean: media entera (el comportamiento anterior).
+    - median: mediana.
+    - trimmed: media descartando las ``trim`` muestras más bajas y más altas.
+    - hampel: media de las muestras a menos de ``hampel_k`` desviaciones
+      (estimadas con la MAD) de la mediana.
+
+    Opcionalmente se aplica una media móvil exponencial entre lecturas.
+    Las muestras descartadas en cada lectura quedan en ``rejected`` como
+    indicador de calidad (picos de la bomba o del Wi-Fi).
+
+    :param method: Método de filtrado (METHODS).
+    :param trim: Muestras que se descartan por cada extremo en 'trimmed'.
+    :param hampel_k: Umbral en desviaciones para 'hampel'.
+    :param ema_alpha: Peso de la lectura nueva en la media exponencial (0 o
+                      None para desactivarla).
+    :param size: Número de muestras previsto por lectura.
+    """
+
+    def __init__ (self, method='mean', trim=1, hampel_k=3.0, ema_alpha=0.0,
+                  size=8):
+        if method not in METHODS:
+            raise ValueError("Filtro desconocido: {}".format(method))
+
+        if hampel_k <= 0:
+            raise ValueError("hampel_k debe ser mayor que 0: {}".format(hampel_k))
+
+        self.method = method
+        self.trim = max(0, int(trim))
+        self.hampel_k = hampel_k
+        self.ema_alpha = ema_alpha or 0.0
+        self.scratch = array('H', [0] * max(1, int(size)))
+
+        # Umbral de Hampel en milésimas para comparar solo con enteros
+        self._hampel_limit = int(hampel_k * MAD_SCALE * 1000)
+
+        self.ema = None
+        self.rejected = 0  # Muestras descartadas en la última lectura
+        self.rejected_total = 0
+        self.readings = 0
+
+    def reset (self) -> None:
+        """
+        Olvida la media exponencial acumulada.
+        """
+        self.ema = None
+
+    def _mean (self, buffer, start, end) -> int:
+        total = 0
+
+        for i in range(start, end):
+            total += buffer[i]
+
+        return total // (end - start)
+
+    def _hampel (self, buffer, n) -> int:
+        sort_in_place(buffer, n)
+        median = median_sorted(buffer, n)
+
+        if len(self.scratch) < n:
+            self.scratch = array('H', [0] * n)
+
+        deviations = self.scratch
+
+        for i in range(n):
+            value = buffer[i]
+            deviations[i] = value - median if value > median else median - value
+
+        sort_in_place(deviations, n)
+        limit = self._hampel_limit * median_sorted(deviations, n)
+
+        total = 0
+        kept = 0
+
+        for i in range(n):
+            value = buffer[i]
+            deviation = value - median if value > median else median - value
+
+            if deviation * 1000 <= limit:
+                total += value
+                kept += 1
+
+        self.rejected = n - kept
+
+        # Con un umbral por debajo de la MAD puede no quedar ninguna muestra
+        if not kept:
+            return median
+
+        return total // kept
+
+    def apply (self, buffer, n):
+        """
+        Filtra las n primeras muestras del buffer (se reordenan).
+
+        Args:
+            buffer: array con las muestras crudas del ADC.
+            n (int): Número de muestras válidas.
+
+        Returns:
+            int|float: Valor filtrado en unidades del ADC (float con la media
+                       exponencial activa).
+        """
+        method = self.method
+        self.rejected = 0
+
+        if method == 'mean' or n < 3:
+            value = self._mean(buffer, 0, n)
+        elif method == 'median':
+            sort_in_place(buffer, n)
+            value = median_sorted(buffer, n)
+        elif method == 'trimmed':
+            trim = min(self.trim, (n - 1) >> 1)
+            sort_in_place(buffer, n)
+            value = self._mean(buffer, trim, n - trim)
+            self.rejected = trim * 2
+        else:
+            value = self._hampel(buffer, n)
+
+        self.readings += 1
+        self.rejected_total += self.rejected
+
+        if self.ema_alpha:
+            if self.ema is None:
+                self.ema = float(value)
+            else:
+                self.ema += self.ema_alpha * (value - self.ema)
+
+            return self.ema
+
+        return value
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve el método y las muestras descartadas.
+        """
+        return {
+            "method": self.method,
+            "readings": self.readings,
+            "rejected": self.rejected,
+            "rejected_total": self.rejected_total,
+        }
@@ -0,0 +1,237 @@
+import time
+import uasyncio as asyncio
+
+
+class Task:
+    """
+    Tarea periódica gestionada por el planificador.
+
+    Cada tarea tiene su propio periodo y plazo (deadline) relativo al instante
+    en el que debía activarse. Se guardan métricas de retraso (lag) y de
+    plazos incumplidos (overruns) para poder detectar tareas lentas.
+
+    :param name: Nombre identificativo de la tarea.
+    :param callback: Función o corrutina que se ejecuta en cada activación.
+    :param period_ms: Periodo entre activaciones en milisegundos.
+    :param deadline_ms: Plazo máximo desde la activación prevista hasta que
+                        termina la ejecución. Por defecto igual al periodo.
+    :param delay_ms: Retardo inicial antes de la primera activación.
+    """
+
+    def __init__ (self, name, callback, period_ms, deadline_ms=None,
+                  delay_ms=0):
+        self.name = name
+        self.callback = callback
+        self.period_ms = max(1, int(period_ms))
+        self.deadline_ms = int(deadline_ms) if deadline_ms is not None else self.period_ms
+        self.delay_ms = max(0, int(delay_ms))
+        self.enabled = True
+
+        # Métricas
+        self.runs = 0  # Veces que se ha ejecutado
+        self.errors = 0  # Ejecuciones que terminaron con excepción
+        self.overruns = 0  # Ejecuciones que terminaron fuera de plazo
+        self.skipped = 0  # Activaciones descartadas por ir con retraso
+        self.lag_ms = 0  # Retraso de la última activación
+        self.lag_max_ms = 0  # Mayor retraso registrado
+        self.duration_ms = 0  # Duración de la última ejecución
+        self.duration_max_ms = 0  # Mayor duración registrada
+        self.last_error = None
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve las métricas de la tarea.
+
+        Returns:
+            dict: Ejecuciones, errores, plazos incumplidos, retrasos y duraciones.
+        """
+        return {
+            "period_ms": self.period_ms,
+            "deadline_ms": self.deadline_ms,
+            "runs": self.runs,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "lag_ms": self.lag_ms,
+            "lag_max_ms": self.lag_max_ms,
+            "duration_ms": self.duration_ms,
+            "duration_max_ms": self.duration_max_ms,
+            "last_error": self.last_error,
+        }
+
+    def reset_stats (self) -> None:
+        """
+        Reinicia las métricas acumuladas de la tarea.
+        """
+        self.runs = 0
+        self.errors = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.lag_ms = 0
+        self.lag_max_ms = 0
+        self.duration_ms = 0
+        self.duration_max_ms = 0
+        self.last_error = None
+
+
+class Scheduler:
+    """
+    Planificador cooperativo de tareas periódicas sobre uasyncio.
+
+    Cada tarea corre en su propia corrutina, por lo que una tarea lenta solo
+    retrasa su siguiente activación y no la del resto. Las tareas que
+    necesiten esperar (patrones de LEDs, reintentos de red...) deben ser
+    corrutinas y usar ``await asyncio.sleep_ms()`` en lugar de ``sleep_ms()``
+    para ceder el control al resto de tareas.
+
+    :param debug: Indica si se muestran los mensajes de debug.
+    """
+
+    def __init__ (self, debug=False):
+        self.DEBUG = debug
+        self.tasks = []
+        self.running = False
+        self.started_at = None
+
+    def add_task (self, name, callback, period_ms, deadline_ms=None,
+                  delay_ms=0) -> Task:
+        """
+        Registra una nueva tarea periódica.
+
+        Args:
+            name (str): Nombre de la tarea, debe ser único.
+            callback: Función o corrutina a ejecutar en cada activación.
+            period_ms (int): Periodo entre activaciones en milisegundos.
+            deadline_ms (int): Plazo para completar cada ejecución. Por defecto el periodo.
+            delay_ms (int): Retardo inicial antes de la primera activación.
+
+        Returns:
+            Task: Instancia de la tarea registrada.
+
+        Raises:
+            ValueError: Si ya existe una tarea con el mismo nombre.
+        """
+        if self.get_task(name):
+            raise ValueError(f"Ya existe una tarea con el nombre {name}")
+
+        task = Task(name, callback, period_ms, deadline_ms, delay_ms)
+        self.tasks.append(task)
+
+        if self.running:
+            asyncio.create_task(self._run_task(task))
+
+        return task
+
+    def get_task (self, name):
+        """
+        Devuelve la tarea con el nombre indicado o None si no existe.
+        """
+        for task in self.tasks:
+            if task.name == name:
+                return task
+
+        return None
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve las métricas de todas las tareas indexadas por nombre.
+        """
+        return {task.name: task.get_stats() for task in self.tasks}
+
+    async def _run_task (self, task) -> None:
+        """
+        Bucle de ejecución de una tarea periódica.
+
+        Las activaciones se calculan a partir de la activación prevista
+        anterior, no del final de la ejecución, para que el periodo no derive.
+        Si una ejecución se alarga más de un periodo, las activaciones
+        perdidas se descartan y se contabilizan en ``skipped``.
+        """
+        next_run = time.ticks_add(time.ticks_ms(), task.delay_ms)
+
+        while self.running:
+            wait = time.ticks_diff(next_run, time.ticks_ms())
+
+            if wait > 0:
+                await asyncio.sleep_ms(wait)
+
+            if not task.enabled:
+                next_run = time.ticks_add(next_run, task.period_ms)
+                continue
+
+            start = time.ticks_ms()
+            lag = time.ticks_diff(start, next_run)
+
+            task.lag_ms = lag
+            if lag > task.lag_max_ms:
+                task.lag_max_ms = lag
+
+            try:
+                result = task.callback()
+
+                # Las corrutinas se esperan para medir su duración completa
+                if result is not None and hasattr(result, 'send'):
+                    await result
+            except Exception as e:
+                task.errors += 1
+                task.last_error = str(e)
+
+                if self.DEBUG:
+                    print('Error en la tarea', task.name, ':', e)
+
+            end = time.ticks_ms()
+            duration = time.ticks_diff(end, start)
+
+            task.runs += 1
+            task.duration_ms = duration
+            if duration > task.duration_max_ms:
+                task.duration_max_ms = duration
+
+            if time.ticks_diff(end, next_run) > task.deadline_ms:
+                task.overruns += 1
+
+                if self.DEBUG:
+                    print('Tarea fuera de plazo:', task.name, 'lag:', lag,
+                          'duración:', duration)
+
+            next_run = time.ticks_add(next_run, task.period_ms)
+
+            # Descarto activaciones que han quedado atrás un periodo completo
+            behind = time.ticks_diff(end, next_run)
+            if behind >= task.period_ms:
+                missed = behind // task.period_ms
+                task.skipped += missed
+                next_run = time.ticks_add(next_run, missed * task.period_ms)
+
+            # Cedo el control aunque la tarea no haya esperado
+            await asyncio.sleep_ms(0)
+
+    async def run (self) -> None:
+        """
+        Arranca todas las tareas registradas y se mantiene en ejecución
+        mientras el planificador esté activo.
+        """
+        self.running = True
+        self.started_at = time.ticks_ms()
+
+        for task in self.tasks:
+            asyncio.create_task(self._run_task(task))
+
+        while self.running:
+            await asyncio.sleep_ms(1000)
+
+    def stop (self) -> None:
+        """
+        Detiene el planificador. Las tareas terminan tras su activación en curso.
+        """
+        self.running = False
+
+    def start (self) -> None:
+        """
+        Arranca el bucle de eventos de uasyncio con el planificador. Bloquea
+        hasta que se llame a ``stop()``.
+        """
+        try:
+            asyncio.run(self.run())
+        finally:
+            asyncio.new_event_loop()
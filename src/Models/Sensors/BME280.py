@@ -1,4 +1,5 @@
 
+import os
 import time
 from machine import I2C
 import struct
@@ -44,26 +45,106 @@ class BME280:
     BME280_REGISTER_TEMPDATA = 0xFA
     BME280_REGISTER_HUMIDDATA = 0xFD
 
-    def __init__(self, rpi=None):
+    # Coeficientes de calibración en el orden de get_calibration()
+    CALIBRATION_FIELDS = ('dig_t1', 'dig_t2', 'dig_t3',
+                          'dig_p1', 'dig_p2', 'dig_p3', 'dig_p4', 'dig_p5',
+                          'dig_p6', 'dig_p7', 'dig_p8', 'dig_p9',
+                          'dig_h1', 'dig_h2', 'dig_h3', 'dig_h4', 'dig_h5',
+                          'dig_h6')
+
+    # Bloques de calibración: 0x88-0xA1 (T1-P9, H1) y 0xE1-0xE7 (H2-H6)
+    CALIBRATION_BLOCK1_SIZE = 26
+    CALIBRATION_BLOCK2_SIZE = 7
+    CALIBRATION_FORMAT = '<HhhHhhhhhhhhxBhBbBbb'
+
+    # Modos de funcionamiento (bits 1:0 de ctrl_meas)
+    MODE_SLEEP = 0x00
+    MODE_FORCED = 0x01
+    MODE_NORMAL = 0x03
+
+    # Bit measuring del registro de estado
+    STATUS_MEASURING = 0x08
+
+    # Códigos de registro de oversampling (osrs_x) y del filtro IIR por factor
+    OVERSAMPLING_CODES = {0: 0, 1: 1, 2: 2, 4: 3, 8: 4, 16: 5}
+    FILTER_CODES = {0: 0, 2: 1, 4: 2, 8: 3, 16: 4}
+
+    # Perfiles: (oversampling T, P, H, coeficiente IIR, modo). Los forced
+    # solo miden cuando se pide una lectura y el resto del tiempo el sensor
+    # está en sleep; 'normal' mide sin parar (comportamiento anterior).
+    PROFILES = {
+        'weather': (1, 1, 1, 0, MODE_FORCED),  # Estación meteorológica (datasheet 3.5.1)
+        'indoor': (2, 16, 1, 0, MODE_FORCED),
+        'precision': (4, 16, 4, 4, MODE_FORCED),
+        'normal': (2, 16, 1, 0, MODE_NORMAL),
+    }
+
+    def __init__(self, rpi=None, calibration=None, chip_id=None,
+                 calibration_cache='bme280', profile=None, compensation=None,
+                 i2c=None, address=None, bus=0):
         """
         Inicializa el sensor BME280
         
         Args:
             rpi: Instancia RpiPico para obtener I2C si no se proporciona
-            i2c: Instancia I2C personalizada
-            address: Dirección I2C del sensor (por defecto desde ENV)
-            i2c_bus: Bus I2C a usar (por defecto desde ENV)
+            calibration: Coeficientes guardados (get_calibration()) para no
+                         volver a leerlos, por ejemplo al despertar.
+            chip_id: Chip ID con el que se guardaron los coeficientes.
+            calibration_cache: Prefijo de los ficheros en la flash donde se
+                               guarda la calibración de cada sensor (por
+                               dirección y chip ID). None para no guardarla.
+            profile: Perfil de oversampling, filtro y modo (PROFILES). Por
+                     defecto BME280_PROFILE o 'indoor'.
+            compensation: 'float' (fórmulas en coma flotante del datasheet)
+                          o 'int' (fórmulas enteras de 32 bits). Por defecto
+                          BME280_COMPENSATION o 'float'.
+            i2c: Bus I2C del sensor. Por defecto el bus 0 de rpi.
+            address: Dirección I2C. Por defecto BME280_ADDRESS o 0x76.
+            bus: Número del bus I2C (identifica la calibración guardada).
         """
         self.rpi = rpi
+        self.bus = bus
+        self.chip_id = None
+        self.calibration_cache = calibration_cache
+        self.calibration_source = None  # 'sensor', 'cache' o 'memory'
+        self.init_ms = 0  # Duración de la inicialización
         
         # Configuración desde ENV
-        self.address = getattr(ENV, 'BME280_ADDRESS', self.BME280_I2CADDR)
+        self.address = address or getattr(ENV, 'BME280_ADDRESS', self.BME280_I2CADDR)
         self.correction_temp = getattr(ENV, 'BME280_CORRECTION_TEMPERATURE', 0.0)
         self.correction_pressure = getattr(ENV, 'BME280_CORRECTION_PRESSURE', 0.0)
         self.correction_humidity = getattr(ENV, 'BME280_CORRECTION_HUMIDITY', 0.0)
-        self.sample_delay_ms = getattr(ENV, 'BME280_SAMPLE_DELAY_MS', 500)
-        
-        if rpi is not None:
+        self.profile = profile or getattr(ENV, 'BME280_PROFILE', 'indoor')
+
+        if self.profile not in self.PROFILES:
+            raise ValueError("Perfil de BME280 desconocido: {}".format(self.profile))
+
+        self.compensation = compensation or getattr(ENV, 'BME280_COMPENSATION', 'float')
+
+        if self.compensation not in ('float', 'int'):
+            raise ValueError("Compensación de BME280 desconocida: {}".format(self.compensation))
+
+        self.integer = self.compensation == 'int'
+
+        # Valores de registro y tiempos de medida del perfil (_apply_profile)
+        self.controlhumid_value = 0
+        self.control_value = 0
+        self.config_value = 0
+        self.forced = False
+        self.measure_typ_ms = 0
+        self.measure_max_ms = 0
+
+        # Métricas de las medidas en modo forced
+        self.measurements = 0
+        self.measure_timeouts = 0
+        self.last_measure_ms = 0
+        self._measure_start = 0
+        self._status = bytearray(2)
+        self._data = bytearray(8)  # Registros de datos 0xF7-0xFE
+        
+        if i2c is not None:
+            self.i2c = i2c
+        elif rpi is not None:
             self.i2c = rpi.i2c0
         else:
             raise ValueError("Se requiere instancia RPI o I2C para inicializar BME280")
@@ -95,7 +176,9 @@ class BME280:
         self.t_fine = 0
         
         # Inicializar sensor
-        self._init_sensor()
+        start = time.ticks_ms()
+        self._init_sensor(calibration, chip_id)
+        self.init_ms = time.ticks_diff(time.ticks_ms(), start)
 
     def _read_register(self, register, length=1):
         """Lee uno o más registros del sensor"""
@@ -133,50 +216,179 @@ class BME280:
         result = self._read_register(register, 2)
         return struct.unpack('<h', result)[0]
 
+    def _calibration_path(self):
+        return '{}_{}_{:02x}_{:02x}.cal'.format(self.calibration_cache, self.bus,
+                                                self.address, self.chip_id)
+
+    def _checksum(self, data):
+        total = 0
+
+        for byte in data:
+            total += byte
+
+        return total & 0xFF
+
+    def _load_calibration(self):
+        """
+        Lee de la flash el bloque de calibración de este sensor.
+
+        Returns:
+            bytearray|None: Registros de calibración o None si no hay copia válida.
+        """
+        if not self.calibration_cache:
+            return None
+
+        size = self.CALIBRATION_BLOCK1_SIZE + self.CALIBRATION_BLOCK2_SIZE
+
+        try:
+            with open(self._calibration_path(), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) != size + 1 or data[-1] != self._checksum(data[:-1]):
+            return None
+
+        return data
+
+    def _save_calibration(self, block):
+        if not self.calibration_cache:
+            return
+
+        path = self._calibration_path()
+        tmp = path + '.tmp'
+
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(block)
+                f.write(bytes((self._checksum(block),)))
+
+            os.rename(tmp, path)
+        except OSError:
+            pass
+
+    def _decode_calibration(self, block):
+        """Obtiene los coeficientes del bloque de registros de calibración"""
+        (self.dig_t1, self.dig_t2, self.dig_t3,
+         self.dig_p1, self.dig_p2, self.dig_p3, self.dig_p4, self.dig_p5,
+         self.dig_p6, self.dig_p7, self.dig_p8, self.dig_p9,
+         self.dig_h1, self.dig_h2, self.dig_h3,
+         e4, e5, e6, self.dig_h6) = struct.unpack_from(self.CALIBRATION_FORMAT, block)
+
+        # H4 = 0xE4 (con signo) << 4 | 0xE5[3:0]; H5 = 0xE6 (con signo) << 4 | 0xE5[7:4]
+        self.dig_h4 = (e4 << 4) | (e5 & 0x0F)
+        self.dig_h5 = (e6 << 4) | (e5 >> 4)
+
     def _read_calibration(self):
-        """Lee los datos de calibración del sensor usando lecturas individuales"""
-        # Leer coeficientes de temperatura (T1-T3) - mismo para BME280 y BMP280
-        self.dig_t1 = self._read_u16_le(self.BME280_REGISTER_DIG_T1)
-        self.dig_t2 = self._read_s16_le(self.BME280_REGISTER_DIG_T2)
-        self.dig_t3 = self._read_s16_le(self.BME280_REGISTER_DIG_T3)
-        
-        # Leer coeficientes de presión (P1-P9) - mismo para BME280 y BMP280
-        self.dig_p1 = self._read_u16_le(self.BME280_REGISTER_DIG_P1)
-        self.dig_p2 = self._read_s16_le(self.BME280_REGISTER_DIG_P2)
-        self.dig_p3 = self._read_s16_le(self.BME280_REGISTER_DIG_P3)
-        self.dig_p4 = self._read_s16_le(self.BME280_REGISTER_DIG_P4)
-        self.dig_p5 = self._read_s16_le(self.BME280_REGISTER_DIG_P5)
-        self.dig_p6 = self._read_s16_le(self.BME280_REGISTER_DIG_P6)
-        self.dig_p7 = self._read_s16_le(self.BME280_REGISTER_DIG_P7)
-        self.dig_p8 = self._read_s16_le(self.BME280_REGISTER_DIG_P8)
-        self.dig_p9 = self._read_s16_le(self.BME280_REGISTER_DIG_P9)
-        
+        """
+        Lee los datos de calibración del sensor en dos transferencias
+        (0x88-0xA1 y 0xE1-0xE7). El BMP280 no tiene el segundo bloque y sus
+        coeficientes de humedad quedan a cero.
+
+        Returns:
+            bytearray: Registros de calibración leídos.
+        """
+        block = bytearray(self.CALIBRATION_BLOCK1_SIZE + self.CALIBRATION_BLOCK2_SIZE)
+        view = memoryview(block)
+
+        try:
+            self.i2c.readfrom_mem_into(self.address, self.BME280_REGISTER_DIG_T1,
+                                       view[:self.CALIBRATION_BLOCK1_SIZE])
+
+            if not self.is_bmp280:
+                self.i2c.readfrom_mem_into(self.address, self.BME280_REGISTER_DIG_H2,
+                                           view[self.CALIBRATION_BLOCK1_SIZE:])
+        except Exception as e:
+            raise RuntimeError(f"Error leyendo la calibración: {e}")
+
         if self.is_bmp280:
-            # BMP280 no tiene sensores de humedad - usar valores por defecto
-            self.dig_h1 = 0
-            self.dig_h2 = 0
-            self.dig_h3 = 0
-            self.dig_h4 = 0
-            self.dig_h5 = 0
-            self.dig_h6 = 0
+            block[self.CALIBRATION_BLOCK1_SIZE - 1] = 0  # dig_h1
+
+        self._decode_calibration(block)
+
+        return block
+
+    def get_calibration(self):
+        """
+        Devuelve los coeficientes de calibración para guardarlos.
+
+        Returns:
+            tuple: Valores en el orden de CALIBRATION_FIELDS.
+        """
+        return tuple(getattr(self, name) for name in self.CALIBRATION_FIELDS)
+
+    def set_calibration(self, values):
+        """Aplica coeficientes de calibración guardados con get_calibration()"""
+        for name, value in zip(self.CALIBRATION_FIELDS, values):
+            setattr(self, name, value)
+
+    @staticmethod
+    def measurement_time_ms(osrs_t, osrs_p, osrs_h, maximum=True):
+        """
+        Tiempo de una medida según el apéndice B del datasheet.
+
+        Args:
+            osrs_t: Oversampling de temperatura (0 si no se mide).
+            osrs_p: Oversampling de presión (0 si no se mide).
+            osrs_h: Oversampling de humedad (0 si no se mide).
+            maximum: True para el tiempo máximo, False para el típico.
+
+        Returns:
+            float: Tiempo en ms.
+        """
+        if maximum:
+            t, step, extra = 1.25, 2.3, 0.575
         else:
-            # BME280 coeficientes de humedad
-            self.dig_h1 = self._read_u8(self.BME280_REGISTER_DIG_H1)
-            self.dig_h2 = self._read_s16_le(self.BME280_REGISTER_DIG_H2)
-            self.dig_h3 = self._read_u8(self.BME280_REGISTER_DIG_H3)
-            
-            # H4 y H5 tienen manejo especial según el ejemplo de trabajo
-            h4 = self._read_s8(self.BME280_REGISTER_DIG_H4)
-            h4 = (h4 << 24) >> 20
-            self.dig_h4 = h4 | (self._read_u8(self.BME280_REGISTER_DIG_H5) & 0x0F)
-            
-            h5 = self._read_s8(self.BME280_REGISTER_DIG_H6)
-            h5 = (h5 << 24) >> 20
-            self.dig_h5 = h5 | (self._read_u8(self.BME280_REGISTER_DIG_H5) >> 4 & 0x0F)
-            
-            self.dig_h6 = self._read_s8(self.BME280_REGISTER_DIG_H6)
+            t, step, extra = 1.0, 2.0, 0.5
+
+        if osrs_t:
+            t += step * osrs_t
+        if osrs_p:
+            t += step * osrs_p + extra
+        if osrs_h:
+            t += step * osrs_h + extra
+
+        return t
+
+    def _apply_profile(self):
+        """Calcula los valores de registro y tiempos de medida del perfil"""
+        osrs_t, osrs_p, osrs_h, iir, mode = self.PROFILES[self.profile]
+
+        if self.is_bmp280:
+            osrs_h = 0
+
+        codes = self.OVERSAMPLING_CODES
+        self.controlhumid_value = codes[osrs_h]
+        self.control_value = (codes[osrs_t] << 5) | (codes[osrs_p] << 2)
+        self.config_value = self.FILTER_CODES[iir] << 2  # standby 0.5ms
+        self.forced = mode == self.MODE_FORCED
+
+        if not self.forced:
+            self.control_value |= mode
 
-    def _init_sensor(self):
+        # Antes del tiempo típico la medida no puede haber terminado; pasado
+        # el máximo (más 1ms de margen para el bus) se da por fallida
+        self.measure_typ_ms = int(self.measurement_time_ms(osrs_t, osrs_p, osrs_h, False))
+        self.measure_max_ms = int(self.measurement_time_ms(osrs_t, osrs_p, osrs_h) + 0.999) + 1
+
+    def _is_configured(self):
+        """
+        Comprueba si el sensor mantiene la configuración de un arranque
+        anterior (sigue alimentado mientras la Pico duerme).
+        """
+        regs = self._read_register(self.BME280_REGISTER_CONTROLHUMID, 4)
+
+        if self.forced:
+            # Tras una medida forzada vuelve solo a sleep
+            control = regs[2] & 0xFC
+        else:
+            control = regs[2]
+
+        return ((self.is_bmp280 or regs[0] & 0x07 == self.controlhumid_value)
+                and control == self.control_value
+                and regs[3] == self.config_value)
+
+    def _init_sensor(self, calibration=None, calibration_chip_id=None):
         """Inicializa el sensor BME280/BMP280"""
         # Verificar chip ID
         chip_id = struct.unpack('<B', self._read_register(self.BME280_REGISTER_CHIPID))[0]
@@ -189,27 +401,109 @@ class BME280:
         # Detectar tipo de sensor
         self.is_bmp280 = (chip_id == 0x58)
         self.sensor_type = "BMP280" if self.is_bmp280 else "BME280"
-        
-        # Leer calibración
-        self._read_calibration()
-        
-        # Configurar oversampling y modo
-        # Humedad: oversampling x1
-        self._write_register(self.BME280_REGISTER_CONTROLHUMID, 0x01)
-        
-        # Temperatura: oversampling x2, Presión: oversampling x16, Modo: normal
-        self._write_register(self.BME280_REGISTER_CONTROL, 0xB7)
-        
-        # Filtro off, standby 0.5ms
-        self._write_register(self.BME280_REGISTER_CONFIG, 0x00)
-        
-        # Esperar estabilización
-        time.sleep_ms(100)
+        self.chip_id = chip_id
+        
+        # Leer calibración, salvo que se reciba la de este mismo chip o haya
+        # una copia en la flash
+        if (calibration and len(calibration) == len(self.CALIBRATION_FIELDS)
+                and calibration_chip_id == chip_id):
+            self.set_calibration(calibration)
+            self.calibration_source = 'memory'
+        else:
+            block = self._load_calibration()
+
+            if block:
+                self._decode_calibration(block)
+                self.calibration_source = 'cache'
+            else:
+                self._save_calibration(self._read_calibration())
+                self.calibration_source = 'sensor'
+        
+        self._apply_profile()
+
+        # Si sigue configurado no hace falta volver a escribir el perfil ni
+        # esperar a la primera medida
+        if self._is_configured():
+            return
+        
+        # El filtro solo se aplica con seguridad en sleep: se para el sensor,
+        # se configura y, en modo normal, se vuelve a arrancar. ctrl_hum no
+        # tiene efecto hasta la siguiente escritura de ctrl_meas.
+        self._write_register(self.BME280_REGISTER_CONTROL,
+                             self.control_value & 0xFC)
+        self._write_register(self.BME280_REGISTER_CONTROLHUMID, self.controlhumid_value)
+        self._write_register(self.BME280_REGISTER_CONFIG, self.config_value)
+
+        if not self.forced:
+            self._write_register(self.BME280_REGISTER_CONTROL, self.control_value)
+
+            # Esperar a la primera medida
+            time.sleep_ms(self.measure_max_ms)
+
+    def start_measurement(self):
+        """
+        Lanza una medida en modo forced sin esperar a que termine. Permite
+        solapar las conversiones de varios sensores (BME280Registry).
+        """
+        self._measure_start = time.ticks_ms()
+        self._write_register(self.BME280_REGISTER_CONTROL,
+                             self.control_value | self.MODE_FORCED)
+
+    def is_measuring(self):
+        """
+        Consulta el bit measuring del registro de estado (y que el modo haya
+        vuelto a sleep) de la medida lanzada con start_measurement().
+
+        Returns:
+            bool: True si la medida no ha terminado.
+        """
+        status = self._status
+
+        try:
+            # Estado (0xF3) y ctrl_meas (0xF4) en una sola lectura
+            self.i2c.readfrom_mem_into(self.address, self.BME280_REGISTER_STATUS, status)
+        except Exception as e:
+            raise RuntimeError(f"Error leyendo el estado: {e}")
+
+        elapsed = time.ticks_diff(time.ticks_ms(), self._measure_start)
+
+        if not status[0] & self.STATUS_MEASURING and not status[1] & 0x03:
+            self.measurements += 1
+            self.last_measure_ms = elapsed
+            return False
+
+        if elapsed >= self.measure_max_ms:
+            self.measure_timeouts += 1
+            raise RuntimeError("La medida del {} no ha terminado en {}ms".format(
+                self.sensor_type, self.measure_max_ms))
+
+        return True
+
+    def _measure(self):
+        """
+        Lanza una medida en modo forced y espera a que termine. Antes del
+        tiempo típico no puede haber terminado, después se consulta el
+        estado cada milisegundo.
+        """
+        self.start_measurement()
+        time.sleep_ms(self.measure_typ_ms)
+
+        while self.is_measuring():
+            time.sleep_ms(1)
 
-    def _read_raw_data(self):
+    def _read_raw_data(self, measure=True):
         """Lee los datos raw del sensor"""
+        # En modo forced el sensor solo mide cuando se le pide
+        if measure and self.forced:
+            self._measure()
+
         # Leer temperatura, presión y humedad de una vez
-        data = self._read_register(self.BME280_REGISTER_PRESSUREDATA, 8)
+        data = self._data
+
+        try:
+            self.i2c.readfrom_mem_into(self.address, self.BME280_REGISTER_PRESSUREDATA, data)
+        except Exception as e:
+            raise RuntimeError(f"Error leyendo registro {self.BME280_REGISTER_PRESSUREDATA}: {e}")
         
         # Extraer datos raw
         pres_raw = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
@@ -218,8 +512,81 @@ class BME280:
         
         return temp_raw, pres_raw, hum_raw
 
+    def _compensate_temperature_int(self, temp_raw):
+        """
+        Compensa la temperatura raw con la fórmula entera de 32 bits del
+        datasheet y calcula t_fine.
+
+        Returns:
+            int: Temperatura en centésimas de °C.
+        """
+        var1 = (((temp_raw >> 3) - (self.dig_t1 << 1)) * self.dig_t2) >> 11
+        var2 = (temp_raw >> 4) - self.dig_t1
+        var2 = (((var2 * var2) >> 12) * self.dig_t3) >> 14
+
+        self.t_fine = var1 + var2
+
+        return (self.t_fine * 5 + 128) >> 8
+
+    def _compensate_pressure_int(self, pres_raw):
+        """
+        Compensa la presión raw con la fórmula entera de 32 bits del datasheet
+        usando t_fine.
+
+        Returns:
+            int: Presión en Pa.
+        """
+        var1 = (self.t_fine >> 1) - 64000
+        square = (var1 >> 2) * (var1 >> 2)
+        var2 = (square >> 11) * self.dig_p6
+        var2 = var2 + ((var1 * self.dig_p5) << 1)
+        var2 = (var2 >> 2) + (self.dig_p4 << 16)
+        var1 = (((self.dig_p3 * (square >> 13)) >> 3) + ((self.dig_p2 * var1) >> 1)) >> 18
+        var1 = ((32768 + var1) * self.dig_p1) >> 15
+
+        if var1 == 0:
+            return 0  # Evitar división por cero
+
+        # El datasheet opera en uint32: con valores raw válidos p no es
+        # negativo y la división entera coincide con la de C
+        p = ((1048576 - pres_raw) - (var2 >> 12)) * 3125
+
+        if p < 0x80000000:
+            p = (p << 1) // var1
+        else:
+            p = (p // var1) * 2
+
+        var1 = (self.dig_p9 * (((p >> 3) * (p >> 3)) >> 13)) >> 12
+        var2 = ((p >> 2) * self.dig_p8) >> 13
+
+        return p + ((var1 + var2 + self.dig_p7) >> 4)
+
+    def _compensate_humidity_int(self, hum_raw):
+        """
+        Compensa la humedad raw con la fórmula entera de 32 bits del datasheet
+        usando t_fine.
+
+        Returns:
+            int: Humedad relativa en 1/1024 %.
+        """
+        h = self.t_fine - 76800
+        h = ((((hum_raw << 14) - (self.dig_h4 << 20) - (self.dig_h5 * h)) + 16384) >> 15) * \
+            (((((((h * self.dig_h6) >> 10) * (((h * self.dig_h3) >> 11) + 32768)) >> 10) +
+               2097152) * self.dig_h2 + 8192) >> 14)
+        h = h - (((((h >> 15) * (h >> 15)) >> 7) * self.dig_h1) >> 4)
+
+        if h < 0:
+            h = 0
+        elif h > 419430400:
+            h = 419430400
+
+        return h >> 12
+
     def _compensate_temperature(self, temp_raw):
         """Compensa la temperatura raw y calcula t_fine"""
+        if self.integer:
+            return self._compensate_temperature_int(temp_raw) / 100
+
         var1 = (temp_raw / 16384.0 - self.dig_t1 / 1024.0) * self.dig_t2
         var2 = ((temp_raw / 131072.0 - self.dig_t1 / 8192.0) * 
                 (temp_raw / 131072.0 - self.dig_t1 / 8192.0) * self.dig_t3)
@@ -231,6 +598,9 @@ class BME280:
 
     def _compensate_pressure(self, pres_raw):
         """Compensa la presión raw usando t_fine"""
+        if self.integer:
+            return self._compensate_pressure_int(pres_raw) / 100  # hPa
+
         var1 = self.t_fine / 2.0 - 64000.0
         var2 = var1 * var1 * self.dig_p6 / 32768.0
         var2 = var2 + var1 * self.dig_p5 * 2.0
@@ -251,6 +621,9 @@ class BME280:
 
     def _compensate_humidity(self, hum_raw):
         """Compensa la humedad raw usando t_fine"""
+        if self.integer:
+            return self._compensate_humidity_int(hum_raw) / 1024
+
         h = self.t_fine - 76800.0
         h = ((hum_raw - (self.dig_h4 * 64.0 + self.dig_h5 / 16384.0 * h)) *
              (self.dig_h2 / 65536.0 * (1.0 + self.dig_h6 / 67108864.0 * h *
@@ -325,14 +698,18 @@ class BME280:
         
         return round(humidity, 2)
 
-    def get_all_data(self):
+    def get_all_data(self, measure=True):
         """
         Obtiene todos los datos del sensor en un solo diccionario
         
+        Args:
+            measure: En modo forced, False para leer la medida ya lanzada
+                     con start_measurement() sin lanzar otra.
+
         Returns:
             dict: Diccionario con temperatura, presión y humedad (None para BMP280)
         """
-        temp_raw, pres_raw, hum_raw = self._read_raw_data()
+        temp_raw, pres_raw, hum_raw = self._read_raw_data(measure)
         
         # Calcular temperatura primero para obtener t_fine
         temperature = self._compensate_temperature(temp_raw)
@@ -0,0 +1,289 @@
+import os
+import time
+import ujson
+from Models.Sensors.BME280 import BME280
+
+
+class BME280Registry:
+    """
+    Conjunto de sensores BME280/BMP280 repartidos por los dos buses I2C, uno
+    por zona (por ejemplo 0x76 y 0x77 en cada bus de un invernadero).
+
+    Los sensores se descubren con un solo i2c.scan() por bus. Las direcciones
+    encontradas se guardan en la flash y los arranques siguientes no vuelven
+    a escanear salvo que un sensor guardado deje de responder.
+
+    Al leer se lanzan las medidas forced de todos los sensores a la vez, se
+    espera una sola vez el tiempo típico del más lento y después se recoge
+    cada uno en cuanto termina, por lo que las conversiones se solapan y el
+    tiempo total es el de un sensor y no la suma de todos.
+
+    Imita la interfaz de un BME280 (get_all_data, sensor_type, is_bmp280)
+    con los datos del sensor principal, el primero por bus y dirección.
+
+    :param rpi: Instancia RpiPico con los buses I2C configurados.
+    :param addresses: Direcciones I2C en las que se buscan sensores.
+    :param zones: Nombre de la zona de cada sensor, {(bus, dirección): nombre}.
+                  Por defecto "bus-dirección", p. ej. "0-76".
+    :param cache_path: Fichero en la flash con las direcciones encontradas en
+                       cada bus. None para escanear siempre.
+    :param debug: Muestra información de depuración.
+    :param options: Parámetros para cada BME280 (calibration_cache, profile,
+                    compensation).
+    """
+
+    def __init__ (self, rpi, addresses=(0x76, 0x77), zones=None,
+                  cache_path='bme280.scan', debug=False, **options):
+        self.rpi = rpi
+        self.addresses = tuple(addresses)
+        self.zone_names = zones or {}
+        self.cache_path = cache_path
+        self.debug = debug
+        self.options = options
+
+        self.sensors = []  # Ordenados por bus y dirección
+        self.primary = None
+        self.readings = {}  # Última lectura de cada zona (None si falló)
+        self.stats = {}  # Métricas de cada zona
+        self.scans = 0  # Escaneos del bus hechos (0 con la caché válida)
+
+        self.discover()
+
+    def _buses (self):
+        return ((0, self.rpi.i2c0), (1, self.rpi.i2c1))
+
+    def _load_cache (self):
+        if not self.cache_path:
+            return {}
+
+        try:
+            with open(self.cache_path, 'r') as f:
+                return ujson.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache (self, cache):
+        if not self.cache_path:
+            return
+
+        tmp = self.cache_path + '.tmp'
+
+        try:
+            with open(tmp, 'w') as f:
+                ujson.dump(cache, f)
+
+            os.rename(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    def _zone (self, bus, address):
+        return self.zone_names.get((bus, address)) or '{}-{:02x}'.format(bus, address)
+
+    def _create (self, bus, i2c, address):
+        """
+        Crea el sensor de una dirección.
+
+        Returns:
+            BME280|None: Sensor o None si no responde o no es un BME280/BMP280.
+        """
+        try:
+            sensor = BME280(i2c=i2c, address=address, bus=bus, **self.options)
+        except Exception as e:
+            if self.debug:
+                print('BME280 no disponible en el bus', bus, 'dirección', hex(address), ':', e)
+
+            return None
+
+        sensor.zone = self._zone(bus, address)
+
+        return sensor
+
+    def _add_bus (self, bus, i2c, addresses, strict):
+        """
+        Crea los sensores de un bus.
+
+        Args:
+            strict: Si algún sensor no responde no se añade ninguno (las
+                    direcciones guardadas ya no son válidas).
+
+        Returns:
+            list: Direcciones de los sensores añadidos o None si falla en
+                  modo estricto.
+        """
+        sensors = []
+
+        for address in addresses:
+            sensor = self._create(bus, i2c, address)
+
+            if sensor is None:
+                if strict:
+                    return None
+
+                continue
+
+            sensors.append(sensor)
+
+        self.sensors.extend(sensors)
+
+        return [sensor.address for sensor in sensors]
+
+    def discover (self, rescan=False) -> int:
+        """
+        Busca los sensores en los buses configurados.
+
+        Args:
+            rescan: Ignora las direcciones guardadas y escanea los buses, por
+                    ejemplo tras añadir un sensor.
+
+        Returns:
+            int: Número de sensores encontrados.
+        """
+        cache = {} if rescan else self._load_cache()
+        found = {}
+
+        self.sensors = []
+
+        for bus, i2c in self._buses():
+            if i2c is None:
+                continue
+
+            cached = cache.get(str(bus))
+            addresses = None
+
+            if cached:
+                addresses = self._add_bus(bus, i2c, cached, True)
+
+            if addresses is None:
+                self.scans += 1
+                addresses = self._add_bus(bus, i2c, [address for address in i2c.scan()
+                                                     if address in self.addresses], False)
+
+            # Un bus sin sensores no se guarda para volver a buscar al arrancar
+            if addresses:
+                found[str(bus)] = addresses
+
+        if found != cache:
+            self._save_cache(found)
+
+        self.sensors.sort(key=lambda sensor: (sensor.bus, sensor.address))
+        self.primary = self.sensors[0] if self.sensors else None
+
+        self.readings = {}
+        self.stats = {}
+
+        for sensor in self.sensors:
+            self.readings[sensor.zone] = None
+            self.stats[sensor.zone] = {
+                "bus": sensor.bus,
+                "address": sensor.address,
+                "sensor_type": sensor.sensor_type,
+                "reads": 0,
+                "errors": 0,
+                "latency_ms": 0,
+                "latency_max_ms": 0,
+                "last_error": None,
+            }
+
+        if self.debug:
+            print('BME280 encontrados:', [sensor.zone for sensor in self.sensors],
+                  'escaneos:', self.scans)
+
+        return len(self.sensors)
+
+    def _error (self, sensor, error):
+        stats = self.stats[sensor.zone]
+        stats["errors"] += 1
+        stats["last_error"] = str(error)
+        self.readings[sensor.zone] = None
+
+        if self.debug:
+            print('Error leyendo el BME280 de la zona', sensor.zone, ':', error)
+
+    def read_all (self) -> dict:
+        """
+        Lee todos los sensores solapando sus conversiones.
+
+        Returns:
+            dict: Lectura de cada zona (None si ha fallado).
+        """
+        start = time.ticks_ms()
+        pending = []
+        wait = 0
+
+        for sensor in self.sensors:
+            try:
+                if sensor.forced:
+                    sensor.start_measurement()
+
+                    if sensor.measure_typ_ms > wait:
+                        wait = sensor.measure_typ_ms
+
+                pending.append(sensor)
+            except Exception as e:
+                self._error(sensor, e)
+
+        # Ninguna medida puede haber terminado antes del tiempo típico
+        wait -= time.ticks_diff(time.ticks_ms(), start)
+
+        if wait > 0:
+            time.sleep_ms(wait)
+
+        while pending:
+            for sensor in tuple(pending):
+                try:
+                    if sensor.forced and sensor.is_measuring():
+                        continue
+
+                    self.readings[sensor.zone] = sensor.get_all_data(measure=False)
+
+                    stats = self.stats[sensor.zone]
+                    latency = time.ticks_diff(time.ticks_ms(), start)
+                    stats["reads"] += 1
+                    stats["latency_ms"] = latency
+
+                    if latency > stats["latency_max_ms"]:
+                        stats["latency_max_ms"] = latency
+                except Exception as e:
+                    self._error(sensor, e)
+
+                pending.remove(sensor)
+
+            if pending:
+                time.sleep_ms(1)
+
+        return self.readings
+
+    def get_all_data (self) -> dict:
+        """
+        Lee todos los sensores y devuelve la lectura del principal.
+
+        Returns:
+            dict: Lectura del sensor principal, como BME280.get_all_data().
+        """
+        if self.primary is None:
+            raise RuntimeError("No hay sensores BME280")
+
+        self.read_all()
+        reading = self.readings[self.primary.zone]
+
+        if reading is None:
+            raise RuntimeError(self.stats[self.primary.zone]["last_error"])
+
+        return reading
+
+    @property
+    def sensor_type (self):
+        return self.primary.sensor_type if self.primary else None
+
+    @property
+    def is_bmp280 (self):
+        return self.primary.is_bmp280 if self.primary else False
+
+    def get_stats (self) -> dict:
+        """
+        Devuelve las métricas de cada zona y los escaneos hechos.
+        """
+        return {
+            "scans": self.scans,
+            "zones": self.stats,
+        }
@@ -0,0 +1,114 @@
+import time
+import uasyncio as asyncio
+from array import array
+from machine import Pin
+
+
+class GrowCounter:
+    """
+    Contador de pulsos para sensores Grow de Pimoroni (salida PFM, la
+    frecuencia sube con la humedad) medidos todos a la vez en la misma
+    ventana.
+
+    Cada pin tiene una interrupción en el flanco de subida que solo incrementa
+    su contador en un array preasignado, por lo que no reserva memoria ni
+    ocupa la CPU entre pulsos y no se pierden flancos aunque el programa esté
+    ocupado. Medir 8 plantas dura una sola ventana.
+
+    :param pins: Pines GPIO de los sensores.
+    :param hard: Usa interrupciones hard (más precisas, sin reservar memoria).
+    """
+
+    def __init__ (self, pins, hard=True):
+        self.pins = tuple(pins)
+        self.hard = hard
+        self.gpio = [Pin(pin, Pin.IN) for pin in self.pins]
+        self.counts = array('L', [0] * len(self.pins))
+        self.handlers = [self._handler(index) for index in range(len(self.pins))]
+
+        self.counting = False
+        self.start_us = 0
+        self.elapsed_us = 0  # Duración real de la última ventana
+        self.ts_ms = 0  # ticks_ms() al cerrar la última ventana
+        self.timestamp = 0  # Hora (epoch) al cerrar la última ventana
+
+    def _handler (self, index):
+        counts = self.counts
+
+        def handler (pin):
+            counts[index] += 1
+
+        return handler
+
+    def start (self) -> None:
+        """
+        Pone los contadores a cero y abre la ventana de medida.
+        """
+        counts = self.counts
+
+        for index in range(len(counts)):
+            counts[index] = 0
+
+        self.start_us = time.ticks_us()
+
+        for pin, handler in zip(self.gpio, self.handlers):
+            pin.irq(handler=handler, trigger=Pin.IRQ_RISING, hard=self.hard)
+
+        self.counting = True
+
+    def stop (self) -> int:
+        """
+        Cierra la ventana de medida.
+
+        Returns:
+            int: Duración de la ventana en µs.
+        """
+        for pin in self.gpio:
+            pin.irq(handler=None)
+
+        self.elapsed_us = time.ticks_diff(time.ticks_us(), self.start_us)
+        self.ts_ms = time.ticks_ms()
+        self.timestamp = int(time.time())
+        self.counting = False
+
+        return self.elapsed_us
+
+    def frequency (self, index) -> float:
+        """
+        Frecuencia en Hz de un sensor en la última ventana.
+
+        Args:
+            index (int): Posición del pin en ``pins``.
+        """
+        if not self.elapsed_us:
+            return 0.0
+
+        return self.counts[index] * 1000000 / self.elapsed_us
+
+    def measure (self, gate_ms=1000) -> int:
+        """
+        Mide durante gate_ms esperando con sleep_ms (sin sondear los pines).
+
+        Returns:
+            int: Duración de la ventana en µs.
+        """
+        self.start()
+        time.sleep_ms(gate_ms)
+
+        return self.stop()
+
+    async def measure_async (self, gate_ms=1000) -> int:
+        """
+        Mide durante gate_ms cediendo el control al resto de tareas.
+
+        Returns:
+            int: Duración de la ventana en µs.
+        """
+        self.start()
+
+        try:
+            await asyncio.sleep_ms(gate_ms)
+        finally:
+            self.stop()
+
+        return self.elapsed_us
@@ -1,5 +1,10 @@
 import time
-from machine import Pin, ADC
+import uasyncio as asyncio
+from array import array
+from machine import Pin, ADC, Timer
+from Models.RunningStats import RunningStats
+from Models.SampleFilter import SampleFilter
+from Models.Sensors.GrowCounter import GrowCounter
 
 # Intento importar variables de entorno si existen
 try:
@@ -12,10 +17,14 @@ class SoilMoisture:
 
     def __init__(self, rpi, pin=None, dry_voltage=None, wet_voltage=None,
                  calibration_scale=None, calibration_offset=None,
-                 samples=None, sample_delay_ms=None):
+                 samples=None, sample_delay_ms=None, sample_filter=None):
         self.RPI = rpi
         self.pin = pin
-        self.adc = ADC(pin) if pin is not None else None
+        self.adc = None
+
+        if pin is not None:
+            get_adc = getattr(rpi, 'get_adc', None)
+            self.adc = get_adc(pin) if get_adc else ADC(pin)
 
         # Referencia y factor ADC
         self.vref = getattr(rpi, 'voltage_working', 3.3)
@@ -40,20 +49,76 @@ class SoilMoisture:
         self.samples = samples if samples is not None else getattr(ENV, 'SOIL_SAMPLES', 8)
         self.sample_delay_ms = sample_delay_ms if sample_delay_ms is not None else getattr(ENV, 'SOIL_SAMPLE_DELAY_MS', 5)
 
-        # Estadísticas por fuente
+        # Filtro de las muestras de cada lectura (descarta picos de la bomba
+        # o del Wi-Fi)
+        self.filter = sample_filter or SampleFilter(
+            method=getattr(ENV, 'SOIL_FILTER', 'mean'),
+            trim=getattr(ENV, 'SOIL_FILTER_TRIM', 1),
+            hampel_k=getattr(ENV, 'SOIL_HAMPEL_K', 3.0),
+            ema_alpha=getattr(ENV, 'SOIL_EMA_ALPHA', 0.0),
+            size=self.samples)
+
+        # Muestreo en segundo plano (start_sampling): buffer preasignado que
+        # rellena el callback del Timer
+        self._buffer = array('H', [0] * max(1, int(self.samples)))
+        self._count = 0
+        self._target = 0
+        self._delay = 1
+        self._sampling = False
+        self._timer = None
+        self._timer_callback = self._on_timer
+
+        # Contadores de pulsos de sensores Grow por grupo de pines
+        self._grow_counters = {}
+
+        # Estadísticas por fuente: (voltaje, porcentaje) en RunningStats
         self.stats = {}
 
+    def source_stats(self, source):
+        """Estadísticas (voltaje, porcentaje) de una fuente, creadas la primera vez"""
+        stats = self.stats.get(source)
+
+        if stats is None:
+            stats = (RunningStats(), RunningStats())
+            self.stats[source] = stats
+
+        return stats
+
     def _update_stats(self, source, voltage, percent):
-        s = self.stats.get(source, {})
-        if s.get('voltage_min') is None or (voltage is not None and voltage < s.get('voltage_min', voltage)):
-            s['voltage_min'] = voltage
-        if s.get('voltage_max') is None or (voltage is not None and voltage > s.get('voltage_max', voltage)):
-            s['voltage_max'] = voltage
-        if s.get('percent_min') is None or percent < s.get('percent_min', percent):
-            s['percent_min'] = percent
-        if s.get('percent_max') is None or percent > s.get('percent_max', percent):
-            s['percent_max'] = percent
-        self.stats[source] = s
+        voltage_stats, percent_stats = self.source_stats(source)
+
+        if voltage is not None:
+            voltage_stats.update(voltage)
+
+        percent_stats.update(percent)
+
+    def get_stats(self, source='pico_adc'):
+        """
+        Devuelve mínimo, máximo, media y desviación típica del voltaje y del
+        porcentaje de una fuente.
+
+        Returns:
+            dict: Estadísticas, vacío si la fuente no tiene lecturas.
+        """
+        stats = self.stats.get(source)
+
+        if stats is None:
+            return {}
+
+        voltage = stats[0].get_stats(4)
+        percent = stats[1].get_stats(1)
+
+        return {
+            'count': percent['count'],
+            'voltage_min': voltage['min'],
+            'voltage_max': voltage['max'],
+            'voltage_mean': voltage['mean'],
+            'voltage_std': voltage['std'],
+            'percent_min': percent['min'],
+            'percent_max': percent['max'],
+            'percent_mean': percent['mean'],
+            'percent_std': percent['std'],
+        }
 
     def map_voltage_to_percent(self, voltage):
         # Aplico calibración (scale/offset)
@@ -81,12 +146,100 @@ class SoilMoisture:
         n = n if n > 0 else 1
         delay = int(sample_delay_ms if sample_delay_ms is not None else self.sample_delay_ms)
 
-        total = 0
-        for _ in range(n):
-            total += self.adc.read_u16()
+        if len(self._buffer) < n:
+            self._buffer = array('H', [0] * n)
+
+        buffer = self._buffer
+        for i in range(n):
+            buffer[i] = self.adc.read_u16()
             if delay > 0:
                 time.sleep_ms(delay)
-        raw_avg = total // n
+
+        return self._reading(self.filter.apply(buffer, n))
+
+    def _on_timer(self, timer):
+        """
+        Callback del Timer: guarda una muestra en el buffer sin reservar
+        memoria y se detiene al completar el muestreo.
+        """
+        i = self._count
+        self._buffer[i] = self.adc.read_u16()
+        i += 1
+        self._count = i
+
+        if i >= self._target:
+            timer.deinit()
+            self._sampling = False
+
+    def start_sampling(self, samples=None, sample_delay_ms=None):
+        """
+        Empieza a tomar las muestras del ADC en segundo plano: la primera al
+        momento y el resto desde un Timer cada sample_delay_ms. La lectura se
+        obtiene con result() cuando ready() devuelve True.
+
+        Returns:
+            bool: False si ya había un muestreo en curso (sigue ese).
+        """
+        if self.adc is None:
+            raise ValueError("No ADC pin configured in SoilMoisture instance")
+
+        if self._sampling:
+            return False
+
+        n = int(samples if samples is not None else self.samples)
+        n = n if n > 0 else 1
+        delay = int(sample_delay_ms if sample_delay_ms is not None else self.sample_delay_ms)
+
+        if len(self._buffer) < n:
+            self._buffer = array('H', [0] * n)
+
+        self._target = n
+        self._delay = delay if delay > 0 else 1
+        self._buffer[0] = self.adc.read_u16()
+        self._count = 1
+
+        if n > 1:
+            if self._timer is None:
+                self._timer = Timer()
+
+            self._sampling = True
+            self._timer.init(mode=Timer.PERIODIC, period=self._delay,
+                             callback=self._timer_callback)
+
+        return True
+
+    def ready(self):
+        """Indica si ha terminado el muestreo lanzado con start_sampling()"""
+        return not self._sampling and self._count > 0
+
+    def result(self):
+        """
+        Lectura filtrada de las muestras tomadas con start_sampling(), con el
+        mismo formato que read_analog().
+        """
+        return self._reading(self.filter.apply(self._buffer, self._count))
+
+    async def read_analog_async(self, samples=None, sample_delay_ms=None):
+        """
+        Igual que read_analog() pero sin bloquear: las muestras las toma un
+        Timer y mientras tanto se cede el control al resto de tareas.
+        """
+        self.start_sampling(samples, sample_delay_ms)
+
+        while self._sampling:
+            await asyncio.sleep_ms(self._delay)
+
+        return self.result()
+
+    def read_raw(self, raw):
+        """
+        Lectura a partir del valor del ADC ya filtrado por otro muestreo
+        (AnalogSampler), con el mismo formato que read_analog().
+        """
+        return self._reading(raw)
+
+    def _reading(self, raw_avg):
+        """Convierte el valor filtrado del ADC en la lectura y actualiza estadísticas"""
         voltage = raw_avg * self.adc_factor
 
         percent, v_cal = self.map_voltage_to_percent(voltage)
@@ -97,66 +250,88 @@ class SoilMoisture:
             #'raw': raw_avg,
             'voltage': round(v_cal, 4),
             'humidity_percent': round(percent, 1),
+            'rejected': self.filter.rejected,  # Muestras descartadas por el filtro
             #'dry_voltage': self.dry_voltage,
             #'wet_voltage': self.wet_voltage,
             #'samples': n,
             #'ts_ms': time.ticks_ms(),
-            #'stats': self.stats.get('pico_adc', {}).copy(),
+            #'stats': self.get_stats('pico_adc'),
         }
 
-    def read_grow_sensor_frequency(self, pin, measurement_time=1.0):
+    def _grow_counter(self, pins):
+        """Contador de pulsos reutilizable para un grupo de pines"""
+        pins = tuple(pins)
+        counter = self._grow_counters.get(pins)
+
+        if counter is None:
+            counter = GrowCounter(pins)
+            self._grow_counters[pins] = counter
+
+        return counter
+
+    def _grow_readings(self, counter, measurement_time):
+        """Lecturas de cada sensor Grow de la última ventana del contador"""
+        readings = []
+
+        for index, pin in enumerate(counter.pins):
+            frequency = counter.frequency(index)
+            humidity_percent = self.calculate_grow_humidity_from_frequency(frequency)
+            source = 'grow_{}'.format(pin)
+
+            self._update_stats(source, None, humidity_percent)
+
+            readings.append({
+                'source': 'grow',
+                'pin': pin,
+                'frequency_hz': round(frequency, 2),
+                'humidity_percent': round(humidity_percent, 1),
+                'pulse_count': counter.counts[index],
+                'measurement_time': measurement_time,
+                'ts_ms': counter.ts_ms,
+                'timestamp': counter.timestamp,
+                'stats': self.get_stats(source),
+            })
+
+        return readings
+
+    def read_grow_sensors(self, pins, measurement_time=1.0):
         """
-        Lee un sensor Grow de Pimoroni basado en PFM (Pulse-Frequency Modulation).
+        Lee varios sensores Grow de Pimoroni (PFM) a la vez en la misma
+        ventana contando los pulsos por interrupción (GrowCounter).
 
         Args:
-            pin (int): Número del pin GPIO conectado al sensor
-            measurement_time (float): Tiempo de medición en segundos (default: 1.0s)
+            pins: Pines GPIO conectados a los sensores.
+            measurement_time (float): Duración de la ventana en segundos.
 
         Returns:
-            dict: Frecuencia medida y porcentaje estimado de humedad
+            list: Lectura de cada pin, en el mismo orden.
         """
-        gpio_pin = Pin(pin, Pin.IN)
-
-        pulse_count = 0
-        start_time = time.ticks_ms()
-        last_state = gpio_pin.value()
+        counter = self._grow_counter(pins)
+        counter.measure(int(measurement_time * 1000))
 
-        # Contar pulsos durante el tiempo especificado
-        while time.ticks_diff(time.ticks_ms(), start_time) < (measurement_time * 1000):
-            current_state = gpio_pin.value()
+        return self._grow_readings(counter, measurement_time)
 
-            # Detectar flanco ascendente
-            if current_state == 1 and last_state == 0:
-                pulse_count += 1
-
-            last_state = current_state
-
-        # Calcular frecuencia
-        frequency = pulse_count / measurement_time
+    async def read_grow_sensors_async(self, pins, measurement_time=1.0):
+        """
+        Igual que read_grow_sensors() cediendo el control durante la ventana.
+        """
+        counter = self._grow_counter(pins)
+        await counter.measure_async(int(measurement_time * 1000))
 
-        # Convertir a porcentaje de humedad
-        # Rango típico: 2Hz (seco) - 30Hz (húmedo)
-        min_freq = 2.0   # Frecuencia en seco
-        max_freq = 30.0  # Frecuencia en húmedo
+        return self._grow_readings(counter, measurement_time)
 
-        if frequency <= min_freq:
-            humidity_percent = 0.0
-        elif frequency >= max_freq:
-            humidity_percent = 100.0
-        else:
-            humidity_percent = ((frequency - min_freq) / (max_freq - min_freq)) * 100.0
+    def read_grow_sensor_frequency(self, pin, measurement_time=1.0):
+        """
+        Lee un sensor Grow de Pimoroni basado en PFM (Pulse-Frequency Modulation).
 
-        self._update_stats('grow', None, humidity_percent)
+        Args:
+            pin (int): Número del pin GPIO conectado al sensor
+            measurement_time (float): Tiempo de medición en segundos (default: 1.0s)
 
-        return {
-            'source': 'grow',
-            'frequency_hz': round(frequency, 2),
-            'humidity_percent': round(humidity_percent, 1),
-            'pulse_count': pulse_count,
-            'measurement_time': measurement_time,
-            'ts_ms': time.ticks_ms(),
-            'stats': self.stats.get('grow', {}).copy(),
-        }
+        Returns:
+            dict: Frecuencia medida y porcentaje estimado de humedad
+        """
+        return self.read_grow_sensors((pin,), measurement_time)[0]
 
     def read_grow_sensor_interrupt(self, pin, callback_function):
         """
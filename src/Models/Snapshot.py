@@ -0,0 +1,205 @@
+import os
+import struct
+from time import time, gmtime
+from machine import RTC
+
+# Cabecera y versión del formato
+MAGIC = b'SPst'
+VERSION = 4
+
+# Estadísticas de una magnitud (Models.RunningStats): last, max, min, mean,
+# m2, count
+STATS = 'fffffI'
+
+# Contenido tras la cabecera:
+#   wakes, next_wake (epoch), last_upload (epoch), last_config (epoch)
+#   ready_ms, ready_max_ms
+#   batería: voltage_estimated y estadísticas del voltaje
+#   cpu: estadísticas de la temperatura
+#   humedad en tierra (ADC interno): estadísticas del voltaje y del porcentaje
+FORMAT = '<4sB' + 'IIII' + 'HH' + 'f' + STATS + STATS + STATS + STATS
+
+NAN = float('nan')
+
+# Estadísticas sin medidas
+NO_STATS = (NAN, NAN, NAN, 0.0, 0.0, 0)
+
+
+def _value(value):
+    return NAN if value is None else value
+
+
+def _none(value):
+    return None if value != value else value
+
+
+def _capture_stats(stats):
+    return (_value(stats.last), _value(stats.maximum), _value(stats.minimum),
+            stats.mean, stats.m2, stats.count)
+
+
+def _restore_stats(stats, saved):
+    """
+    Recupera unas estadísticas guardadas y vuelve a añadir la lectura tomada
+    en el arranque, si la hay.
+    """
+    current = stats.last if stats.count else None
+    last, maximum, minimum, mean, m2, count = saved
+    stats.restore(count, mean, m2, _none(minimum), _none(maximum), _none(last))
+
+    if current is not None:
+        stats.update(current)
+
+
+class Snapshot:
+    """
+    Estado crítico que se conserva entre despertares del modo de ciclo de
+    trabajo (deepsleep), guardado en flash en un registro binario compacto.
+
+    Incluye la estimación EMA de la batería y las estadísticas completas
+    (Models.RunningStats) del voltaje de la batería, de la temperatura de la
+    CPU y de la humedad en tierra, la hora de la última subida y de la
+    última sincronización de configuración y el tiempo de arranque hasta estar
+    listo. La cola de lecturas pendientes (Models.Spool) guarda su propio
+    cursor en flash y el BME280 su calibración.
+
+    El fichero se escribe en un temporal y se renombra, por lo que un corte
+    de corriente deja siempre el estado anterior o el nuevo.
+
+    :param path: Fichero en la flash.
+    :param debug: Muestra información de depuración.
+    """
+
+    def __init__ (self, path='state.bin', debug=False):
+        self.path = path
+        self.debug = debug
+        self.size = struct.calcsize(FORMAT) + 1
+
+        self.loaded = False
+        self.wakes = 0
+        self.next_wake = 0
+        self.last_upload = 0
+        self.last_config = 0
+        self.ready_ms = 0
+        self.ready_max_ms = 0
+
+        self.battery = None  # (voltage_estimated, estadísticas del voltaje)
+        self.cpu = None  # (last, max, min, mean, m2, count)
+        self.soil = None  # (estadísticas del voltaje, estadísticas del porcentaje)
+
+    def _checksum (self, data):
+        total = 0
+
+        for byte in data:
+            total += byte
+
+        return total & 0xFF
+
+    def load (self) -> bool:
+        """
+        Lee el estado guardado.
+
+        Returns:
+            bool: True si había un estado válido.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        if len(data) != self.size or data[-1] != self._checksum(data[:-1]):
+            if self.debug:
+                print('Estado guardado no válido, se ignora')
+            return False
+
+        values = struct.unpack(FORMAT, data[:-1])
+
+        if values[0] != MAGIC or values[1] != VERSION:
+            return False
+
+        (self.wakes, self.next_wake, self.last_upload, self.last_config,
+         self.ready_ms, self.ready_max_ms) = values[2:8]
+
+        self.battery = values[8:15]
+        self.cpu = values[15:21]
+        self.soil = values[21:33]
+        self.loaded = True
+
+        return True
+
+    def save (self) -> None:
+        battery = self.battery or (NAN,) + NO_STATS
+        cpu = self.cpu or NO_STATS
+        soil = self.soil or NO_STATS + NO_STATS
+
+        data = bytearray(struct.pack(
+            FORMAT, MAGIC, VERSION,
+            self.wakes, self.next_wake, self.last_upload, self.last_config,
+            min(self.ready_ms, 0xFFFF), min(self.ready_max_ms, 0xFFFF),
+            *(tuple(battery) + tuple(cpu) + tuple(soil))))
+        data.append(self._checksum(data))
+
+        tmp = self.path + '.tmp'
+
+        with open(tmp, 'wb') as f:
+            f.write(data)
+
+        os.rename(tmp, self.path)
+
+    def capture (self, rpi, soil=None) -> None:
+        """
+        Copia el estado de los modelos antes de dormir.
+
+        Args:
+            rpi: Instancia RpiPico (batería externa y temperatura de CPU).
+            soil: Instancia SoilMoisture.
+        """
+        battery = rpi.external_battery
+
+        if battery:
+            self.battery = ((_value(battery.get('voltage_estimated')),)
+                            + _capture_stats(rpi.battery_stats))
+
+        self.cpu = _capture_stats(rpi.cpu_temp_stats)
+
+        stats = soil.stats.get('pico_adc') if soil else None
+
+        if stats:
+            voltage, percent = stats
+            self.soil = _capture_stats(voltage) + _capture_stats(percent)
+
+    def restore (self, rpi, soil=None) -> None:
+        """
+        Devuelve a los modelos el estado guardado.
+        """
+        if not self.loaded:
+            return
+
+        if rpi.external_battery and self.battery:
+            rpi.external_battery['voltage_estimated'] = _none(self.battery[0])
+            _restore_stats(rpi.battery_stats, self.battery[1:])
+
+        if self.cpu:
+            _restore_stats(rpi.cpu_temp_stats, self.cpu)
+
+        if soil is not None and self.soil:
+            voltage, percent = soil.source_stats('pico_adc')
+            _restore_stats(voltage, self.soil[:6])
+            _restore_stats(percent, self.soil[6:])
+
+    def restore_clock (self) -> bool:
+        """
+        Si el RTC se ha reiniciado al despertar (queda por detrás de la hora
+        prevista para despertar), lo ajusta a esa hora.
+
+        Returns:
+            bool: True si se ha ajustado el RTC.
+        """
+        if not self.next_wake or time() >= self.next_wake - 60:
+            return False
+
+        t = gmtime(self.next_wake)
+        RTC().datetime((t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0))
+
+        return True
@@ -0,0 +1,390 @@
+import os
+import struct
+from array import array
+from Models.TimeSeries import NAN
+
+# Marca de inicio de cada registro
+MAGIC = 0xA5
+
+# Fichero con la posición de lectura (segmento, desplazamiento)
+CURSOR_FILE = 'cursor'
+CURSOR_FORMAT = '<II'
+
+
+class Spool:
+    """
+    Cola persistente en flash para las lecturas que no se han podido subir.
+
+    Los registros tienen tamaño fijo y se empaquetan con struct:
+    marca, timestamp, temperatura, presión, humedad, batería, humedad en
+    tierra por planta y un byte de suma de control. Se añaden al final del
+    segmento actual y se leen en orden desde un cursor guardado en flash.
+
+    Ante un corte de corriente:
+    - Un registro a medio escribir queda al final del último segmento y se
+      recorta al abrir la cola.
+    - Un registro corrupto no pasa la marca o la suma y se descarta.
+    - El cursor se escribe en un fichero temporal y se renombra, por lo que
+      siempre queda el anterior o el nuevo.
+
+    La cola se divide en segmentos de ``segment_bytes``; cuando el total
+    supera ``max_bytes`` se borra el segmento más antiguo y sus registros
+    pendientes se cuentan en ``dropped``.
+
+    :param path: Directorio de la cola en la flash.
+    :param plants: Número de plantas (columnas de humedad en tierra).
+    :param max_bytes: Espacio máximo en flash para la cola.
+    :param segment_bytes: Tamaño de cada segmento.
+    :param debug: Muestra información de depuración.
+    """
+
+    def __init__ (self, path='spool', plants=1, max_bytes=65536,
+                  segment_bytes=8192, debug=False):
+        self.path = path
+        self.plants = max(1, int(plants))
+        self.debug = debug
+
+        self.format = '<BIffff' + 'f' * self.plants
+        self.record_size = struct.calcsize(self.format) + 1
+        self.records_per_segment = max(1, segment_bytes // self.record_size)
+        self.max_segments = max(2, max_bytes // (self.records_per_segment * self.record_size))
+
+        # Buffer reutilizado para escribir y leer registros
+        self._buffer = bytearray(self.record_size)
+        self._values = [NAN] * self.plants
+
+        # Registros del fichero leídos hasta cada fila de la última load(),
+        # incluidos los corruptos descartados antes de ella
+        self._offsets = array('L')
+
+        self.first = 0  # Segmento más antiguo
+        self.last = 0  # Segmento en el que se escribe
+        self.last_records = 0  # Registros en el último segmento
+        self.read_segment = 0  # Cursor de lectura
+        self.read_offset = 0
+        self.pending = 0
+
+        self.stats = {
+            "appended": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "corrupt": 0,
+            "truncated": 0,
+        }
+
+        self._open()
+
+    def __len__ (self):
+        return self.pending
+
+    def _segment_path (self, segment):
+        return '{}/{:05d}.dat'.format(self.path, segment)
+
+    def _size (self, path):
+        try:
+            return os.stat(path)[6]
+        except OSError:
+            return 0
+
+    def _open (self):
+        """
+        Recupera el estado de la cola desde la flash.
+        """
+        try:
+            os.mkdir(self.path)
+        except OSError:
+            pass
+
+        segments = sorted(
+            int(name[:-4]) for name in os.listdir(self.path)
+            if name.endswith('.dat')
+        )
+
+        try:
+            with open(self.path + '/' + CURSOR_FILE, 'rb') as f:
+                self.read_segment, self.read_offset = struct.unpack(
+                    CURSOR_FORMAT, f.read(struct.calcsize(CURSOR_FORMAT)))
+        except (OSError, ValueError):
+            self.read_segment = segments[0] if segments else 0
+            self.read_offset = 0
+
+        if segments:
+            self.first = segments[0]
+            self.last = segments[-1]
+        else:
+            self.first = self.last = self.read_segment
+
+        if self.read_segment < self.first:
+            self.read_segment, self.read_offset = self.first, 0
+
+        # Todo leído: se borran los segmentos que quedasen y se empieza en uno nuevo
+        if self.read_segment > self.last:
+            for segment in segments:
+                os.remove(self._segment_path(segment))
+
+            self.first = self.last = self.read_segment
+            self.read_offset = 0
+
+        # Recorta un registro a medio escribir al final del último segmento
+        last_path = self._segment_path(self.last)
+        size = self._size(last_path)
+        extra = size % self.record_size
+
+        if extra:
+            self.stats["truncated"] += 1
+            self._truncate(last_path, size - extra)
+            size -= extra
+
+        self.last_records = size // self.record_size
+
+        self.pending = self._count_pending()
+
+        if self.debug:
+            print('Cola en flash:', self.pending, 'registros pendientes')
+
+    def _truncate (self, path, size):
+        """
+        Reescribe un segmento con sus primeros ``size`` bytes. LittleFS no
+        permite truncar, por lo que se copia registro a registro.
+        """
+        tmp = path + '.tmp'
+        buffer = self._buffer
+
+        with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+            for _ in range(size // self.record_size):
+                src.readinto(buffer)
+                dst.write(buffer)
+
+        os.rename(tmp, path)
+
+    def _count_pending (self):
+        if self.read_segment > self.last:
+            return 0
+
+        full = (self.last - self.read_segment) * self.records_per_segment
+
+        return full + self.last_records - self.read_offset
+
+    def _save_cursor (self):
+        tmp = self.path + '/' + CURSOR_FILE + '.tmp'
+
+        with open(tmp, 'wb') as f:
+            f.write(struct.pack(CURSOR_FORMAT, self.read_segment, self.read_offset))
+
+        os.rename(tmp, self.path + '/' + CURSOR_FILE)
+
+    def _rotate (self):
+        """
+        Empieza un segmento nuevo y borra los más antiguos si se supera el
+        espacio máximo.
+        """
+        self.last += 1
+        self.last_records = 0
+
+        while self.last - self.first + 1 > self.max_segments:
+            if self.read_segment == self.first:
+                self.stats["dropped"] += self.records_per_segment - self.read_offset
+                self.pending -= self.records_per_segment - self.read_offset
+                self.read_segment, self.read_offset = self.first + 1, 0
+                self._save_cursor()
+
+            try:
+                os.remove(self._segment_path(self.first))
+            except OSError:
+                pass
+
+            self.first += 1
+
+    def _checksum (self, buffer):
+        total = 0
+
+        for i in range(self.record_size - 1):
+            total += buffer[i]
+
+        return total & 0xFF
+
+    def push (self, history, count=None) -> int:
+        """
+        Guarda en la cola las filas más antiguas del histórico y las descarta
+        de él.
+
+        Args:
+            history: Histórico de lecturas (Models.TimeSeries).
+            count (int): Número de filas, por defecto todas.
+
+        Returns:
+            int: Número de registros guardados.
+        """
+        if count is None or count > len(history):
+            count = len(history)
+
+        if not count:
+            return 0
+
+        buffer = self._buffer
+        values = self._values
+        plants = self.plants
+        written = 0
+        f = None
+
+        try:
+            for index in range(count):
+                if self.last_records >= self.records_per_segment:
+                    if f:
+                        f.close()
+                        f = None
+                    self._rotate()
+
+                if f is None:
+                    f = open(self._segment_path(self.last), 'ab')
+
+                row = history.row_at(index)
+                base = row * plants
+
+                for i in range(plants):
+                    values[i] = history.soil[base + i]
+
+                struct.pack_into(self.format, buffer, 0, MAGIC,
+                                 history.timestamps[row],
+                                 history.temperature[row],
+                                 history.pressure[row],
+                                 history.humidity[row],
+                                 history.battery[row], *values)
+                buffer[self.record_size - 1] = self._checksum(buffer)
+
+                f.write(buffer)
+                self.last_records += 1
+                self.pending += 1
+                written += 1
+        finally:
+            if f:
+                f.close()
+
+        history.consume(written)
+        self.stats["appended"] += written
+
+        return written
+
+    def load (self, history, count=None) -> int:
+        """
+        Copia los siguientes registros pendientes en un histórico vacío sin
+        mover el cursor. Lee registro a registro, nunca el fichero completo.
+
+        Args:
+            history: Histórico donde cargar los registros (se vacía antes).
+            count (int): Máximo de registros, por defecto la capacidad del
+                         histórico.
+
+        Returns:
+            int: Número de registros leídos del fichero (incluidos los
+                 corruptos, que se descartan).
+        """
+        history.clear()
+
+        limit = history.capacity if count is None else min(count, history.capacity)
+
+        if len(self._offsets) < limit:
+            self._offsets = array('L', [0] * limit)
+
+        offsets = self._offsets
+        buffer = self._buffer
+        segment = self.read_segment
+        offset = self.read_offset
+        read = 0
+
+        while read < limit and segment <= self.last:
+            records = self.last_records if segment == self.last else self.records_per_segment
+
+            if offset >= records:
+                segment += 1
+                offset = 0
+                continue
+
+            try:
+                f = open(self._segment_path(segment), 'rb')
+            except OSError:
+                segment += 1
+                offset = 0
+                continue
+
+            with f:
+                f.seek(offset * self.record_size)
+
+                while read < limit and offset < records:
+                    if f.readinto(buffer) != self.record_size:
+                        break
+
+                    offset += 1
+                    read += 1
+
+                    if buffer[0] != MAGIC or buffer[self.record_size - 1] != self._checksum(buffer):
+                        self.stats["corrupt"] += 1
+                        continue
+
+                    record = struct.unpack_from(self.format, buffer, 0)
+                    row = history.append(record[1], record[2], record[3],
+                                         record[4], record[5])
+
+                    for i in range(self.plants):
+                        history.set_soil(row, i, record[6 + i])
+
+                    offsets[len(history) - 1] = read
+
+        return read
+
+    def records (self, rows) -> int:
+        """
+        Registros del fichero que ocupan las primeras ``rows`` filas cargadas
+        con la última load(), incluidos los corruptos intercalados. Es lo que
+        hay que avanzar el cursor cuando la API confirma esas filas.
+        """
+        if rows <= 0:
+            return 0
+
+        return self._offsets[rows - 1]
+
+    def advance (self, count) -> None:
+        """
+        Mueve el cursor de lectura ``count`` registros (ya subidos) y borra
+        los segmentos completamente leídos.
+        """
+        count = min(count, self.pending)
+
+        if count <= 0:
+            return
+
+        self.pending -= count
+        self.stats["replayed"] += count
+        offset = self.read_offset + count
+
+        while offset >= self.records_per_segment and self.read_segment < self.last:
+            offset -= self.records_per_segment
+            self.read_segment += 1
+
+        self.read_offset = offset
+
+        # Cola vacía: se vuelve a empezar en un segmento nuevo
+        if not self.pending:
+            self.read_segment = self.last + 1
+            self.read_offset = 0
+
+        while self.first < self.read_segment and self.first <= self.last:
+            try:
+                os.remove(self._segment_path(self.first))
+            except OSError:
+                pass
+
+            self.first += 1
+
+        if not self.pending:
+            self.last = self.first = self.read_segment
+            self.last_records = 0
+
+        self._save_cursor()
+
+    def get_stats (self) -> dict:
+        stats = dict(self.stats)
+        stats["pending"] = self.pending
+        stats["segments"] = self.last - self.first + 1
+
+        return stats
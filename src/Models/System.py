@@ -1,5 +1,7 @@
 
 import env
+from time import time
+from Models.TimeSeries import NAN
 
 
 
@@ -51,16 +53,33 @@ class System:
     # Estados
     need_api_sync = False
 
-    def __init__(self, controller, weather_sensor = None, light_sensor = None):
+    def __init__(self, controller, weather_sensor = None, light_sensor = None,
+                 history = None):
         ## Microcontrolador
         self.controller = controller
 
-        ## Sensor climatológico (Por defecto BME280)
+        ## Sensor climatológico (Por defecto BME280 o BME280Registry con un
+        ## sensor por zona)
         self.weather_sensor = weather_sensor
 
+        ## Últimas lecturas del clima por zona (BME280Registry)
+        self.weather_zones = {}
+
         ## Sensor de luz (Puede ser VEML6075 o VEML7000)
         self.light_sensor = light_sensor
 
+        ## Últimas lecturas de humedad en tierra por fuente (pin/canal)
+        self.soil = {}
+
+        ## Histórico de lecturas entre subidas (Models.TimeSeries)
+        self.history = history
+
+        ## Columna del histórico asignada a cada fuente de humedad en tierra
+        self.soil_columns = {}
+
+        ## Configuración descargada de la API (location, plants, system)
+        self.config = None
+
     def need_watering(self):
         """
         Comprueba si hay agua para regar, si está en horario para regar,
@@ -113,26 +132,120 @@ class System:
         if self.weather_sensor:
             self.weather = self.weather_sensor.get_all_data()
 
+            zones = getattr(self.weather_sensor, 'readings', None)
+
+            if zones is not None:
+                self.weather_zones = zones
+
         if self.light_sensor:
             self.light = self.light_sensor.get_all_data()
 
-    def get_info(self):
+        self.record()
+
+    def record(self, timestamp=None):
+        """
+        Añade al histórico una fila con las últimas lecturas del clima, la
+        batería y la humedad en tierra de cada planta.
+        :param timestamp: Segundos de la lectura, por defecto time().
+        :return:
+        """
+        history = self.history
+
+        if history is None:
+            return
+
+        weather = self.weather
+        battery = self.controller.external_battery
+
+        row = history.append(
+            int(time()) if timestamp is None else timestamp,
+            _value(weather.get('temperature')),
+            _value(weather.get('pressure')),
+            _value(weather.get('humidity')),
+            _value(battery.get('voltage_current')) if battery else NAN,
+        )
+
+        for source, reading in self.soil.items():
+            column = self.soil_columns.get(source)
+
+            if column is not None:
+                history.set_soil(row, column, _value(reading.get('humidity_percent')))
+
+    def set_config(self, config):
+        """
+        Guarda la configuración recibida de la API (o de la caché en flash).
+        :param config: Diccionario con location, plants y system.
+        :return:
+        """
+        if config:
+            self.config = config
+
+    def set_weather_zone(self, zone, reading):
+        """
+        Guarda la última lectura del clima de una zona.
+        :param zone: Nombre de la zona (BME280Registry).
+        :param reading: Diccionario como el de BME280.get_all_data().
+        :return:
+        """
+        self.weather_zones[zone] = reading
+
+    def set_soil_reading(self, source, reading):
+        """
+        Guarda la última lectura de humedad en tierra para una fuente.
+        :param source: Identificador de la fuente (pin del ADC o canal).
+        :param reading: Diccionario devuelto por SoilMoisture.
+        :return:
+        """
+        self.soil[source] = reading
+
+        if source not in self.soil_columns:
+            self.soil_columns[source] = len(self.soil_columns)
+
+    def get_plants_info(self):
+        """
+        Devuelve la última lectura de humedad en tierra de cada planta.
+        :return:
+        """
+        if not self.soil:
+            return None
+
+        return [
+            {
+                "adc": source,
+                "soil_humidity": reading.get('humidity_percent'),
+            }
+            for source, reading in self.soil.items()
+        ]
+
+    def get_info(self, refresh=True):
         """
         Actualiza toda la información y estados para devolverlo.
+        :param refresh: Si es False no se leen los sensores y se usan los
+                        últimos datos recibidos (muestreo en el segundo núcleo).
         :return:
         """
         self.check_all_needs()
-        self.read_sensors()
+
+        if refresh:
+            self.read_sensors()
 
         return  {
-            "device": self.controller.get_device_info(),
+            "device": self.controller.get_device_info(read_battery=refresh),
             "fan_on": self.fan.get('active'),
             "light_on": self.light_control.get('active'),
             "water_motor_on": self.water_motor.get('active'),
             "water_level_correct": self.water_level.get('active'),
             "weather": self.weather,
+            "weather_zones": self.weather_zones if len(self.weather_zones) > 1 else None,
             "light": self.light,
             "need_api_sync": self.need_api_sync,
-            "plants": None
+            "plants": self.get_plants_info()
 
-        }
\ No newline at end of file
+        }
+
+
+def _value(value):
+    """
+    Convierte una lectura ausente (None) en NAN para el histórico.
+    """
+    return NAN if value is None else value
@@ -0,0 +1,179 @@
+from array import array
+
+# Valor para las lecturas que no existen (sensor ausente o sin leer)
+NAN = float('nan')
+
+
+class TimeSeries:
+    """
+    Histórico de lecturas de tamaño fijo entre subidas a la API.
+
+    Guarda una columna por métrica sobre ``array``, reservadas una sola vez en
+    el constructor, para no fragmentar el heap con listas de diccionarios:
+
+    - timestamps: segundos (time.time()) en ``array('L')``.
+    - temperature, pressure, humidity, battery: ``array('f')``.
+    - soil: porcentaje de humedad en tierra por planta en un único
+      ``array('f')`` de ``capacity * plants`` posiciones.
+
+    Añadir una fila es O(1) y no reserva memoria: cuando el histórico está
+    lleno se sobrescribe la fila más antigua y se contabiliza en ``dropped``.
+    Las lecturas se hacen con memoryview sobre las columnas, sin copias.
+
+    :param capacity: Número máximo de filas.
+    :param plants: Número de plantas (columnas de humedad en tierra).
+    """
+
+    COLUMNS = ('temperature', 'pressure', 'humidity', 'battery')
+
+    def __init__ (self, capacity=192, plants=1):
+        self.capacity = max(1, int(capacity))
+        self.plants = max(1, int(plants))
+
+        self.timestamps = array('L', [0] * self.capacity)
+        self.temperature = array('f', [NAN] * self.capacity)
+        self.pressure = array('f', [NAN] * self.capacity)
+        self.humidity = array('f', [NAN] * self.capacity)
+        self.battery = array('f', [NAN] * self.capacity)
+        self.soil = array('f', [NAN] * (self.capacity * self.plants))
+
+        self.head = 0  # Próxima fila a escribir
+        self.count = 0  # Filas almacenadas
+        self.dropped = 0  # Filas sobrescritas sin haberse consumido
+
+    def __len__ (self):
+        return self.count
+
+    def append (self, timestamp, temperature=NAN, pressure=NAN, humidity=NAN,
+                battery=NAN) -> int:
+        """
+        Añade una fila. La humedad en tierra de la fila queda sin valor hasta
+        llamar a ``set_soil()``.
+
+        Returns:
+            int: Posición física de la fila en las columnas.
+        """
+        row = self.head
+
+        self.timestamps[row] = timestamp
+        self.temperature[row] = temperature
+        self.pressure[row] = pressure
+        self.humidity[row] = humidity
+        self.battery[row] = battery
+
+        base = row * self.plants
+        soil = self.soil
+        for i in range(self.plants):
+            soil[base + i] = NAN
+
+        self.head = row + 1 if row + 1 < self.capacity else 0
+
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.dropped += 1
+
+        return row
+
+    def set_soil (self, row, plant, value) -> None:
+        """
+        Guarda la humedad en tierra de una planta en una fila.
+        """
+        if 0 <= plant < self.plants:
+            self.soil[row * self.plants + plant] = value
+
+    def consume (self, n) -> None:
+        """
+        Descarta las ``n`` filas más antiguas (por ejemplo, tras subirlas).
+        """
+        if n >= self.count:
+            self.count = 0
+        elif n > 0:
+            self.count -= n
+
+    def clear (self) -> None:
+        self.count = 0
+
+    def oldest (self) -> int:
+        """
+        Posición física de la fila más antigua.
+        """
+        row = self.head - self.count
+        return row + self.capacity if row < 0 else row
+
+    def row_at (self, index) -> int:
+        """
+        Posición física de la fila ``index`` (0 = más antigua).
+        """
+        row = self.oldest() + index
+        return row - self.capacity if row >= self.capacity else row
+
+    def segments (self, column, count=None, start=0):
+        """
+        Devuelve las filas pedidas de una columna como memoryview, sin copiar.
+
+        Como el histórico es circular, el rango puede estar partido en dos
+        tramos: se devuelven uno o dos memoryview en orden cronológico.
+
+        Args:
+            column (str): 'timestamps', una de COLUMNS o 'soil' (todas las
+                          plantas intercaladas, ``plants`` valores por fila).
+            count (int): Número de filas. Por defecto todas desde ``start``.
+            start (int): Primera fila (0 = más antigua).
+
+        Returns:
+            tuple: Uno o dos memoryview.
+        """
+        available = self.count - start
+        if count is None or count > available:
+            count = available
+        if count <= 0:
+            return ()
+
+        view = memoryview(getattr(self, column))
+        width = self.plants if column == 'soil' else 1
+        first = self.row_at(start)
+        end = first + count
+
+        if end <= self.capacity:
+            return (view[first * width:end * width],)
+
+        return (view[first * width:],
+                view[:(end - self.capacity) * width])
+
+    def to_dict (self, count=None, start=0, digits=2) -> dict:
+        """
+        Devuelve las filas pedidas en formato columnar para subirlas a la API.
+        Los valores ausentes (NAN) se devuelven como None.
+
+        Args:
+            count (int): Número de filas. Por defecto todas desde ``start``.
+            start (int): Primera fila (0 = más antigua).
+            digits (int): Decimales con los que se redondean los valores.
+
+        Returns:
+            dict: Listas por columna; 'soil_humidity' tiene una lista por fila.
+        """
+        data = {
+            "timestamp": [v for m in self.segments('timestamps', count, start) for v in m],
+        }
+
+        for column in self.COLUMNS:
+            data[column] = [
+                None if v != v else round(v, digits)
+                for m in self.segments(column, count, start) for v in m
+            ]
+
+        data["battery_voltage"] = data.pop("battery")
+
+        plants = self.plants
+        soil = [
+            None if v != v else round(v, 1)
+            for m in self.segments('soil', count, start) for v in m
+        ]
+        data["soil_humidity"] = [
+            soil[i:i + plants] for i in range(0, len(soil), plants)
+        ]
+
+        return data
+
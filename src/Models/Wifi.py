@@ -0,0 +1,665 @@
+import os
+import network
+import ubinascii
+import ujson
+from random import getrandbits
+from time import sleep_ms, ticks_ms, ticks_diff, ticks_add
+
+# Estados de la conexión
+STATE_IDLE = 0  # Sin conexión ni intentos (radio apagada)
+STATE_CONNECTING = 1  # Intento en curso
+STATE_CONNECTED = 2
+STATE_BACKOFF = 3  # Esperando para reintentar tras un fallo
+STATE_OFFLINE = 4  # Agotado el tiempo de radio de la hora en curso
+
+STATE_NAMES = ('idle', 'connecting', 'connected', 'backoff', 'offline')
+
+# Fases de un intento
+PHASE_CACHED = 0  # Conexión directa al último punto de acceso
+PHASE_SCAN = 1  # Escaneo de redes
+PHASE_JOIN = 2  # Asociación con la red elegida en el escaneo
+
+# Estados del CYW43
+STAT_GOT_IP = 3
+STAT_CONNECT_FAIL = -1
+STAT_NO_AP_FOUND = -2
+STAT_WRONG_PASSWORD = -3
+
+# Modos de ahorro de energía del CYW43 (config pm)
+PM_PERFORMANCE = 0xa11140  # Sin ahorro, mínima latencia
+PM_POWERSAVE = 0x111022
+
+HOUR_MS = 3600000
+
+# Puntuación de los puntos de acceso (en dB sobre el RSSI)
+SCORE_FAILURE_DB = 20  # Penalización con todos los intentos fallidos
+SCORE_LATENCY_MS_PER_DB = 500  # Penalización por la latencia media de conexión
+SCORE_LATENCY_MAX_DB = 10
+SCORE_PRIMARY_DB = 5  # Preferencia por la red principal
+
+# Mejora mínima de señal para cambiar de punto de acceso
+ROAM_HYSTERESIS_DB = 8
+
+# Puntos de acceso con historial guardado
+HISTORY_SIZE = 8
+
+
+class Wifi:
+    """
+    Conexión Wi-Fi como máquina de estados que no bloquea.
+
+    ``poll()`` avanza la conexión un paso cada vez que se llama (desde una
+    tarea del planificador), por lo que el muestreo y las decisiones locales
+    siguen funcionando mientras no hay red:
+
+    - Cada intento prueba primero el punto de acceso de la última conexión
+      correcta, guardado en la flash, y solo si falla escanea las redes.
+    - Del escaneo se ordenan los puntos de acceso de todas las redes
+      conocidas (principal y alternativas) por señal y por su historial de
+      conexiones (éxitos y latencia), y se prueban en ese orden.
+    - Con la conexión establecida, si la señal baja de ``roam_rssi`` se
+      busca un punto de acceso mejor y se cambia a él.
+    - Un intento que no termina en ``attempt_timeout_ms`` se da por fallido.
+    - Tras un fallo la radio se apaga y se espera un tiempo que se duplica
+      con cada fallo seguido (hasta ``backoff_max_ms``), con una variación
+      aleatoria para no coincidir con otros dispositivos.
+    - El tiempo de radio dedicado a intentos de conexión se limita a
+      ``radio_budget_ms`` por hora; al agotarse se queda sin red (offline)
+      hasta la hora siguiente.
+
+    :param ssid: Red principal.
+    :param password: Contraseña de la red principal.
+    :param alternatives_ap: Lista de redes alternativas {"ssid", "password"}.
+    :param hostname: Nombre del dispositivo en la red.
+    :param cache_path: Fichero con la última conexión correcta (None para no guardarla).
+    :param static_ip: Reutiliza la IP de la última conexión sin pedirla por DHCP.
+    :param fast_timeout_ms: Tiempo máximo para el punto de acceso guardado.
+    :param attempt_timeout_ms: Tiempo máximo de cada intento completo.
+    :param backoff_ms: Espera tras el primer fallo.
+    :param backoff_max_ms: Espera máxima entre intentos.
+    :param radio_budget_ms: Tiempo de radio para intentos por hora (0 sin límite).
+    :param roam_rssi: Señal (dBm) por debajo de la que se busca otro punto de
+                      acceso (None para no cambiar).
+    :param roam_interval_ms: Intervalo entre comprobaciones de la señal.
+    :param debug: Muestra información de depuración.
+    """
+
+    def __init__ (self, ssid=None, password=None, alternatives_ap=None,
+                  hostname="Rpi-Pico-W", cache_path='wifi.cache',
+                  static_ip=False, fast_timeout_ms=3000,
+                  attempt_timeout_ms=15000, backoff_ms=5000,
+                  backoff_max_ms=600000, radio_budget_ms=300000,
+                  roam_rssi=-75, roam_interval_ms=300000, debug=False):
+        self.ssid = ssid
+        self.password = password
+        self.alternatives_ap = alternatives_ap
+        self.hostname = hostname
+        self.cache_path = cache_path
+        self.static_ip = static_ip
+        self.fast_timeout_ms = fast_timeout_ms
+        self.attempt_timeout_ms = attempt_timeout_ms
+        self.backoff_ms = backoff_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.radio_budget_ms = radio_budget_ms
+        self.roam_rssi = roam_rssi
+        self.roam_interval_ms = roam_interval_ms
+        self.DEBUG = debug
+
+        self.wlan = None
+        self.cache = None
+        self.cache_loaded = False
+        self.enabled = False  # Se intenta mantener la conexión
+        self.state = STATE_IDLE
+        self.phase = PHASE_CACHED
+        self.failures = 0  # Fallos seguidos
+        self.retry_at = 0
+        self.attempt_start = 0
+        self.phase_start = 0
+        self.target = None  # (ssid, bssid) del intento en curso
+        self.candidates = []  # Puntos de acceso pendientes del escaneo
+        self.roam_checked = 0
+
+        # Historial por punto de acceso: {bssid: [éxitos, fallos, latencia media]}
+        self.aps = {}
+
+        # Tiempo de radio en intentos dentro de la hora en curso
+        self.window_start = ticks_ms()
+        self.window_ms = 0
+
+        # Tiempo con la radio encendida (total y a máximo rendimiento)
+        self.pm = PM_PERFORMANCE
+        self.radio_on_at = None
+        self.radio_on_ms = 0  # En la hora en curso
+        self.radio_full_ms = 0  # En la hora en curso sin ahorro de energía
+        self.radio_on_ms_last_hour = 0
+        self.radio_on_ms_total = 0
+
+        self.fast_connect = False  # La última conexión fue directa
+        self.connect_ms = None  # Duración del intento que conectó
+        self.boot_to_connected_ms = None  # Desde el arranque hasta la primera conexión
+
+        self.stats = {
+            "attempts": 0,
+            "connected": 0,
+            "fast_connects": 0,
+            "scans": 0,
+            "failures": 0,
+            "timeout": 0,
+            "no_ap": 0,
+            "wrong_password": 0,
+            "connect_fail": 0,
+            "link_lost": 0,
+            "roam_scans": 0,
+            "roams": 0,
+            "budget_exhausted": 0,
+            "connect_ms_total": 0,
+            "last_error": None,
+        }
+
+    # ------------------------ Caché en flash ------------------------
+
+    def _load_cache (self):
+        """
+        Lee la última conexión correcta y el historial de los puntos de
+        acceso guardados en la flash.
+
+        Returns:
+            dict|None: ssid, bssid (hex), channel e ifconfig, o None si no hay.
+        """
+        if not self.cache_path:
+            return None
+
+        try:
+            with open(self.cache_path) as f:
+                cache = ujson.load(f)
+        except (OSError, ValueError):
+            return None
+
+        self.aps = cache.pop('aps', None) or {}
+
+        return cache if cache.get('ssid') and cache.get('bssid') else None
+
+    def _save_cache (self, ssid, bssid) -> None:
+        """
+        Guarda la red, el punto de acceso y la configuración IP de la
+        conexión actual. Se escribe en un temporal y se renombra.
+        """
+        if not self.cache_path or not bssid:
+            return
+
+        cache = {
+            "ssid": ssid,
+            "bssid": ubinascii.hexlify(bssid).decode(),
+            "channel": self.wlan.config('channel'),
+            "ifconfig": list(self.wlan.ifconfig()),
+        }
+
+        tmp = self.cache_path + '.tmp'
+
+        try:
+            with open(tmp, 'w') as f:
+                cache['aps'] = self.aps
+                ujson.dump(cache, f)
+                del cache['aps']
+
+            os.rename(tmp, self.cache_path)
+            self.cache = cache
+        except OSError as e:
+            if self.DEBUG:
+                print('No se pudo guardar la caché del Wi-Fi:', e)
+
+    def _record (self, bssid, ok, ms=0) -> None:
+        """
+        Añade un intento al historial de un punto de acceso. La latencia
+        media solo tiene en cuenta los intentos correctos.
+        """
+        key = ubinascii.hexlify(bssid).decode()
+        entry = self.aps.get(key)
+
+        if entry is None:
+            # Se olvida el punto de acceso con menos intentos
+            if len(self.aps) >= HISTORY_SIZE:
+                del self.aps[min(self.aps, key=lambda k: self.aps[k][0] + self.aps[k][1])]
+
+            entry = self.aps[key] = [0, 0, 0]
+
+        if ok:
+            entry[2] = (entry[2] * entry[0] + ms) // (entry[0] + 1)
+            entry[0] += 1
+        else:
+            entry[1] += 1
+
+        # Los intentos antiguos pesan menos
+        if entry[0] + entry[1] > 32:
+            entry[0] //= 2
+            entry[1] //= 2
+
+    # ------------------------ Radio ------------------------
+
+    def _password (self, ssid):
+        """
+        Contraseña de una red entre la principal y las alternativas.
+        """
+        if ssid == self.ssid:
+            return self.password
+
+        for ap in self.alternatives_ap or ():
+            if ap['ssid'] == ssid:
+                return ap['password']
+
+        return None
+
+    def _account (self, now) -> None:
+        """
+        Suma el tiempo con la radio encendida desde la última vez.
+        """
+        if self.radio_on_at is None:
+            return
+
+        elapsed = ticks_diff(now, self.radio_on_at)
+        self.radio_on_at = now
+        self.radio_on_ms += elapsed
+        self.radio_on_ms_total += elapsed
+
+        if self.pm == PM_PERFORMANCE:
+            self.radio_full_ms += elapsed
+
+    def _radio_on (self) -> None:
+        if self.wlan is None:
+            self.wlan = network.WLAN(network.STA_IF)
+
+        if not self.wlan.active():
+            self.wlan.active(True)
+            self.radio_on_at = ticks_ms()
+
+            # Establezco el nombre del host
+            network.hostname(self.hostname)
+
+            self.wlan.config(pm=self.pm)
+
+    def _radio_off (self) -> None:
+        if self.wlan is not None:
+            self.wlan.disconnect()
+            self.wlan.active(False)
+
+        self._account(ticks_ms())
+        self.radio_on_at = None
+
+    def set_power_mode (self, performance) -> None:
+        """
+        Cambia el modo de ahorro de energía de la radio.
+
+        Args:
+            performance (bool): True sin ahorro (ráfagas de red), False con
+                                ahorro de energía entre ráfagas.
+        """
+        pm = PM_PERFORMANCE if performance else PM_POWERSAVE
+
+        if pm == self.pm:
+            return
+
+        self._account(ticks_ms())
+        self.pm = pm
+
+        if self.wlan is not None and self.wlan.active():
+            self.wlan.config(pm=pm)
+
+    def is_connected (self) -> bool:
+        return (self.wlan is not None and self.wlan.isconnected()
+                and self.wlan.status() == STAT_GOT_IP)
+
+    def _score (self, ssid, bssid, rssi) -> float:
+        """
+        Puntuación de un punto de acceso: su señal, penalizada por los
+        intentos fallidos y la latencia media de conexión de su historial.
+        """
+        ok, fail, latency = self.aps.get(ubinascii.hexlify(bssid).decode(), (0, 0, 0))
+
+        # Sin historial cuenta como la mitad de los intentos correctos
+        success = (ok + 1) / (ok + fail + 2)
+        score = rssi - SCORE_FAILURE_DB * (1 - success)
+        score -= min(SCORE_LATENCY_MAX_DB, latency / SCORE_LATENCY_MS_PER_DB)
+
+        if ssid == self.ssid:
+            score += SCORE_PRIMARY_DB
+
+        return score
+
+    def _scan (self) -> list:
+        """
+        Escanea las redes y ordena los puntos de acceso de las redes
+        conocidas, el mejor primero.
+
+        Returns:
+            list: Tuplas (ssid, bssid, rssi).
+        """
+        self.stats["scans"] += 1
+
+        candidates = []
+
+        for ap in self.wlan.scan():
+            ssid = ap[0].decode('utf-8')
+
+            if self._password(ssid) is not None:
+                candidates.append((self._score(ssid, ap[1], ap[3]), ssid, ap[1], ap[3]))
+
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        return [c[1:] for c in candidates]
+
+    def _join (self) -> bool:
+        """
+        Conecta al siguiente punto de acceso de la lista del escaneo.
+
+        Returns:
+            bool: False si no quedan puntos de acceso.
+        """
+        if not self.candidates:
+            return False
+
+        ssid, bssid, rssi = self.candidates.pop(0)
+
+        if self.DEBUG:
+            print('Wi-Fi: conectando a', ssid, ubinascii.hexlify(bssid).decode(), rssi, 'dBm')
+
+        self.target = (ssid, bssid)
+        self.wlan.connect(ssid, self._password(ssid), bssid=bssid)
+        self.phase = PHASE_JOIN
+        self.phase_start = ticks_ms()
+
+        return True
+
+    # ------------------------ Máquina de estados ------------------------
+
+    def _begin (self, now) -> None:
+        """
+        Empieza un intento si queda tiempo de radio en la hora en curso.
+        """
+        if self.radio_budget_ms and self.window_ms >= self.radio_budget_ms:
+            if self.state != STATE_OFFLINE:
+                self.stats["budget_exhausted"] += 1
+
+                if self.DEBUG:
+                    print('Wi-Fi: agotado el tiempo de radio de esta hora, sin red')
+
+            self.state = STATE_OFFLINE
+            self.retry_at = ticks_add(self.window_start, HOUR_MS)
+            self._radio_off()
+
+            return
+
+        self._radio_on()
+
+        self.stats["attempts"] += 1
+        self.state = STATE_CONNECTING
+        self.attempt_start = self.phase_start = now
+        self.phase = PHASE_SCAN
+
+        if not self.cache_loaded:
+            self.cache = self._load_cache()
+            self.cache_loaded = True
+
+        cache = self.cache
+        password = self._password(cache['ssid']) if cache else None
+
+        if password is not None:
+            if self.static_ip and cache.get('ifconfig'):
+                self.wlan.ifconfig(tuple(cache['ifconfig']))
+
+            self.target = (cache['ssid'], ubinascii.unhexlify(cache['bssid']))
+            self.phase = PHASE_CACHED
+            self.wlan.connect(self.target[0], password, bssid=self.target[1])
+
+    def _step (self, now) -> None:
+        """
+        Avanza el intento en curso.
+        """
+        if self.is_connected():
+            self._connected(now)
+            return
+
+        if ticks_diff(now, self.attempt_start) >= self.attempt_timeout_ms:
+            if self.phase != PHASE_SCAN:
+                self._record(self.target[1], False)
+
+            self.candidates = []
+            self._fail(now, 'timeout')
+            return
+
+        status = self.wlan.status()
+
+        if self.phase == PHASE_CACHED:
+            if status >= 0 and ticks_diff(now, self.phase_start) < self.fast_timeout_ms:
+                return
+
+            if self.DEBUG:
+                print('Wi-Fi: no responde el punto de acceso guardado, se escanean las redes')
+
+            self.wlan.disconnect()
+            self._record(self.target[1], False)
+            self.cache = None
+
+            if self.static_ip:
+                self.wlan.ifconfig('dhcp')
+
+            self.phase = PHASE_SCAN
+        elif self.phase == PHASE_SCAN:
+            self.candidates = self._scan()
+
+            if not self._join():
+                self._fail(now, 'no_ap')
+        elif status < 0:
+            # Se prueba el siguiente punto de acceso del escaneo
+            self._record(self.target[1], False)
+            self.wlan.disconnect()
+
+            if self._join():
+                return
+
+            if status == STAT_WRONG_PASSWORD:
+                self._fail(now, 'wrong_password')
+            elif status == STAT_NO_AP_FOUND:
+                self._fail(now, 'no_ap')
+            else:
+                self._fail(now, 'connect_fail')
+
+    def _end_attempt (self, now) -> int:
+        duration = ticks_diff(now, self.attempt_start)
+        self.window_ms += duration
+        self.stats["connect_ms_total"] += duration
+
+        return duration
+
+    def _connected (self, now) -> None:
+        self.connect_ms = self._end_attempt(now)
+        self.fast_connect = self.phase == PHASE_CACHED
+        self.state = STATE_CONNECTED
+        self.failures = 0
+        self.stats["connected"] += 1
+
+        if self.fast_connect:
+            self.stats["fast_connects"] += 1
+
+        if self.boot_to_connected_ms is None:
+            self.boot_to_connected_ms = now
+
+        self.candidates = []
+        self._record(self.target[1], True, ticks_diff(now, self.phase_start))
+        self._save_cache(*self.target)
+
+        # Tras una conexión directa se comprueba la señal en el siguiente paso
+        self.roam_checked = ticks_add(now, -self.roam_interval_ms) if self.fast_connect else now
+
+        if self.DEBUG:
+            print('Wi-Fi conectado en', self.connect_ms, 'ms',
+                  '(directo)' if self.fast_connect else '(escaneo)')
+
+    def _fail (self, now, reason) -> None:
+        """
+        Cierra un intento fallido, apaga la radio y programa el siguiente
+        con espera exponencial y variación aleatoria.
+        """
+        self._end_attempt(now)
+        self._radio_off()
+
+        self.failures += 1
+        self.stats["failures"] += 1
+        self.stats[reason] += 1
+        self.stats["last_error"] = reason
+
+        delay = min(self.backoff_max_ms, self.backoff_ms << min(self.failures - 1, 16))
+
+        # Entre la mitad y el total de la espera
+        delay = delay // 2 + (delay // 2) * getrandbits(8) // 255
+
+        self.state = STATE_BACKOFF
+        self.retry_at = ticks_add(now, delay)
+
+        if self.DEBUG:
+            print('Wi-Fi: fallo de conexión (', reason, '), reintento en', delay, 'ms')
+
+    def _roam (self, now) -> None:
+        """
+        Si la señal ha bajado del umbral, escanea y cambia al mejor punto de
+        acceso que mejore la señal actual en al menos ROAM_HYSTERESIS_DB.
+        """
+        self.roam_checked = now
+        rssi = self.wlan.status('rssi')
+
+        if rssi >= self.roam_rssi:
+            return
+
+        self.stats["roam_scans"] += 1
+        candidates = self._scan()
+        current = self.target[1] if self.target else None
+
+        for i, (ssid, bssid, signal) in enumerate(candidates):
+            if bssid != current and signal >= rssi + ROAM_HYSTERESIS_DB:
+                if self.DEBUG:
+                    print('Wi-Fi: señal débil (', rssi, 'dBm), se cambia de punto de acceso')
+
+                # El resto del escaneo queda como alternativa, incluido el actual
+                self.candidates = candidates[:i] + candidates[i + 1:]
+                self.candidates.insert(0, candidates[i])
+
+                self.stats["roams"] += 1
+                self.stats["attempts"] += 1
+                self.wlan.disconnect()
+                self.state = STATE_CONNECTING
+                self.attempt_start = now
+                self._join()
+
+                return
+
+    def poll (self) -> int:
+        """
+        Avanza la máquina de estados. Se llama periódicamente desde el
+        planificador; solo bloquea durante un escaneo de redes.
+
+        Returns:
+            int: Estado de la conexión tras el paso.
+        """
+        now = ticks_ms()
+
+        # Empieza una nueva hora para el límite de tiempo de radio
+        self._account(now)
+
+        if ticks_diff(now, self.window_start) >= HOUR_MS:
+            self.window_start = now
+            self.window_ms = 0
+            self.radio_on_ms_last_hour = self.radio_on_ms
+            self.radio_on_ms = 0
+            self.radio_full_ms = 0
+
+            if self.state == STATE_OFFLINE:
+                self.retry_at = now
+
+        state = self.state
+
+        if state == STATE_CONNECTED:
+            if not self.is_connected():
+                self.stats["link_lost"] += 1
+                self.stats["last_error"] = 'link_lost'
+
+                if self.DEBUG:
+                    print('Wi-Fi: conexión perdida')
+
+                self.state = STATE_BACKOFF
+                self.retry_at = now
+            elif (self.roam_rssi is not None and
+                  ticks_diff(now, self.roam_checked) >= self.roam_interval_ms):
+                self._roam(now)
+        elif state == STATE_CONNECTING:
+            self._step(now)
+        elif self.enabled and state != STATE_IDLE:
+            if ticks_diff(now, self.retry_at) >= 0:
+                self._begin(now)
+
+        return self.state
+
+    def start (self) -> None:
+        """
+        Mantiene la conexión: los siguientes ``poll()`` conectan y reconectan.
+        """
+        self.enabled = True
+
+        if self.state == STATE_IDLE:
+            self.state = STATE_BACKOFF
+            self.retry_at = ticks_ms()
+
+    def stop (self) -> None:
+        """
+        Desconecta, apaga la radio y deja de intentar conectar.
+        """
+        self.enabled = False
+        self.state = STATE_IDLE
+        self._radio_off()
+
+    def connect (self) -> bool:
+        """
+        Hace un intento completo de conexión esperando a que termine (como
+        mucho ``attempt_timeout_ms``). Si falla, los siguientes ``poll()``
+        siguen reintentando con espera.
+
+        Returns:
+            bool: True si se ha conectado.
+        """
+        self.enabled = True
+
+        if self.is_connected():
+            self.state = STATE_CONNECTED
+            return True
+
+        self._begin(ticks_ms())
+
+        while self.state == STATE_CONNECTING:
+            sleep_ms(50)
+            self._step(ticks_ms())
+
+        return self.state == STATE_CONNECTED
+
+    def radio_on_hour_ms (self) -> int:
+        """
+        Tiempo con la radio encendida en la hora en curso.
+        """
+        self._account(ticks_ms())
+
+        return self.radio_on_ms
+
+    def get_stats (self) -> dict:
+        self._account(ticks_ms())
+
+        stats = dict(self.stats)
+        stats["state"] = STATE_NAMES[self.state]
+        stats["consecutive_failures"] = self.failures
+        stats["radio_budget_used_ms"] = self.window_ms
+        stats["radio_on_ms_hour"] = self.radio_on_ms
+        stats["radio_full_power_ms_hour"] = self.radio_full_ms
+        stats["radio_on_ms_last_hour"] = self.radio_on_ms_last_hour
+        stats["radio_on_ms_total"] = self.radio_on_ms_total
+        stats["last_connect_ms"] = self.connect_ms
+
+        if self.state in (STATE_BACKOFF, STATE_OFFLINE):
+            stats["retry_in_ms"] = max(0, ticks_diff(self.retry_at, ticks_ms()))
+
+        return stats
@@ -1,12 +1,26 @@
 import gc
-from time import sleep_ms
+import _thread
+from array import array
+from time import sleep_ms, ticks_ms, ticks_diff, time
+import uasyncio as asyncio
+from Models.Acquisition import (Acquisition, SOURCE_SOIL, SOURCE_WEATHER, SOURCE_BATTERY,
+                                SOURCE_CPU, SOURCE_WEATHER_ZONE, SOURCE_SOIL_PLANT)
+from Models.AnalogSampler import AnalogSampler
 from Models.Api import Api
 from Models.RpiPico import RpiPico
-from Models.Sensors.BME280 import BME280
+from Models.SampleBuffer import SampleBuffer
+from Models.Snapshot import Snapshot
+from Models.Spool import Spool
+from Models.Scheduler import Scheduler
+from Models.Sensors.BME280Registry import BME280Registry
 from Models.Sensors.SoilMoisture import SoilMoisture
 from Models.System import System
+from Models.TimeSeries import TimeSeries
 from functions import log
 
+# Instante de arranque para medir el tiempo hasta estar listo
+BOOT_MS = ticks_ms()
+
 # Importo variables de entorno
 import env
 
@@ -15,21 +29,58 @@ gc.enable()
 
 DEBUG = env.DEBUG
 
-# Rpi Pico Model Instance
-rpi = RpiPico(ssid=env.AP_NAME, password=env.AP_PASS, debug=DEBUG,
-              alternatives_ap=env.ALTERNATIVES_AP, hostname=env.HOSTNAME)
+# Modo de ciclo de trabajo: despierta, lee, sube si toca y vuelve a dormir
+DUTY_CYCLE = getattr(env, 'DUTY_CYCLE', False)
+
+# Muestreo de sensores en el segundo núcleo (no aplica en ciclo de trabajo)
+DUAL_CORE = getattr(env, 'DUAL_CORE', False) and not DUTY_CYCLE
 
-sleep_ms(100)
+# Estado conservado entre despertares
+snapshot = None
 
-# Debug para mostrar el estado del wifi
-rpi.wifi_debug()
+if DUTY_CYCLE:
+    snapshot = Snapshot(path=getattr(env, 'DUTY_CYCLE_STATE_PATH', 'state.bin'),
+                        debug=DEBUG)
+    snapshot.load()
+    snapshot.restore_clock()
 
-sleep_ms(100)
+# Rpi Pico Model Instance. En ciclo de trabajo el Wi-Fi solo se conecta
+# cuando toca subir datos.
+rpi = RpiPico(ssid=env.AP_NAME, password=env.AP_PASS, debug=DEBUG,
+              alternatives_ap=env.ALTERNATIVES_AP, hostname=env.HOSTNAME,
+              connect=not DUTY_CYCLE,
+              wifi_cache_path=getattr(env, 'WIFI_CACHE_PATH', 'wifi.cache'),
+              wifi_static_ip=getattr(env, 'WIFI_STATIC_IP', False),
+              wifi_fast_timeout_ms=getattr(env, 'WIFI_FAST_TIMEOUT_MS', 3000),
+              wifi_attempt_timeout_ms=getattr(env, 'WIFI_ATTEMPT_TIMEOUT_MS', 15000),
+              wifi_backoff_ms=getattr(env, 'WIFI_BACKOFF_MS', 5000),
+              wifi_backoff_max_ms=getattr(env, 'WIFI_BACKOFF_MAX_MS', 600000),
+              wifi_radio_budget_ms=getattr(env, 'WIFI_RADIO_BUDGET_MS', 300000),
+              wifi_roam_rssi=getattr(env, 'WIFI_ROAM_RSSI', -75),
+              wifi_roam_interval_ms=getattr(env, 'WIFI_ROAM_INTERVAL_MS', 300000),
+              radio_idle=getattr(env, 'RADIO_IDLE', 'auto'),
+              radio_off_min_gap_ms=getattr(env, 'RADIO_OFF_MIN_GAP_MS', 600000),
+              radio_energy_budget_ms=getattr(env, 'RADIO_ENERGY_BUDGET_MS', 0),
+              device_info_ttl_ms=getattr(env, 'DEVICE_INFO_TTL_MS', 10000))
+
+if not DUTY_CYCLE:
+    sleep_ms(100)
+
+    # Debug para mostrar el estado del wifi
+    rpi.wifi_debug()
+
+    sleep_ms(100)
 
 # Ejemplo instanciando I2C en bus 0.
 i2c0 = rpi.set_i2c(4, 5, 0, 400000)
 # print('Dispositivos encontrados por I2C:', i2c0.scan())
 
+# Segundo bus I2C (opcional), por ejemplo para sensores BME280 de otra zona
+i2c1 = None
+
+if getattr(env, 'I2C1_SDA_PIN', None) is not None:
+    i2c1 = rpi.set_i2c(env.I2C1_SDA_PIN, env.I2C1_SCL_PIN, 1, 400000)
+
 # Ejemplo asociando un callback al recibir +3.3v en el gpio 2
 # rpi.set_callback_to_pin(2, "LOW", tu_callback)
 # rpi.set_callback_to_pin(2, lambda p: print("Se ejecuta el callback"), "LOW")
@@ -37,10 +88,22 @@ i2c0 = rpi.set_i2c(4, 5, 0, 400000)
 # Configurando batería externa
 if env.BATTERY:
     rpi.set_external_battery(26)
-    sleep_ms(200)
+
+    if not DUTY_CYCLE:
+        sleep_ms(200)
 
 # Preparo la instancia para la comunicación con la API
-# api = Api(controller=rpi, url=env.API_URL, path=env.API_PATH, token=env.API_TOKEN, device_id=env.DEVICE_ID, debug=env.DEBUG)
+api = None
+
+if env.API_UPLOAD:
+    api = Api(controller=rpi, url=env.API_URL,
+              path=getattr(env, 'API_PATH', ''), token=env.API_TOKEN,
+              device_id=getattr(env, 'DEVICE_ID', rpi.get_id()),
+              debug=env.DEBUG,
+              batch_size=getattr(env, 'API_BATCH_SIZE', 120),
+              batch_bytes=getattr(env, 'API_BATCH_BYTES', 8192),
+              connect_timeout_ms=getattr(env, 'API_CONNECT_TIMEOUT_MS', 5000),
+              read_timeout_ms=getattr(env, 'API_READ_TIMEOUT_MS', 10000))
 
 
 # Ejemplo sincronizando reloj RTC
@@ -60,7 +123,7 @@ while not rpi.sync_rtc_time():
 """
 
 # Pausa preventiva al desarrollar (ajustar, pero si usas dos hilos puede ahorrar tiempo por bloqueos de hardware ante errores)
-if env.DEBUG:
+if env.DEBUG and not DUTY_CYCLE:
     sleep_ms(2000)
 
 
@@ -80,11 +143,44 @@ if mode_config:
 
 weather = None
 
-## TODO: cargar con try-catch
 if env.BME280:
-    weather = BME280(rpi=rpi)
-
-soil = SoilMoisture(rpi, pin=27)
+    # Un sensor por zona en los dos buses. La calibración de cada uno y las
+    # direcciones encontradas se guardan en la flash y se reutilizan en cada
+    # arranque.
+    weather = BME280Registry(rpi,
+                             addresses=getattr(env, 'BME280_ADDRESSES',
+                                               (getattr(env, 'BME280_ADDRESS', 0x76),)),
+                             zones=getattr(env, 'BME280_ZONES', None),
+                             cache_path=getattr(env, 'BME280_SCAN_CACHE', 'bme280.scan'),
+                             debug=DEBUG,
+                             calibration_cache=getattr(env, 'BME280_CALIBRATION_CACHE', 'bme280'))
+
+    if not weather.sensors:
+        log("No se ha encontrado ningún BME280")
+        weather = None
+
+## Humedad en tierra con el ADC interno, una planta por pin
+soils = [SoilMoisture(rpi, pin=pin) for pin in getattr(env, 'SOIL_PINS', (27,))]
+soil = soils[0]
+
+## Barrido intercalado del ADC interno: lee a la vez todas las plantas, la
+## batería y la temperatura de la CPU en un solo frame
+analog = None
+
+if len(soils) > 1 or DUTY_CYCLE or env.BATTERY:
+    analog = AnalogSampler(rpi, samples=soil.samples,
+                           sample_delay_ms=soil.sample_delay_ms, debug=DEBUG)
+
+    for plant in soils:
+        analog.add_channel(plant.pin, plant.pin, plant.filter)
+
+    if env.BATTERY:
+        analog.add_channel('battery', rpi.external_battery['pin'])
+
+    analog.add_channel('cpu', 4)
+
+if snapshot:
+    snapshot.restore(rpi, soil)
 soil_ads1115_1 = None
 soil_ads1115_2 = None
 
@@ -96,92 +192,537 @@ if env.ADS1115_2:
     #soil_ads1115_2 = ADS1115(rpi)
     pass
 
+## Histórico de lecturas entre subidas, una columna de humedad por planta
+plants = len(soils)
+
+if env.ADS1115:
+    plants = env.ADS1115_QUANTITY + (env.ADS1115_2_QUANTITY if env.ADS1115_2 else 0)
+
+history = TimeSeries(capacity=getattr(env, 'HISTORY_SIZE', 192), plants=plants)
+
+## Cola en flash para las lecturas que no se han podido subir y histórico
+## reutilizado para reenviarlas por lotes
+spool = None
+replay = None
+
+if api and getattr(env, 'SPOOL', True):
+    spool = Spool(path=getattr(env, 'SPOOL_PATH', 'spool'), plants=plants,
+                  max_bytes=getattr(env, 'SPOOL_MAX_BYTES', 65536),
+                  segment_bytes=getattr(env, 'SPOOL_SEGMENT_BYTES', 8192),
+                  debug=DEBUG)
+    replay = TimeSeries(capacity=api.BATCH_SIZE, plants=plants)
+
 ## Entidad para el sistema
-system = System(rpi, weather_sensor=weather, light_sensor=None)
+system = System(rpi, weather_sensor=weather, light_sensor=None,
+                history=history)
+
+## Se arranca con la última configuración guardada sin esperar a la red, la
+## tarea "config" la revisa después con una petición condicional
+if api:
+    system.set_config(api.load_cached_config())
+
+## Lectores de muestras para el núcleo de adquisición. Devuelven una tupla
+## con los valores que se guardan en el buffer circular.
+
+def read_soil_sample ():
+    if analog is None:
+        reading = soil.read_analog()
+
+        return reading['voltage'], reading['humidity_percent']
+
+    # Todas las plantas en un barrido, el resto quedan con su identificador
+    frame = analog.sweep()
+    now = ticks_ms()
+
+    for index in range(1, len(soils)):
+        plant = soils[index]
+        reading = plant.read_raw(frame[plant.pin])
+        samples.push(SOURCE_SOIL_PLANT + index, now, reading['voltage'],
+                     reading['humidity_percent'])
+
+    reading = soil.read_raw(frame[soil.pin])
+
+    return reading['voltage'], reading['humidity_percent']
+
+
+def read_weather_sample ():
+    data = weather.get_all_data()
+
+    # El resto de zonas se dejan en el buffer con su propio identificador
+    if len(weather.sensors) > 1:
+        now = ticks_ms()
+
+        for index, sensor in enumerate(weather.sensors):
+            reading = weather.readings[sensor.zone]
+
+            if reading and sensor is not weather.primary:
+                samples.push(SOURCE_WEATHER_ZONE + index, now, reading['temperature'],
+                             reading['pressure'], reading['humidity'] or 0.0)
+
+    return data['temperature'], data['pressure'], data['humidity'] or 0.0
+
+
+def analog_value (name, adc):
+    # Último barrido del ADC o, antes del primero, una lectura directa
+    value = analog.frame.get(name) if analog else None
+
+    return adc.read_u16() if value is None else value
+
+
+def read_battery_sample ():
+    # Lectura cruda: la estimación y las estadísticas se actualizan en el
+    # núcleo 0 (drain)
+    return (analog_value('battery', rpi.external_battery['adc']),)
+
+
+def read_cpu_sample ():
+    # Lectura cruda: las estadísticas se actualizan en el núcleo 0 (drain)
+    return (analog_value('cpu', rpi.TEMP_SENSOR),)
+
+
+samples = None
+acquisition = None
+
+if DUAL_CORE:
+    samples = SampleBuffer(capacity=getattr(env, 'SAMPLE_BUFFER_SIZE', 64))
+    acquisition = Acquisition(rpi, samples,
+                              max_jitter_ms=getattr(env, 'SAMPLE_MAX_JITTER_MS', 50),
+                              debug=DEBUG)
+
+    acquisition.add_source(SOURCE_SOIL, read_soil_sample,
+                           getattr(env, 'SOIL_READ_INTERVAL_MS', 2000))
+
+    if weather:
+        acquisition.add_source(SOURCE_WEATHER, read_weather_sample,
+                               getattr(env, 'BME280_READ_INTERVAL_MS', 10000))
+
+    if env.BATTERY:
+        acquisition.add_source(SOURCE_BATTERY, read_battery_sample,
+                               getattr(env, 'BATTERY_READ_INTERVAL_MS', 60000))
+
+    acquisition.add_source(SOURCE_CPU, read_cpu_sample,
+                           getattr(env, 'CPU_TEMP_READ_INTERVAL_MS', 60000))
+
 
 def thread1 ():
     """
-    Segundo hilo.
+    Segundo hilo, se ejecuta en el núcleo 1 del RP2040.
 
-    En este hilo colocamos otras operaciones con cuidado frente a la
-    concurrencia.
+    Realiza toda la adquisición por ADC e I2C (humedad en tierra, BME280 y
+    batería) y deja las muestras en el buffer circular. El núcleo 0 solo
+    consume el buffer, por lo que las esperas de red no retrasan el muestreo.
 
-    Recomiendo utilizar sistemas de bloqueo y pruebas independientes con las
-    funcionalidades que vayas a usar en paralelo. Se puede romper la ejecución.
+    Todos los accesos al hardware compartido se hacen con el cerrojo de rpi.
     """
 
     if env.DEBUG:
         print('')
-        print('Inicia hilo principal (thread1)')
+        print('Inicia hilo secundario (thread1)')
+
+    acquisition.run()
+
+
+## Tareas del planificador. Cada una se ejecuta con su propio periodo, por lo
+## que una lectura lenta no retrasa al resto.
+
+def set_soil (reading, plant=None):
+    plant = plant or soil
+    system.set_soil_reading(plant.pin, reading)
+
+    log("Soil Moisture (analog):", plant.pin, reading)
+
+
+def set_analog (frame):
+    """
+    Reparte un barrido del ADC interno entre las plantas y la temperatura de
+    la CPU. La batería la toma task_battery del último barrido, con su propio
+    periodo para la estimación.
+    """
+    for plant in soils:
+        set_soil(plant.read_raw(frame[plant.pin]), plant)
+
+    if 'cpu' in frame:
+        rpi.cpu_temperature_read_sensor(frame['cpu'])
 
 
-def thread0 ():
+async def task_soil ():
     """
-    Primer hilo, flujo principal de la aplicación.
-    En este hilo colocamos toda la lógica principal de funcionamiento.
+    Lee la humedad en tierra con el ADC interno. Con una planta y sin batería
+    las muestras las toma un Timer en segundo plano, en otro caso se barren
+    todos los canales a la vez. En ambos casos la tarea cede el control entre
+    muestras.
     """
+    if analog:
+        set_analog(await analog.sweep_async())
+    else:
+        set_soil(await soil.read_analog_async())
 
-    log('')
-    log("Inicia hilo principal (thread0)")
 
-    log("Sistema: ", system.get_info())
+def task_weather ():
+    """
+    Lee los sensores ambientales (BME280 y sensor de luz).
+    """
+    system.read_sensors()
+
+    log("Weather:", system.weather)
 
-    print("=== Prueba del sensor de humedad en Tierra ===")
 
-    # Usando la nueva clase SoilMoisture con el ADC interno en el pin 27
-    for _ in range(12):
-        log("Soil Moisture (analog):", soil.read_analog())
-        sleep_ms(100)
+def task_history ():
+    """
+    Añade una fila al histórico cuando no hay sensor ambiental; con él la
+    añade cada lectura del clima.
+    """
+    system.record()
 
-    # Probando módulos adc ADS1115
-    if (env.ADS1115):
-        soil_stats = None
-        pass
 
-    if (env.ADS1115_2):
-        soil_stats2 = None
-        pass
+def task_battery ():
+    """
+    Actualiza la estimación de la batería externa con el último barrido del
+    ADC (lee el ADC si todavía no hay ninguno).
+    """
+    rpi.read_external_battery(analog.frame['battery'])
 
-    rpi.on(16)
-    sleep_ms(1000)
-    rpi.off(16)
-    rpi.on(17)
-    sleep_ms(1000)
-    rpi.off(17)
-    rpi.on(18)
-    sleep_ms(1000)
-    rpi.off(18)
-    rpi.on(19)
-    rpi.on(20)
-    rpi.on(21)
 
-    sleep_ms(1000)
-    rpi.off(19)
-    rpi.off(20)
-    rpi.off(21)
+async def task_leds ():
+    """
+    Secuencia de prueba de los LEDs cediendo el control entre pasos.
+    """
+    for pin in (16, 17, 18):
+        rpi.on(pin)
+        await asyncio.sleep_ms(1000)
+        rpi.off(pin)
 
     # Resistencias led RGB
     # Rojo y azul 680R
     # Verde 20k
+    for pin in (19, 20, 21):
+        rpi.on(pin)
+
+    await asyncio.sleep_ms(1000)
+
+    for pin in (19, 20, 21):
+        rpi.off(pin)
+
+
+def replay_spool (info) -> bool:
+    """
+    Reenvía en orden las lecturas guardadas en flash, por bloques del tamaño
+    de un lote. El cursor solo avanza con lo que la API ha confirmado.
+    :param info: Estado actual del sistema que acompaña a cada lote.
+    :return: True si la cola ha quedado vacía.
+    """
+    while len(spool):
+        read = spool.load(replay)
+
+        if len(replay):
+            sent = api.send_batches(info, replay)
+
+            if len(replay):
+                # Hasta la última fila confirmada, con los corruptos previos
+                spool.advance(spool.records(sent))
+                return False
+
+        spool.advance(read)
+
+    return True
+
+
+def upload (connected):
+    """
+    Envía el estado del sistema a la API. Lo que no se consigue subir se
+    guarda en la cola en flash para reenviarlo al recuperar la conexión.
+
+    Args:
+        connected (bool): Hay conexión para la ráfaga (radio_burst_begin).
+    """
+    # Con el barrido del ADC la batería y la CPU ya llegan en cada frame
+    info = system.get_info(refresh=not (DUAL_CORE or DUTY_CYCLE or analog))
+
+    log("Sistema: ", info)
+
+    if api and connected:
+        # Con lecturas ya en cola, las nuevas van detrás para subirlas juntas
+        if spool is not None and len(spool) and len(history):
+            spool.push(history)
+
+        queued = len(spool) if spool is not None else 0
 
-    print("")
-    print("Termina ciclo del hilo 0")
-    print("")
+        if spool is None or replay_spool(info):
+            if len(history):
+                # Todas las lecturas desde la última subida en lotes
+                api.send_batches(info, history)
+            elif not queued:
+                api.send_to_api(info)
 
+    if spool is not None and len(history):
+        spool.push(history)
+
+    # La API ha pedido volver a sincronizar la configuración
+    if api and api.need_sync_configuration:
+        sync_config(connected)
+    elif api and not DUTY_CYCLE:
+        radio_idle()
+
+
+async def radio_burst ():
+    """
+    Prepara la radio para una ráfaga sin bloquear el planificador: la tarea
+    "wifi" conecta mientras tanto.
+    """
+    return bool(api) and await rpi.radio_burst_begin_async()
+
+
+async def task_api ():
+    """
+    Sube el estado del sistema en cuanto hay conexión. Sin conexión a tiempo
+    la subida se salta y las lecturas quedan en la cola en flash.
+    """
+    upload(await radio_burst())
+
+
+def task_wifi ():
+    """
+    Mantiene la conexión Wi-Fi: reintenta con espera creciente y sin
+    bloquear al resto de tareas, que siguen funcionando sin red.
+    """
+    rpi.wifi_poll()
+
+
+def sync_config (connected):
+    """
+    Revisa la configuración de la API (If-None-Match). Si no ha cambiado
+    solo cuesta una respuesta 304 sin cuerpo.
+
+    Args:
+        connected (bool): Hay conexión para la ráfaga (radio_burst_begin).
+    """
+    if api and connected:
+        system.set_config(api.get_data_from_api())
+
+    if api and not DUTY_CYCLE:
+        radio_idle()
+
+
+async def task_config ():
+    """
+    Revisa la configuración en cuanto hay conexión, sin bloquear al resto
+    de tareas.
+    """
+    sync_config(await radio_burst())
+
+
+def radio_idle ():
+    """
+    Deja la radio con ahorro de energía o apagada hasta la próxima subida.
+    Con la radio apagada se cierra la conexión con la API.
+    """
+    rpi.radio_burst_end(env.API_UPLOAD_INTERVAL * 60000)
+
+    if not rpi.wifi_is_connected():
+        api.http.close()
+
+
+# Muestra preasignada donde se copia cada lectura al vaciar el buffer
+_sample = array('f', (0.0, 0.0, 0.0))
+
+
+def task_drain ():
+    """
+    Vacía el buffer de muestras del núcleo 1 y actualiza el estado del sistema.
+    """
+    while True:
+        source = samples.pop(_sample)
+
+        if source < 0:
+            break
+
+        if source == SOURCE_SOIL:
+            system.set_soil_reading(soil.pin, {
+                'voltage': round(_sample[0], 4),
+                'humidity_percent': round(_sample[1], 1),
+            })
+        elif source == SOURCE_WEATHER:
+            system.weather = {
+                'temperature': round(_sample[0], 2),
+                'pressure': round(_sample[1], 2),
+                'sensor_type': weather.sensor_type,
+                'humidity': None if weather.is_bmp280 else round(_sample[2], 2),
+            }
+            system.record()
+
+            if len(weather.sensors) > 1:
+                system.set_weather_zone(weather.primary.zone, system.weather)
+        elif source == SOURCE_BATTERY:
+            rpi.read_external_battery(int(_sample[0]))
+        elif source == SOURCE_CPU:
+            rpi.cpu_temperature_read_sensor(int(_sample[0]))
+        elif source >= SOURCE_SOIL_PLANT:
+            system.set_soil_reading(soils[source - SOURCE_SOIL_PLANT].pin, {
+                'voltage': round(_sample[0], 4),
+                'humidity_percent': round(_sample[1], 1),
+            })
+        elif source >= SOURCE_WEATHER_ZONE:
+            sensor = weather.sensors[source - SOURCE_WEATHER_ZONE]
+            system.set_weather_zone(sensor.zone, {
+                'temperature': round(_sample[0], 2),
+                'pressure': round(_sample[1], 2),
+                'sensor_type': sensor.sensor_type,
+                'humidity': None if sensor.is_bmp280 else round(_sample[2], 2),
+            })
+
+
+def task_gc ():
+    """
+    Libera memoria y muestra las métricas del planificador.
+    """
+    if env.DEBUG:
+        print('Memoria antes de liberar: ', gc.mem_free())
+
+    gc.collect()
+
+    if env.DEBUG:
+        print("Memoria después de liberar:", gc.mem_free())
+        print("Planificador:", scheduler.get_stats())
+
+        if acquisition:
+            print("Adquisición:", acquisition.get_stats())
+
+        print("Wi-Fi:", rpi.wifi_manager.get_stats(), rpi.radio_stats)
+
+        if weather:
+            print("BME280:", weather.get_stats())
+
+        print("Filtro de humedad en tierra:", soil.filter.get_stats())
+
+        if analog:
+            print("ADC interno:", analog.get_stats())
+
+        print("Humedad en tierra:", soil.get_stats())
+        print("Temperatura CPU:", rpi.get_cpu_temperature_stats())
+
+        if rpi.external_battery:
+            print("Batería:", rpi.battery_stats.get_stats(3))
+
+        if api:
+            print("API:", api.stats, api.http.stats)
+
+        if spool:
+            print("Cola en flash:", spool.get_stats())
+
+
+scheduler = Scheduler(debug=DEBUG)
+
+if DUAL_CORE:
+    # El núcleo 1 lee los sensores, el núcleo 0 solo consume sus muestras
+    scheduler.add_task('drain', task_drain,
+                       period_ms=getattr(env, 'SAMPLE_DRAIN_INTERVAL_MS', 1000),
+                       deadline_ms=100)
+else:
+    scheduler.add_task('soil', task_soil,
+                       period_ms=getattr(env, 'SOIL_READ_INTERVAL_MS', 2000),
+                       deadline_ms=500)
+
+    if weather:
+        scheduler.add_task('weather', task_weather,
+                           period_ms=getattr(env, 'BME280_READ_INTERVAL_MS', 10000),
+                           deadline_ms=500)
+
+    if env.BATTERY:
+        scheduler.add_task('battery', task_battery,
+                           period_ms=getattr(env, 'BATTERY_READ_INTERVAL_MS', 60000),
+                           deadline_ms=200)
+
+# Sin BME280 el histórico no puede depender de las lecturas del clima
+if not weather:
+    scheduler.add_task('history', task_history,
+                       period_ms=getattr(env, 'HISTORY_INTERVAL_MS',
+                                         getattr(env, 'BME280_READ_INTERVAL_MS', 10000)),
+                       deadline_ms=100)
+
+scheduler.add_task('leds', task_leds,
+                   period_ms=getattr(env, 'LED_INTERVAL_MS', 10000),
+                   deadline_ms=5000)
+
+scheduler.add_task('wifi', task_wifi,
+                   period_ms=getattr(env, 'WIFI_POLL_INTERVAL_MS', 1000),
+                   deadline_ms=5000)
+
+if api:
+    scheduler.add_task('config', task_config,
+                       period_ms=getattr(env, 'API_CONFIG_INTERVAL_MS', 86400000),
+                       deadline_ms=30000, delay_ms=2000)
+
+scheduler.add_task('api', task_api,
+                   period_ms=env.API_UPLOAD_INTERVAL * 60000,
+                   deadline_ms=30000, delay_ms=5000)
+
+scheduler.add_task('gc', task_gc, period_ms=30000, deadline_ms=100)
+
+
+def duty_cycle ():
+    """
+    Un ciclo del modo de bajo consumo: lee los sensores, sube los datos si ha
+    pasado el intervalo de subida, guarda el estado y duerme hasta el
+    siguiente ciclo. Al despertar el firmware arranca de nuevo desde el
+    principio con el estado guardado.
+    """
+    snapshot.wakes += 1
+
+    # Plantas, batería y temperatura de la CPU en un solo barrido del ADC
+    frame = analog.sweep()
+    set_analog(frame)
+
+    if env.BATTERY:
+        rpi.read_external_battery(frame['battery'])
+
+    system.read_sensors()
+    system.check_all_needs()
+
+    ready_ms = ticks_diff(ticks_ms(), BOOT_MS)
+    snapshot.ready_ms = ready_ms
+    snapshot.ready_max_ms = max(snapshot.ready_max_ms, ready_ms)
+
+    log("Listo tras despertar (ms):", ready_ms)
+
+    now = time()
+
+    # Con poca batería se sube con menos frecuencia
+    upload_interval = env.API_UPLOAD_INTERVAL * 60 / rpi.radio_energy_factor()
+
+    if api and now - snapshot.last_upload >= upload_interval:
+        if rpi.radio_burst_begin():
+            config_interval = getattr(env, 'API_CONFIG_INTERVAL_MS', 86400000) // 1000
+
+            if now - snapshot.last_config >= config_interval:
+                sync_config(True)
+                snapshot.last_config = now
+
+            upload(True)
+
+            if not len(history) and (spool is None or not len(spool)):
+                snapshot.last_upload = now
+
+    # Lo que no se ha subido queda en la cola en flash
+    if spool is not None and len(history):
+        spool.push(history)
+
+    sleep = max(1000, getattr(env, 'DUTY_CYCLE_INTERVAL_S', 300) * 1000
+                - ticks_diff(ticks_ms(), BOOT_MS))
+
+    snapshot.capture(rpi, soil)
+    snapshot.next_wake = time() + sleep // 1000
+    snapshot.save()
+
+    if env.DEBUG:
+        print('Durmiendo (ms):', sleep)
 
-while True:
-    try:
-        thread0()
-    except Exception as e:
-        if env.DEBUG:
-            print('Error: ', e)
-    finally:
-        if env.DEBUG:
-            print('Memoria antes de liberar: ', gc.mem_free())
+    rpi.deepsleep(sleep / 1000)
 
-        gc.collect()
 
-        if env.DEBUG:
-            print("Memoria después de liberar:", gc.mem_free())
+if DUTY_CYCLE:
+    duty_cycle()
+else:
+    if DUAL_CORE:
+        _thread.start_new_thread(thread1, ())
 
-        sleep_ms(2000)
+    scheduler.start()